@@ -0,0 +1,180 @@
+"""
+BasePage 与页面对象的基准测试，使用本地静态页面（benchmarks/fixtures），不访问外部网络
+
+运行：python -m benchmarks.bench_base_page --browsers chrome,firefox --repeat 20
+结果为 JSON（每个操作的耗时分位数和浏览器驱动命令数），默认写入 output/benchmarks，
+使用 python -m benchmarks.compare 对比两次结果
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+from datetime import datetime
+
+from config.pathconf import BASE_DIR
+from utils.webdriver_factory import WebDriverFactory
+from utils.command_tracer import CommandTracer
+from pages.login_page import LoginPage
+from benchmarks.fixture_site import FixtureSite
+
+OUTPUT_DIR = os.path.join(BASE_DIR, 'output', 'benchmarks')
+
+
+def _open(path):
+    return lambda page, site: page.open(site.url(path))
+
+
+def _iframe_text(page, site):
+    page.switch_to_frame('id', 'frame')
+    text = page.get_ele_text('id', 'inner')
+    page.switch_to_default_content()
+    return text
+
+
+def _accept_alert(page, site):
+    page.click('id', 'alert_button')
+    page.alert_accept()
+
+
+FORM_FIELDS = {
+    'username': ('id', 'username', 'benchmark'),
+    'password': ('id', 'password', 'secret'),
+    'email': ('id', 'email', 'bench@example.com'),
+    'phone': ('id', 'phone', '13800000000'),
+    'remark': ('id', 'remark', '基准测试'),
+}
+READ_FIELDS = {
+    'title': ('tag', 'title'),
+    'username': ('id', 'username', 'value'),
+    'city': ('id', 'city', 'value'),
+    'result': ('id', 'result'),
+}
+
+# 基准测试场景：(名称, 准备操作（不计时）, 计时的操作)，操作接收 (页面对象, FixtureSite)
+SCENARIOS = [
+    ('open', None, _open('forms.html')),
+    ('element_wait', _open('forms.html'), lambda page, site: page.element_wait('id', 'username')),
+    ('send_key', _open('forms.html'), lambda page, site: page.send_key('id', 'username', 'benchmark')),
+    ('click', _open('forms.html'), lambda page, site: page.click('id', 'login_button')),
+    ('get_selected', _open('forms.html'), lambda page, site: page.get_selected('id', 'city', 2)),
+    ('fill_form.keys', _open('forms.html'), lambda page, site: page.fill_form(FORM_FIELDS)),
+    ('fill_form.js', _open('forms.html'), lambda page, site: page.fill_form(FORM_FIELDS, mode='js')),
+    ('read_many', _open('forms.html'), lambda page, site: page.read_many(READ_FIELDS)),
+    ('LoginPage.login', _open('forms.html'), lambda page, site: page.login('benchmark', 'secret')),
+    ('read_elements.1000', _open('list.html'), lambda page, site: page.read_elements('css', 'tr.item', ['data-id'])),
+    ('elements.to_records.1000', _open('list.html'),
+     lambda page, site: page.to_records(page.elements('css', 'tr.item'), ['data-id'])),
+    ('iframe.get_ele_text', _open('iframe.html'), _iframe_text),
+    ('element_wait.poll.delayed', _open('delayed.html?delay=300'),
+     lambda page, site: page.element_wait('id', 'late_button', wait=5, mode='poll')),
+    ('element_wait.observer.delayed', _open('delayed.html?delay=300'),
+     lambda page, site: page.element_wait('id', 'late_button', wait=5, mode='observer')),
+    ('wait_count_stable.delayed', _open('delayed.html?delay=100'),
+     lambda page, site: page.wait_count_stable('css', '.late_row', wait=5, stable=0.2)),
+    ('alert_accept', _open('alerts.html'), _accept_alert),
+]
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def _summarize(durations, trips):
+    return {
+        'count': len(durations),
+        'mean_ms': round(sum(durations) / len(durations) * 1000, 3),
+        'p50_ms': round(_percentile(durations, 0.5) * 1000, 3),
+        'p95_ms': round(_percentile(durations, 0.95) * 1000, 3),
+        'max_ms': round(max(durations) * 1000, 3),
+        'round_trips': _percentile(trips, 0.5),
+    }
+
+
+def run_browser(browser_name, site, repeat, warmup, only=None):
+    """
+    在一个无头浏览器中运行所有基准测试场景
+    :param browser_name: 浏览器名称
+    :param site: FixtureSite
+    :param repeat: 每个场景计时的次数
+    :param warmup: 每个场景预热（不计时）的次数
+    :param only: 只运行名称包含该字符串的场景
+    :return: (浏览器版本, {场景名称: 统计})
+    """
+    driver = WebDriverFactory.get_driver(browser_name, profile='headless')
+    tracer = CommandTracer.install(driver)
+    page = LoginPage(driver)
+    results = {}
+    try:
+        for name, setup, operate in SCENARIOS:
+            if only and only not in name:
+                continue
+            durations, trips = [], []
+            for i in range(warmup + repeat):
+                if setup is not None:
+                    setup(page, site)
+                window = tracer.window()
+                start = time.perf_counter()
+                operate(page, site)
+                elapsed = time.perf_counter() - start
+                if i >= warmup:
+                    durations.append(elapsed)
+                    trips.append(window.count)
+            results[name] = _summarize(durations, trips)
+            print(f"{browser_name:<10}{name:<32}p50 {results[name]['p50_ms']:>10.2f} ms"
+                  f"  p95 {results[name]['p95_ms']:>10.2f} ms  命令 {results[name]['round_trips']:>4}")
+        return driver.capabilities.get('browserVersion'), results
+    finally:
+        driver.quit()
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='BasePage 基准测试')
+    parser.add_argument('--browsers', default='chrome', help='浏览器名称，多个用逗号分隔，如 chrome,firefox')
+    parser.add_argument('--repeat', type=int, default=20, help='每个场景计时的次数')
+    parser.add_argument('--warmup', type=int, default=2, help='每个场景预热的次数')
+    parser.add_argument('--only', help='只运行名称包含该字符串的场景')
+    parser.add_argument('--output', help='结果文件路径，默认写入 output/benchmarks')
+    args = parser.parse_args(argv)
+
+    commit = _git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': sys.platform,
+            'repeat': args.repeat,
+            'browsers': {},
+        },
+        'results': {},
+    }
+    with FixtureSite() as site:
+        for browser_name in [b.strip() for b in args.browsers.split(',') if b.strip()]:
+            version, results = run_browser(browser_name, site, args.repeat, args.warmup, args.only)
+            report['meta']['browsers'][browser_name] = version
+            report['results'][browser_name] = results
+
+    output = args.output
+    if output is None:
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        name = f"bench_{datetime.now().strftime('%Y%m%d-%H%M%S')}_{commit or 'unknown'}.json"
+        output = os.path.join(OUTPUT_DIR, name)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f'结果已写入: {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Logger 单次调用开销的微基准测试
+
+运行：python -m benchmarks.bench_logger
+对比旧实现（inspect.stack() 查找调用者）与当前实现（沿 f_back 查找调用者），
+以及日志级别未开启时 f-string 与延迟格式化参数的开销
+"""
+import sys
+import inspect
+import timeit
+
+from utils.logger import Logger
+
+# 模拟 pytest + 页面对象中的调用栈深度
+STACK_DEPTH = 40
+NUMBER = 2000
+
+
+def _legacy_get_caller_depth():
+    # 旧实现：inspect.stack() 会为整个调用栈构造 FrameInfo 并读取源码上下文
+    stack = inspect.stack()
+    for depth, frame_info in enumerate(stack):
+        if frame_info.frame.f_globals.get('__name__') != 'utils.logger':
+            return depth - 1
+    return 0
+
+
+def _nested(depth, func):
+    if depth == 0:
+        return func()
+    return _nested(depth - 1, func)
+
+
+def _measure(label, func):
+    seconds = min(timeit.repeat(lambda: _nested(STACK_DEPTH, func), number=NUMBER, repeat=3))
+    print(f'{label:<40}{seconds / NUMBER * 1e6:>10.2f} us/call')
+
+
+def main():
+    locator = ('css', '#kw')
+    print(f'调用栈深度 {STACK_DEPTH}，每项执行 {NUMBER} 次，取 3 次中最快的一次')
+
+    _measure('查找调用者 inspect.stack()', _legacy_get_caller_depth)
+    _measure('查找调用者 f_back', Logger._get_caller_depth)
+
+    # 只测量 Logger 本身的开销，输出到空处理器
+    Logger.remove_sink()
+    handler_id = Logger.add_sink(lambda message: None, 'DEBUG')
+    _measure('DEBUG 已开启 f-string', lambda: Logger.debug(f'点击元素 {locator[0]}={locator[1]}'))
+    _measure('DEBUG 已开启 延迟格式化', lambda: Logger.debug('点击元素 {}={}', *locator))
+
+    Logger.remove_sink(handler_id)
+    Logger.add_sink(lambda message: None, 'INFO')
+    _measure('DEBUG 未开启 f-string', lambda: Logger.debug(f'点击元素 {locator[0]}={locator[1]}'))
+    _measure('DEBUG 未开启 延迟格式化', lambda: Logger.debug('点击元素 {}={}', *locator))
+
+
+if __name__ == '__main__':
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), STACK_DEPTH * 4))
+    main()
@@ -0,0 +1,65 @@
+"""
+对比两次 BasePage 基准测试结果（参见 bench_base_page）
+
+用法：python -m benchmarks.compare 旧结果.json 新结果.json --threshold 0.2 --fail
+p50 耗时变慢超过 threshold（且超过 min-ms 毫秒）或浏览器驱动命令数增加时标记为回归，--fail 时存在回归则返回 1
+"""
+import sys
+import json
+import argparse
+
+
+def compare(old, new, threshold=0.2, min_ms=5.0):
+    """
+    对比两次结果中都存在的浏览器和场景
+    :param old: 旧结果
+    :param new: 新结果
+    :param threshold: p50 耗时变慢的比例阈值
+    :param min_ms: p50 耗时变慢的绝对值阈值（毫秒），避免极短操作的噪声
+    :return: [(浏览器, 场景, 旧统计, 新统计, 是否回归), ...]
+    """
+    rows = []
+    for browser, new_results in new['results'].items():
+        old_results = old['results'].get(browser, {})
+        for name, new_stat in new_results.items():
+            old_stat = old_results.get(name)
+            if old_stat is None:
+                continue
+            slower = new_stat['p50_ms'] - old_stat['p50_ms']
+            regressed = (
+                (slower > min_ms and slower > old_stat['p50_ms'] * threshold)
+                or new_stat['round_trips'] > old_stat['round_trips']
+            )
+            rows.append((browser, name, old_stat, new_stat, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='对比两次 BasePage 基准测试结果')
+    parser.add_argument('old', help='旧结果文件')
+    parser.add_argument('new', help='新结果文件')
+    parser.add_argument('--threshold', type=float, default=0.2, help='p50 耗时变慢的比例阈值')
+    parser.add_argument('--min-ms', type=float, default=5.0, help='p50 耗时变慢的绝对值阈值（毫秒）')
+    parser.add_argument('--fail', action='store_true', help='存在回归时返回非 0')
+    args = parser.parse_args(argv)
+
+    with open(args.old, 'r', encoding='utf-8') as f:
+        old = json.load(f)
+    with open(args.new, 'r', encoding='utf-8') as f:
+        new = json.load(f)
+
+    print(f"旧: {old['meta'].get('commit')} {old['meta'].get('timestamp')}  "
+          f"新: {new['meta'].get('commit')} {new['meta'].get('timestamp')}")
+    rows = compare(old, new, args.threshold, args.min_ms)
+    for browser, name, old_stat, new_stat, regressed in rows:
+        change = (new_stat['p50_ms'] - old_stat['p50_ms']) / old_stat['p50_ms'] * 100 if old_stat['p50_ms'] else 0
+        print(f"{'!' if regressed else ' '} {browser:<10}{name:<32}"
+              f"p50 {old_stat['p50_ms']:>9.2f} -> {new_stat['p50_ms']:>9.2f} ms ({change:+6.1f}%)  "
+              f"命令 {old_stat['round_trips']:>3} -> {new_stat['round_trips']:>3}")
+    regressions = sum(1 for row in rows if row[4])
+    print(f'共对比 {len(rows)} 项，回归 {regressions} 项')
+    return 1 if regressions and args.fail else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
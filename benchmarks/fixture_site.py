@@ -0,0 +1,63 @@
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+# 基准测试使用的静态页面目录
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureSite:
+    """
+    在本地启动 http.server 提供 fixtures 目录下的静态页面，基准测试不依赖外部网络
+    """
+
+    def __init__(self, directory=FIXTURE_DIR, port=0):
+        """
+        :param directory: 静态页面目录
+        :param port: 端口，0 表示随机端口
+        """
+        self.directory = directory
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        """
+        启动服务
+        :return: self
+        """
+        handler = partial(_QuietHandler, directory=self.directory)
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        停止服务
+        :return: None
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def url(self, path):
+        """
+        静态页面地址
+        :param path: 页面路径，如 forms.html 或 list.html?rows=200
+        :return: 完整地址
+        """
+        return f'http://127.0.0.1:{self._server.server_address[1]}/{path}'
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -2,10 +2,6 @@
 
 import os
 
-from selenium.webdriver.chrome.service import Service as Chrome
-from selenium.webdriver.firefox.service import Service as Firefox
-from selenium.webdriver.edge.service import Service as Edge
-
 """
 配置路径
 """
@@ -13,6 +9,21 @@ from selenium.webdriver.edge.service import Service as Edge
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 REQUEST_ADDRESS = 'http://39.107.88.21:3300/url/get?userId='
 BROWSER_NAME = 'chrome'
+# 浏览器启动参数配置：default / headless / performance / headless_performance，参见 WebDriverFactory._profiles
+BROWSER_PROFILE = os.environ.get('UI_BROWSER_PROFILE', 'default')
+# Chromium 系浏览器开启 performance 日志，用于统计资源拦截的请求数，参见 ResourcePolicy
+RESOURCE_STATS_ENABLED = os.environ.get('UI_RESOURCE_STATS', '0') == '1'
+
+# 网络模式：live(直接访问) / record(录制响应) / replay(离线回放录制的响应)，参见 NetworkReplay
+NETWORK_MODE = os.environ.get('UI_NETWORK_MODE', 'live')
+# 录制文件名称，不同的录制放在 HAR_DIR 下不同的目录中
+NETWORK_CASSETTE = os.environ.get('UI_NETWORK_CASSETTE', 'default')
+# 录制时忽略的 URL 查询参数（时间戳、随机数等），多个参数用逗号分隔
+NETWORK_IGNORE_PARAMS = [p for p in os.environ.get('UI_NETWORK_IGNORE_PARAMS', '_,t,timestamp,rnd').split(',') if p]
+
+# 浏览器池配置：每个测试进程预先启动的浏览器数量，单个浏览器最多被租用的次数
+BROWSER_POOL_SIZE = 1
+BROWSER_POOL_MAX_LEASES = 20
 
 # 浏览器驱动参数配置 ######## 可用绝对路径
 # LINUX 系统浏览器驱动路劲
@@ -31,6 +42,31 @@ WIN_FIREFOX_PATH = os.path.join(BASE_DIR, "driver", "windows", "geckodriver.exe"
 
 # 日志路径----------------------------
 LOG_DIR = os.path.join(BASE_DIR, "log")
+# 日志级别，调高级别（如 INFO）时 DEBUG 日志几乎没有开销
+LOG_LEVEL = os.environ.get('UI_LOG_LEVEL', 'DEBUG')
+# 日志文件级别，低于该级别的日志只保存在每个测试的内存缓冲区中，测试失败或重试时才写入磁盘
+LOG_FILE_LEVEL = os.environ.get('UI_LOG_FILE_LEVEL', 'INFO')
+# 每个测试在内存中最多保留的日志条数
+LOG_BUFFER_SIZE = 5000
+# 记录浏览器驱动执行的每个命令（请求次数、耗时），参见 CommandTracer；
+# 未开启时只为标记了 @pytest.mark.max_roundtrips 的测试记录
+COMMAND_TRACE_ENABLED = os.environ.get('UI_COMMAND_TRACE', '0') == '1'
+# 统计页面对象各方法的耗时，参见 StepProfiler
+PROFILE_ENABLED = os.environ.get('UI_PROFILE', '0') == '1'
+# 页面跳转（open / f5 / back / forward）后采集页面性能指标，参见 PageMetrics
+PAGE_METRICS_ENABLED = os.environ.get('UI_PAGE_METRICS', '0') == '1'
+# 性能趋势记录的运行 id，由 run_test.py 设置，未设置时不记录，参见 TrendStore
+TREND_RUN_ID = os.environ.get('UI_RUN_ID')
+# 与最近几次运行对比性能，存在显著回归时 run_test.py 返回失败
+TREND_HISTORY = 10
+TREND_GATE = os.environ.get('UI_TREND_GATE', '0') == '1'
+# 失败追踪：内存中保留最近的页面操作步骤，测试失败时打包写入 TRACE_DIR，参见 TraceRecorder
+TRACE_ENABLED = os.environ.get('UI_TRACE', '0') == '1'
+TRACE_STEPS = 50
+# 失败追踪是否每步截图（操作失败的步骤总是截图）
+TRACE_SCREENSHOTS = os.environ.get('UI_TRACE_SCREENSHOTS', '0') == '1'
+# 页面操作的结构化事件日志（JSONL），参见 EventLog
+EVENT_LOG_ENABLED = os.environ.get('UI_EVENT_LOG', '0') == '1'
 
 # 测试用例集路径
 
@@ -45,6 +81,8 @@ DATA_FILE = os.path.join(BASE_DIR, "database", "file")
 
 # 测试图片断言路径
 DIFF_IMG_PATH = os.path.join(BASE_DIR, "database", "file", "img")
+# 重新保存图片断言的基准图片，参见 BasePage.visual_assert
+VISUAL_UPDATE_BASELINES = os.environ.get('UI_VISUAL_UPDATE', '0') == '1'
 
 # 测试用例结果目录
 PROPER_JSON_DIR = os.path.join(BASE_DIR, "output", "report_json")
@@ -54,3 +92,17 @@ PROPER_ALLURE_DIR = os.path.join(BASE_DIR, "output", "reports")
 MAILE_REPO = os.path.join(BASE_DIR, "output")
 # 测试截图目录
 PROPER_SCREEN_DIR = os.path.join(BASE_DIR, "output", "report_screen")
+# 截图的最大宽度（像素），超过时缩小后保存（需要 Pillow），0 表示保存原图
+SCREENSHOT_MAX_WIDTH = int(os.environ.get('UI_SCREENSHOT_MAX_WIDTH', '0'))
+# 网络录制目录
+HAR_DIR = os.path.join(BASE_DIR, "output", "har")
+# 页面操作事件日志目录
+EVENT_LOG_DIR = os.path.join(BASE_DIR, "output", "events")
+# 页面性能指标目录
+PAGE_METRICS_DIR = os.path.join(BASE_DIR, "output", "page_metrics")
+# 性能趋势数据库
+TREND_DB = os.path.join(BASE_DIR, "output", "trends.sqlite3")
+# 失败追踪目录
+TRACE_DIR = os.path.join(BASE_DIR, "output", "traces")
+# 页面对象耗时报告目录
+PROFILE_DIR = os.path.join(BASE_DIR, "output", "profile")
@@ -11,7 +11,7 @@ class BaiduHomePage:
 
     def input_search_query(self, text):
         self.base.send_key(*self.SEARCH_BOX, text)
-        Logger.debug(f'向搜索输入框中输入: {text}')
+        Logger.debug('向搜索输入框中输入: {}', text)
 
     def click_search_button(self):
         self.base.click(*self.SEARCH_BUTTON)
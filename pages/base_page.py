@@ -1,19 +1,30 @@
 import sys
 import os
 import time
-import requests
-import allure
-import ddddocr
+from contextlib import contextmanager
 
+from selenium.common.exceptions import (
+    JavascriptException, StaleElementReferenceException, TimeoutException, UnknownMethodException,
+    WebDriverException,
+)
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.select import Select
-from selenium.webdriver.support.ui import WebDriverWait
 
 from utils.logger import Logger
-from config.pathconf import PROPER_SCREEN_DIR
+from utils.waiter import Waiter
+from utils.resource_policy import ResourcePolicy
+from utils.link_checker import LinkChecker
+from utils.action_events import action
+from utils.page_metrics import PageMetrics
+from utils.ocr import Ocr
+from utils.screenshot_store import ScreenshotStore
+from utils.js_scripts import (
+    OBSERVE_ELEMENT_JS, NETWORK_STATE_JS, DOM_QUIET_JS, READ_MANY_JS, READ_ELEMENTS_JS, FILL_FORM_JS
+)
+from config.pathconf import PROPER_SCREEN_DIR, DIFF_IMG_PATH, VISUAL_UPDATE_BASELINES
 
 
 class BasePage:
@@ -29,16 +40,50 @@ class BasePage:
         'plt': By.PARTIAL_LINK_TEXT,
     }
 
+    # 等待条件名称到 expected_conditions 的映射
+    _condition_mapping = {
+        'presence': EC.presence_of_element_located,
+        'visible': EC.visibility_of_element_located,
+        'clickable': EC.element_to_be_clickable,
+    }
+    # 对已定位的元素检查等待条件，缓存命中但元素满足的条件比调用方要求的弱时使用
+    _element_condition_mapping = {
+        'visible': EC.visibility_of,
+        'clickable': EC.element_to_be_clickable,
+    }
+    # 等待条件的强弱顺序：clickable 包含 visible，visible 包含 presence
+    _condition_rank = {'presence': 0, 'visible': 1, 'clickable': 2}
+
+    # 默认等待模式：poll(轮询) / observer(页面内 MutationObserver 等待，一次请求完成)
+    wait_mode = 'poll'
+    # 浏览器驱动默认的异步脚本超时时间（秒）
+    _default_script_timeout = 30
+    # 浏览器驱动不支持异步脚本时的错误信息，出现时不再使用 observer 等待
+    _observer_unsupported_errors = ('unknown command', 'unsupported', 'not implemented', 'not supported')
+    # 页面对象的资源拦截规则，如 {'resource_types': ('image', 'font')}，创建页面对象时启用，
+    # 与测试的 @pytest.mark.block_resources 规则合并，浏览器归还浏览器池时清除，参见 block_resources
+    blocked_resources = None
+
     def __init__(self, driver):
         self.driver = driver
+        # 元素句柄缓存：(By, 定位语句) -> WebElement，页面跳转、刷新或切换frame时失效
+        self._element_cache = {}
+        # 缓存中的元素已满足的等待条件：(By, 定位语句) -> 条件名称，没有记录时为 presence
+        self._element_conditions = {}
+        self._script_timeout = self._default_script_timeout
+        # 浏览器不支持异步脚本时自动回退为轮询等待
+        self._observer_unsupported = False
+        # 正在录制的手势动作链，参见 gestures
+        self._gesture = None
+        self.resource_policy = None
+        if self.blocked_resources:
+            self.block_resources(**self.blocked_resources)
 
-    def element(self, _type, locate):
+    def _get_by(self, _type):
         """
-        定位单个元素,只会查找页面中符合条件的第一个节点,并返回
-        该方法返回基于指定查询条件的webElement对象，或抛出不符合条件的异常
+        将定位方式转换为 By 类属性
         :param _type: 定位方式
-        :param locate: 定位语句
-        :return: 元素对象
+        :return: By 类属性
         """
         by_type = self._locator_mapping.get(_type.lower())
         if by_type is None:
@@ -46,6 +91,17 @@ class BasePage:
             message = f"定位方式（{_type}）错误, 支持的定位方式：({supported_locator})"
             Logger.error(message)
             raise ValueError(message)
+        return by_type
+
+    def element(self, _type, locate):
+        """
+        定位单个元素,只会查找页面中符合条件的第一个节点,并返回
+        该方法返回基于指定查询条件的webElement对象，或抛出不符合条件的异常
+        :param _type: 定位方式
+        :param locate: 定位语句
+        :return: 元素对象
+        """
+        by_type = self._get_by(_type)
         try:
             return self.driver.find_element(by_type, locate)
         except Exception as e:
@@ -61,50 +117,301 @@ class BasePage:
         :param locate: 定位语句
         :return: 元素对象
         """
-        by_type = self._locator_mapping.get(_type.lower())
-        if by_type is None:
-            supported_locator = ', '.join(self._locator_mapping.keys())
-            message = f"定位方式（{_type}）错误, 支持的定位方式：({supported_locator})"
+        by_type = self._get_by(_type)
+        return self.driver.find_elements(by_type, locate)
+
+    @action('element_wait')
+    def element_wait(self, _type, locate, wait=None, condition='presence', interval=None, mode=None):  # 等待
+        """
+        显示等待定位,在设置时间内，按自适应间隔（从几十毫秒开始逐渐变长）检测当前页面元素是否满足条件，如果超过设置时间仍不满足则抛出异常。
+        observer 模式下先在页面内通过 MutationObserver 等待元素出现，再按条件轮询（通常一次即满足）
+        :param _type: 定位方式
+        :param locate: 定位语句
+        :param wait: 等待时间,默认以秒为单位,不填使用 Waiter 全局配置
+        :param condition: 等待条件 presence(存在) / visible(可见) / clickable(可点击)
+        :param interval: 首次轮询间隔（秒）,不填使用 Waiter 全局配置
+        :param mode: 等待模式 poll / observer,不填使用 wait_mode
+        :return: 元素对象
+        """
+        by_type = self._get_by(_type)
+        expected = self._condition_mapping.get(condition)
+        if expected is None:
+            supported_condition = ', '.join(self._condition_mapping.keys())
+            message = f"等待条件（{condition}）错误, 支持的等待条件：({supported_condition})"
             Logger.error(message)
             raise ValueError(message)
-        return self.driver.find_elements(by_type, locate)
+        try:
+            if (mode or self.wait_mode) == 'observer' and not self._observer_unsupported:
+                element = self._observe_element(by_type, locate, wait)
+                if element is not None and condition == 'presence':
+                    return element
+            return Waiter(self.driver, wait, interval).until(expected((by_type, locate)), condition)
+        except Exception as e:
+            message = f"等待元素时发生错误，定位方式：({_type}), 定位表达式：({locate}), 错误信息：({e})"
+            Logger.error(message)
+            raise ValueError(message) from e
 
-    def element_wait(self, _type, locate, wait=5):  # 等待
+    def _observe_element(self, by_type, locate, wait=None):
         """
-        显示等待定位,在设置时间内，默认每隔一段时间检测一次当前页面元素是否存在，如果超过设置时间检测不到则抛出异常。
+        通过 execute_async_script 在页面内安装 MutationObserver，元素出现或超时后返回，无论等待多久都只需一次请求
+        :param by_type: By 类属性
+        :param locate: 定位语句
+        :param wait: 等待时间,默认以秒为单位,不填使用 Waiter 全局配置
+        :return: 元素对象，浏览器不支持异步脚本或本次异步脚本执行失败时返回 None
+        """
+        timeout = Waiter.timeout if wait is None else wait
+        start = time.monotonic()
+        try:
+            self._ensure_script_timeout(timeout)
+            element = self.driver.execute_async_script(OBSERVE_ELEMENT_JS, by_type, locate, int(timeout * 1000))
+        except TimeoutException:
+            Waiter.record('observer', time.monotonic() - start, 1, False)
+            raise
+        except JavascriptException:
+            # 定位语句在页面内无法解析（如非法的选择器），交给轮询等待给出准确的错误
+            return None
+        except WebDriverException as e:
+            message = (e.msg or '').lower()
+            if isinstance(e, UnknownMethodException) or any(m in message for m in self._observer_unsupported_errors):
+                Logger.warning(f'浏览器不支持异步脚本等待，回退为轮询等待 ({e})')
+                self._observer_unsupported = True
+            else:
+                # 其他错误（页面跳转中、脚本超时等）只有本次回退为轮询等待
+                Logger.debug('异步脚本等待失败，本次使用轮询等待 ({})', e)
+            return None
+        Waiter.record('observer', time.monotonic() - start, 1, element is not None)
+        if element is None:
+            raise TimeoutException(f"等待元素 {by_type}={locate} 出现超时: {timeout}秒")
+        return element
+
+    @action('wait_text')
+    def wait_text(self, _type, locate, text, wait=None):
+        """
+        等待元素的文本中包含指定内容
         :param _type: 定位方式
         :param locate: 定位语句
-        :param wait: 等待时间,默认以秒为单位
+        :param text: 期望包含的文本
+        :param wait: 等待时间,默认以秒为单位,不填使用 Waiter 全局配置
         :return: None
         """
-        by_type = self._locator_mapping.get(_type.lower())
-        if by_type is None:
-            supported_locator = ', '.join(self._locator_mapping.keys())
-            message = f"定位方式（{_type}）错误, 支持的定位方式：({supported_locator})"
+        by_type = self._get_by(_type)
+        try:
+            Waiter(self.driver, wait).until(EC.text_to_be_present_in_element((by_type, locate), text), 'text')
+        except Exception as e:
+            message = f"等待元素 {_type}={locate} 出现文本 {text} 失败 ({e})"
             Logger.error(message)
-            raise ValueError(message)
+            raise ValueError(message) from e
+
+    @action('wait_count_stable')
+    def wait_count_stable(self, _type, locate, wait=None, stable=0.3):
+        """
+        等待匹配元素的数量在指定时间内不再变化，适用于逐步渲染的列表
+        :param _type: 定位方式
+        :param locate: 定位语句
+        :param wait: 等待时间,默认以秒为单位,不填使用 Waiter 全局配置
+        :param stable: 数量保持不变的时间（秒）
+        :return: 元素对象列表
+        """
+        by_type = self._get_by(_type)
+        state = {'count': None, 'since': 0.0, 'elements': []}
+
+        def count_stable(driver):
+            elements = driver.find_elements(by_type, locate)
+            now = time.monotonic()
+            if len(elements) != state['count']:
+                state.update(count=len(elements), since=now)
+            state['elements'] = elements
+            return now - state['since'] >= stable
+
+        try:
+            Waiter(self.driver, wait).until(count_stable, 'count_stable')
+            return state['elements']
+        except Exception as e:
+            message = f"等待元素 {_type}={locate} 数量稳定失败 ({e})"
+            Logger.error(message)
+            raise ValueError(message) from e
+
+    def _ensure_script_timeout(self, timeout):
+        """
+        保证异步脚本超时时间大于本次等待时间，仅在需要时才请求浏览器驱动修改
+        :param timeout: 本次等待时间（秒）
+        :return: None
+        """
+        if self._script_timeout < timeout + 1:
+            self.driver.set_script_timeout(timeout + 1)
+            self._script_timeout = timeout + 1
+
+    @action('wait_until_ready', locator=False)
+    def wait_until_ready(self, wait=None, network_idle=True, idle=0.5, dom_quiet=None):
+        """
+        等待页面就绪：document.readyState 为 complete，页面内 fetch/XHR 请求全部完成并保持空闲，
+        可选等待 DOM 在一段时间内不再变化，用于替代固定时间的 sleep
+        :param wait: 等待时间,默认以秒为单位,不填使用 Waiter 全局配置
+        :param network_idle: 是否等待 fetch/XHR 请求全部完成
+        :param idle: 请求全部完成后需要保持空闲的时间（秒）
+        :param dom_quiet: DOM 保持不变的时间（秒），不填则不等待
+        :return: None
+        """
+        timeout = Waiter.timeout if wait is None else wait
+        start = time.monotonic()
+
+        def page_ready(driver):
+            ready_state, pending, quiet_ms = driver.execute_script(NETWORK_STATE_JS)
+            if ready_state != 'complete':
+                return False
+            return not network_idle or (pending == 0 and quiet_ms >= idle * 1000)
+
+        try:
+            Waiter(self.driver, timeout).until(page_ready, 'page_ready')
+            if dom_quiet is not None:
+                remaining = max(timeout - (time.monotonic() - start), 0)
+                self._ensure_script_timeout(remaining)
+                if not self.driver.execute_async_script(DOM_QUIET_JS, int(dom_quiet * 1000), int(remaining * 1000)):
+                    raise TimeoutException(f"DOM 在 {timeout} 秒内未能保持 {dom_quiet} 秒不变")
+            Logger.debug('页面已就绪，耗时 {:.3f} 秒', time.monotonic() - start)
+        except Exception as e:
+            message = f'等待页面就绪失败 ({e})'
+            Logger.error(message)
+            raise ValueError(message) from e
+
+    @action('wait_for_title_contains', locator=False)
+    def wait_for_title_contains(self, text, wait=None):
+        """
+        等待页面标题包含指定内容
+        :param text: 期望包含的文本
+        :param wait: 等待时间,默认以秒为单位,不填使用 Waiter 全局配置
+        :return: 页面标题
+        """
+        try:
+            Waiter(self.driver, wait).until(EC.title_contains(text), 'title')
+            return self.get_title()
+        except Exception as e:
+            message = f'等待页面标题包含 {text} 失败，当前标题：{self.driver.title} ({e})'
+            Logger.error(message)
+            raise ValueError(message) from e
+
+    @action('wait_for_url_change', locator=False)
+    def wait_for_url_change(self, url, wait=None):
+        """
+        等待页面地址从指定地址变为其他地址，通常在点击跳转前先记录 current_url
+        :param url: 跳转前的地址
+        :param wait: 等待时间,默认以秒为单位,不填使用 Waiter 全局配置
+        :return: 新的页面地址
+        """
+        try:
+            Waiter(self.driver, wait).until(EC.url_changes(url), 'url')
+            current_url = self.driver.current_url
+            self.clear_element_cache()
+            Logger.debug('页面地址已变为：{}', current_url)
+            return current_url
+        except Exception as e:
+            message = f'等待页面地址从 {url} 变化失败 ({e})'
+            Logger.error(message)
+            raise ValueError(message) from e
+
+    def cached_element(self, _type, locate, wait=None, condition='presence'):
+        """
+        优先从缓存中获取元素，未命中时显示等待定位并写入缓存，复用等待返回的元素，避免再次查找
+        :param _type: 定位方式
+        :param locate: 定位语句
+        :param wait: 等待时间,默认以秒为单位
+        :param condition: 等待条件，参见 element_wait；缓存中的元素只满足更弱的条件（如 presence 定位的元素用于 clickable）时，
+            直接对缓存的元素等待该条件，不重新查找
+        :return: 元素对象
+        """
+        key = (self._get_by(_type), locate)
+        element = self._element_cache.get(key)
+        if element is None:
+            element = self.element_wait(_type, locate, wait, condition)
+            self._element_cache[key] = element
+            self._element_conditions[key] = condition
+        elif self._condition_rank[condition] > self._condition_rank[self._element_conditions.get(key, 'presence')]:
+            element = self._wait_cached_element(element, _type, locate, wait, condition)
+            self._element_conditions[key] = condition
+        return element
+
+    def _wait_cached_element(self, element, _type, locate, wait, condition):
+        # 元素失效时立即抛出 StaleElementReferenceException，由调用方重新定位，不等到超时
+        waiter = Waiter(self.driver, wait)
+        waiter.ignored_exceptions = ()
         try:
-            WebDriverWait(self.driver, wait, 1).until(EC.presence_of_element_located((by_type, locate)))
+            return waiter.until(self._element_condition_mapping[condition](element), condition)
+        except StaleElementReferenceException:
+            raise
         except Exception as e:
             message = f"等待元素时发生错误，定位方式：({_type}), 定位表达式：({locate}), 错误信息：({e})"
             Logger.error(message)
             raise ValueError(message) from e
 
+    def clear_element_cache(self, _type=None, locate=None):
+        """
+        清除元素缓存，不传参数时清空全部缓存
+        :param _type: 定位方式
+        :param locate: 定位语句
+        :return: None
+        """
+        if _type is None:
+            self._element_cache.clear()
+            self._element_conditions.clear()
+        else:
+            self._element_cache.pop((self._get_by(_type), locate), None)
+            self._element_conditions.pop((self._get_by(_type), locate), None)
+
+    def _on_elements(self, locators, operate, condition='presence'):
+        """
+        对缓存中的元素执行操作，元素已失效(StaleElementReferenceException)时重新定位后重试一次
+        :param locators: [(定位方式, 定位语句), ...]
+        :param operate: 接收元素对象的操作函数
+        :param condition: 等待条件，参见 cached_element
+        :return: 操作函数的返回值
+        """
+        try:
+            return operate(*[self.cached_element(_type, locate, condition=condition) for _type, locate in locators])
+        except StaleElementReferenceException:
+            for _type, locate in locators:
+                self.clear_element_cache(_type, locate)
+            return operate(*[self.cached_element(_type, locate, condition=condition) for _type, locate in locators])
+
+    def _on_element(self, _type, locate, operate, condition='presence'):
+        """
+        对单个缓存元素执行操作，参见 _on_elements
+        :param _type: 定位方式
+        :param locate: 定位语句
+        :param operate: 接收元素对象的操作函数
+        :param condition: 等待条件，参见 cached_element
+        :return: 操作函数的返回值
+        """
+        return self._on_elements([(_type, locate)], operate, condition)
+
     @staticmethod
-    def is_valid_address(url: str) -> bool:
+    def is_valid_address(url: str, fresh: bool = False) -> bool:
         """
-        判断url地址是否可以正常请求
+        判断url地址是否可以正常请求，使用共享的 LinkChecker（保持连接、HEAD 请求、结果缓存）
         :param url: 请求地址
+        :param fresh: 为 True 时不使用缓存的检查结果，重新请求地址（如检查刚刚上线或下线的地址）
         :return: True or False
         """
+        result = LinkChecker.shared().check(url, fresh=fresh)
+        if result['error']:
+            Logger.error(f'请求地址（{url}）异常: ({result["error"]})')
+        return result['status'] == 200
+
+    @action('check_links', locator=False)
+    def check_links(self):
+        """
+        并发检查当前页面中所有链接、图片、脚本、样式表的地址
+        :return: 检查失败的结果列表，参见 LinkChecker.check
+        """
         try:
-            rep = requests.get(url, timeout=5)  # 默认设置5秒超时
-            code = rep.status_code
-            return code == 200
+            results = LinkChecker.shared().audit(self.driver)
         except Exception as e:
-            message = f'请求地址（{url}）异常: ({e})'
+            message = f'检查页面地址失败 ({e})'
             Logger.error(message)
-            return False
+            raise ValueError(message) from e
+        broken = [result for result in results if not result['ok']]
+        for result in broken:
+            Logger.warning(f"地址无法访问：{result['url']} 状态码：{result['status']} {result['error'] or ''}")
+        return broken
 
     @staticmethod
     def sleep(s: float):
@@ -117,9 +424,10 @@ class BasePage:
             message = f"休眠时间必须是非负数值，请检查输入：({s})"
             Logger.error(message)
             raise ValueError(message)
-        Logger.debug(f'等待{s}秒')
+        Logger.debug('等待{}秒', s)
         time.sleep(s)
 
+    @action('open', locator=False)
     def open(self, url):
         """
         打开浏览器
@@ -130,12 +438,47 @@ class BasePage:
             url = 'https://' + url
         try:
             self.driver.get(url)
-            Logger.debug(f'打开网页: ({url})')
+            # 记录打开过的地址，浏览器归还浏览器池时清除这些域名的存储，参见 BrowserPool.reset
+            visited = getattr(self.driver, 'visited_urls', None)
+            if visited is None:
+                visited = self.driver.visited_urls = set()
+            visited.add(url)
+            self.clear_element_cache()
+            Logger.debug('打开网页: ({})', url)
+            self._collect_page_metrics('open')
         except Exception as e:
             message = f'无法打开网页 {url}: ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    def block_resources(self, patterns=(), resource_types=()):
+        """
+        通过 DevTools 协议拦截指定的 URL 和资源类型（图片、字体、统计脚本等），仅 Chromium 系浏览器生效
+        已有拦截规则时合并生效；页面对象只保留最后一次调用的策略，再次调用前先取消之前的策略
+        :param patterns: 需要拦截的 URL 匹配规则，* 为通配符
+        :param resource_types: 需要拦截的资源类型 image / font / media / analytics，
+            按 URL 扩展名匹配，没有扩展名的图片、字体 URL 不会被拦截
+        :return: ResourcePolicy
+        """
+        if self.resource_policy is not None:
+            self.resource_policy.clear(self.driver)
+        self.resource_policy = ResourcePolicy(patterns, resource_types)
+        self.resource_policy.apply(self.driver)
+        return self.resource_policy
+
+    def unblock_resources(self):
+        """
+        取消本页面对象的资源拦截，其他策略的规则继续生效
+        :return: 拦截统计，参见 ResourcePolicy.stats
+        """
+        if self.resource_policy is None:
+            return None
+        stats = self.resource_policy.collect(self.driver)
+        self.resource_policy.clear(self.driver)
+        self.resource_policy = None
+        Logger.debug('资源拦截统计: {}', stats)
+        return stats
+
     def set_max_window(self):
         """
         最大化浏览器
@@ -158,12 +501,13 @@ class BasePage:
         """
         try:
             self.driver.set_window_size(wide, high)
-            Logger.debug(f'设置窗孔大小：宽({wide})高({high})')
+            Logger.debug('设置窗孔大小：宽({})高({})', wide, high)
         except Exception as e:
             message = f'无法设置窗口大小: ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('send_key')
     def send_key(self, _type, locate, text):
         """
         输入文本
@@ -173,16 +517,64 @@ class BasePage:
         :return: None
         """
         try:
-            self.element_wait(_type, locate)
-            e1 = self.element(_type, locate)
-            e1.clear()
-            e1.send_keys(text)
-            Logger.debug(f'向元素 {_type}={locate} 输入文字：{text}')
+            def operate(e1):
+                e1.clear()
+                e1.send_keys(text)
+
+            self._on_element(_type, locate, operate, 'visible')
+            Logger.debug('向元素 {}={} 输入文字：{}', _type, locate, text)
         except Exception as e:
             message = f'无法在元素 {_type}={locate} 输入文字 {text}: ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('fill_form', locator=False)
+    def fill_form(self, fields, mode='keys', clear=True):
+        """
+        批量填写表单：一次 JS 调用定位（并清空）所有字段，再通过一个 W3C Actions 序列输入全部内容；
+        js 模式直接设置字段值并触发 input/change 事件，只需一次请求，适用于不需要模拟真实按键的场景
+        所有字段处理完后统一报告失败的字段
+        :param fields: {名称: (定位方式, 定位语句, 输入内容)}
+        :param mode: keys(模拟按键) / js(直接设置值)
+        :param clear: keys 模式下输入前是否清空字段
+        :return: None
+        """
+        if mode not in ('keys', 'js'):
+            message = f"填写模式（{mode}）错误, 支持的填写模式：(keys, js)"
+            Logger.error(message)
+            raise ValueError(message)
+        names = list(fields)
+        texts = [str(fields[name][2]) for name in names]
+        try:
+            specs = [[name, self._get_by(fields[name][0]), fields[name][1]] for name in names]
+            result = self.driver.execute_script(FILL_FORM_JS, specs, clear, texts if mode == 'js' else None)
+            # JS 对象的键都是字符串；页面在脚本执行中跳转等情况下结果可能不完整，缺少的字段按失败处理
+            entries = {name: result.get(str(name)) or (None, 'no result returned') for name in names}
+        except Exception as e:
+            message = f'批量定位表单字段失败 ({e})'
+            Logger.error(message)
+            raise ValueError(message) from e
+
+        failures = {name: error for name, (_, error) in entries.items() if error}
+        filled = [(name, text) for name, text in zip(names, texts) if name not in failures]
+        for name, _ in filled:
+            _type, locate, _ = fields[name]
+            self._element_cache[(self._get_by(_type), locate)] = entries[name][0]
+        if mode == 'keys' and filled:
+            try:
+                chains = ActionChains(self.driver)
+                for name, text in filled:
+                    chains.click(entries[name][0]).send_keys(text)
+                chains.perform()
+            except Exception as e:
+                failures.update({name: str(e) for name, _ in filled})
+        if failures:
+            detail = '; '.join(f'{name}: {error}' for name, error in failures.items())
+            message = f'批量填写表单失败的字段：{detail}'
+            Logger.error(message)
+            raise ValueError(message)
+        Logger.debug('批量填写表单字段：{}', ", ".join(names))
+
     @staticmethod
     def upload_files(filepath, sleep=1):
         """
@@ -200,12 +592,13 @@ class BasePage:
                 pyautogui.hotkey('ctrl', 'v')
                 time.sleep(sleep)
                 pyautogui.press('enter', presses=2)
-                Logger.debug(f'上传文件路径：{filepath}')
+                Logger.debug('上传文件路径：{}', filepath)
         except Exception as e:
             message = f'文件上传失败：{filepath} ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('clear')
     def clear(self, _type, locate):
         """
         清除元素中的内容
@@ -214,14 +607,14 @@ class BasePage:
         :return: None
         """
         try:
-            self.element_wait(_type, locate)
-            self.element(_type, locate).clear()
-            Logger.debug(f'清空元素 {_type}={locate} 的内容')
+            self._on_element(_type, locate, lambda e1: e1.clear(), 'visible')
+            Logger.debug('清空元素 {}={} 的内容', _type, locate)
         except Exception as e:
             message = f'无法清空元素 {_type}={locate} 的内容: ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('enter')
     def enter(self, _type, locate):
         """
         在元素上按回车键
@@ -230,14 +623,14 @@ class BasePage:
         :return: None
         """
         try:
-            self.element_wait(_type, locate)
-            self.element(_type, locate).send_keys(Keys.ENTER)
-            Logger.debug(f'在元素 {_type}={locate} 上按回车键')
+            self._on_element(_type, locate, lambda e1: e1.send_keys(Keys.ENTER), 'visible')
+            Logger.debug('在元素 {}={} 上按回车键', _type, locate)
         except Exception as e:
             message = f'无法在元素 {_type}={locate} 上按回车键: ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('click')
     def click(self, _type, locator):
         """
         在元素上单击
@@ -246,14 +639,57 @@ class BasePage:
         :return: None
         """
         try:
-            self.element_wait(_type, locator)
-            self.element(_type, locator).click()
-            Logger.debug(f'点击元素 {_type}={locator}')
+            self._on_element(_type, locator, lambda e1: e1.click(), 'clickable')
+            Logger.debug('点击元素 {}={}', _type, locator)
         except Exception as e:
             message = f'点击元素 {_type}={locator} 执行失败: ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    def _perform(self, build):
+        """
+        构建并执行动作链，录制手势时只追加到录制中的动作链，退出录制时统一执行
+        :param build: 接收 ActionChains 并追加动作的函数
+        :return: None
+        """
+        if self._gesture is not None:
+            build(self._gesture)
+            return
+        chains = ActionChains(self.driver)
+        build(chains)
+        chains.perform()
+
+    @contextmanager
+    def gestures(self):
+        """
+        录制手势：with 代码块中 right_click、double_click、move_element、move_offset_click、drag_and_drop
+        以及直接调用返回的 ActionChains 追加的动作，会在退出代码块时合并为一次 perform() 执行；
+        代码块中发生异常时丢弃录制的动作
+        用法：
+            with base.gestures() as g:
+                base.drag_and_drop('css', '#a', 'css', '#b')
+                base.right_click('css', '#b')
+                g.send_keys(Keys.ESCAPE)
+        :return: 录制中的 ActionChains
+        """
+        if self._gesture is not None:
+            message = '不支持嵌套录制手势'
+            Logger.error(message)
+            raise ValueError(message)
+        self._gesture = chains = ActionChains(self.driver)
+        try:
+            yield chains
+        finally:
+            self._gesture = None
+        try:
+            chains.perform()
+            Logger.debug('执行录制的手势')
+        except Exception as e:
+            message = f'执行录制的手势失败 ({e})'
+            Logger.error(message)
+            raise ValueError(message) from e
+
+    @action('right_click')
     def right_click(self, _type, locate):
         """
         右击
@@ -262,15 +698,16 @@ class BasePage:
         :return: None
         """
         try:
-            self.element_wait(_type, locate)
-            e1 = self.element(_type, locate)
-            ActionChains(self.driver).context_click(e1).perform()
-            Logger.debug(f'在元素 {_type}={locate} 上右击')
+            self._on_element(
+                _type, locate, lambda e1: self._perform(lambda chains: chains.context_click(e1)), 'clickable'
+            )
+            Logger.debug('在元素 {}={} 上右击', _type, locate)
         except Exception as e:
             message = f'无法在元素 {_type}={locate} 上右击: ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('double_click')
     def double_click(self, _type, locate):
         """
         双击
@@ -279,15 +716,16 @@ class BasePage:
         :return: None
         """
         try:
-            self.element_wait(_type, locate)
-            e1 = self.element(_type, locate)
-            ActionChains(self.driver).double_click(e1).perform()
-            Logger.debug(f'在元素 {_type}={locate} 上双击')
+            self._on_element(
+                _type, locate, lambda e1: self._perform(lambda chains: chains.double_click(e1)), 'clickable'
+            )
+            Logger.debug('在元素 {}={} 上双击', _type, locate)
         except Exception as e:
             message = f'无法在元素 {_type}={locate} 上双击: ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('move_element')
     def move_element(self, _type, locate):
         """
         移动鼠标到目标位置
@@ -296,15 +734,16 @@ class BasePage:
         :return: None
         """
         try:
-            self.element_wait(_type, locate)
-            e1 = self.element(_type, locate)
-            ActionChains(self.driver).move_to_element(e1).perform()
-            Logger.debug(f'鼠标移动到元素 {_type}={locate}')
+            self._on_element(
+                _type, locate, lambda e1: self._perform(lambda chains: chains.move_to_element(e1)), 'visible'
+            )
+            Logger.debug('鼠标移动到元素 {}={}', _type, locate)
         except Exception as e:
             message = f'无法将鼠标移动到元素 {_type}={locate}: ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('move_offset_click', locator=False)
     def move_offset_click(self, x_coordinate, y_coordinate, left_click=True):
         """
         移动鼠标到指定坐标然后点击
@@ -313,19 +752,22 @@ class BasePage:
         :param left_click: bool 左键(True)或right(False)点击，不填默认左键
         :return: None
         """
+        def build(chains):
+            chains.move_by_offset(x_coordinate, y_coordinate)
+            chains.click() if left_click else chains.context_click()
+            # 点击后移回原位置，与点击在同一个动作序列中执行
+            chains.move_by_offset(-x_coordinate, -y_coordinate)
+
         try:
-            action = ActionChains(self.driver).move_by_offset(x_coordinate, y_coordinate)
-            action.click() if left_click else action.context_click()
-            action.perform()
+            self._perform(build)
             button = 'left' if left_click else 'right'
-            Logger.debug(f'{button}点击坐标 ({x_coordinate}, {y_coordinate})')
+            Logger.debug('{}点击坐标 ({}, {})', button, x_coordinate, y_coordinate)
         except Exception as e:
             message = f'无法点击坐标 ({x_coordinate}, {y_coordinate}): ({e})'
             Logger.error(message)
             raise ValueError(message) from e
-        finally:
-            ActionChains(self.driver).move_by_offset(-x_coordinate, -y_coordinate).perform()
 
+    @action('drag_and_drop')
     def drag_and_drop(self, _type1, e1, _type2, e2):
         """
         拖动一个元素到另一个元素位置
@@ -336,15 +778,17 @@ class BasePage:
         :return: None
         """
         try:
-            source_element = self.element_wait(_type1, e1) and self.element(_type1, e1)
-            target_element = self.element_wait(_type2, e2) and self.element(_type2, e2)
-            ActionChains(self.driver).drag_and_drop(source_element, target_element).perform()
-            Logger.debug(f'将元素 {_type1}={e1} 拖动到元素 {_type2}={e2}')
+            self._on_elements(
+                [(_type1, e1), (_type2, e2)],
+                lambda source, target: self._perform(lambda chains: chains.drag_and_drop(source, target))
+            )
+            Logger.debug('将元素 {}={} 拖动到元素 {}={}', _type1, e1, _type2, e2)
         except Exception as e:
             message = f'无法将元素 {_type1}={e1} 拖动到元素 {_type2}={e2}: ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('click_text', locator=False)
     def click_text(self, text):
         """
         点击文字
@@ -352,13 +796,14 @@ class BasePage:
         :return: None
         """
         try:
-            self.element("lt", text).click()
-            Logger.debug(f'点击链接：{text}')
+            self._on_element("lt", text, lambda e1: e1.click(), 'clickable')
+            Logger.debug('点击链接：{}', text)
         except Exception as e:
             message = f'无法点击链接：{text} ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('close', locator=False)
     def close(self):
         """
         关闭当前页面
@@ -366,6 +811,7 @@ class BasePage:
         """
         try:
             self.driver.close()
+            self.clear_element_cache()
             Logger.debug('关闭当前页面')
         except Exception as e:
             message = f'无法关闭当前页面 ({e})'
@@ -385,6 +831,7 @@ class BasePage:
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('f5', locator=False)
     def f5(self):
         """
         刷新
@@ -392,12 +839,15 @@ class BasePage:
         """
         try:
             self.driver.refresh()
+            self.clear_element_cache()
             Logger.debug('刷新页面')
+            self._collect_page_metrics('f5')
         except Exception as e:
             message = f'无法刷新页面 ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('back', locator=False)
     def back(self):
         """
         页面后退
@@ -405,12 +855,15 @@ class BasePage:
         """
         try:
             self.driver.back()
+            self.clear_element_cache()
             Logger.debug('页面后退')
+            self._collect_page_metrics('back')
         except Exception as e:
             message = f'无法后退页面 ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('forward', locator=False)
     def forward(self):
         """
         页面向前
@@ -418,12 +871,48 @@ class BasePage:
         """
         try:
             self.driver.forward()
+            self.clear_element_cache()
             Logger.debug('页面向前')
+            self._collect_page_metrics('forward')
         except Exception as e:
             message = f'无法向前页面 ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    def _collect_page_metrics(self, trigger):
+        """
+        启用了 PageMetrics 采集器时读取当前页面的性能指标
+        :param trigger: 触发采集的操作
+        :return: None
+        """
+        if PageMetrics.active is not None:
+            PageMetrics.active.collect(self.driver, trigger)
+
+    @action('assert_page_budget', locator=False)
+    def assert_page_budget(self, lcp_ms=None, fcp_ms=None, cls=None, load_ms=None, transfer_kb=None, requests=None):
+        """
+        断言当前页面的性能指标不超出预算，使用本次导航采集的指标，没有采集时立即读取
+        :param lcp_ms: 最大内容绘制时间（毫秒）
+        :param fcp_ms: 首次内容绘制时间（毫秒）
+        :param cls: 累积布局偏移
+        :param load_ms: load 事件完成时间（毫秒）
+        :param transfer_kb: 文档和资源的传输大小（KB）
+        :param requests: 请求数（文档和资源）
+        :return: 页面性能指标
+        """
+        collector = PageMetrics.active
+        metrics = collector.latest(self.driver.current_url) if collector is not None else None
+        if metrics is None:
+            metrics = PageMetrics.read(self.driver)
+        exceeded = PageMetrics.check_budget(metrics, lcp_ms, fcp_ms, cls, load_ms, transfer_kb, requests)
+        if exceeded:
+            message = f"页面性能超出预算：{metrics['url']} ({', '.join(exceeded)})"
+            Logger.error(message)
+            raise AssertionError(message)
+        Logger.debug('页面性能未超出预算：{}', metrics['url'])
+        return metrics
+
+    @action('scroll_top', locator=False)
     def scroll_top(self):
         """
         滚动至顶部
@@ -437,6 +926,7 @@ class BasePage:
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('scroll_bottom', locator=False)
     def scroll_bottom(self):
         """
         滚动至底部
@@ -450,6 +940,7 @@ class BasePage:
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('js', locator=False)
     def js(self, script):
         """
         执行js
@@ -458,12 +949,13 @@ class BasePage:
         """
         try:
             self.driver.execute_script(script)
-            Logger.debug(f'执行JS语句：{script}')
+            Logger.debug('执行JS语句：{}', script)
         except Exception as e:
             message = f'执行JS语句失败：{script} ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('get_attribute')
     def get_attribute(self, _type, locate, attribute):
         """
         获取元素属性的值
@@ -473,15 +965,15 @@ class BasePage:
         :return: 属性值
         """
         try:
-            self.element_wait(_type, locate)
-            value = self.element(_type, locate).get_attribute(attribute)
-            Logger.debug(f'获取元素 {_type}={locate} 的属性 {attribute} 值为：{value}')
+            value = self._on_element(_type, locate, lambda e1: e1.get_attribute(attribute))
+            Logger.debug('获取元素 {}={} 的属性 {} 值为：{}', _type, locate, attribute, value)
             return value
         except Exception as e:
             message = f'获取元素 {_type}={locate} 的属性 {attribute} 值失败 ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('get_ele_text')
     def get_ele_text(self, _type, locate):
         """
         返回元素的文本
@@ -490,46 +982,159 @@ class BasePage:
         :return: 元素的文本
         """
         try:
-            text = self.element(_type, locate).text
-            Logger.debug(f'获取元素 {_type}={locate} 的文本为：{text}')
+            text = self._on_element(_type, locate, lambda e1: e1.text)
+            Logger.debug('获取元素 {}={} 的文本为：{}', _type, locate, text)
             return text
         except Exception as e:
             message = f'获取元素 {_type}={locate} 的文本失败 ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('read_many', locator=False)
+    def read_many(self, fields, allow_missing=False):
+        """
+        通过一次 JS 调用批量读取多个元素的文本或属性，不做等待，需要时先调用 element_wait
+        :param fields: {名称: (定位方式, 定位语句, 'text' 或属性名)}，省略第三项时读取文本
+        :param allow_missing: 元素不存在时返回 None，否则抛出异常并列出所有不存在的元素
+        :return: {名称: 文本或属性值}
+        """
+        try:
+            specs = []
+            for name, field in fields.items():
+                _type, locate, attribute = field if len(field) == 3 else (*field, 'text')
+                specs.append([name, self._get_by(_type), locate, attribute])
+            result = self.driver.execute_script(READ_MANY_JS, specs)
+        except Exception as e:
+            message = f'批量读取元素失败 ({e})'
+            Logger.error(message)
+            raise ValueError(message) from e
+        missing = [name for name, (found, _) in result.items() if not found]
+        if missing and not allow_missing:
+            message = f'批量读取元素失败，以下元素不存在：{", ".join(missing)}'
+            Logger.error(message)
+            raise ValueError(message)
+        values = {name: value for name, (_, value) in result.items()}
+        Logger.debug('批量读取元素：{}', values)
+        return values
+
+    @action('read_elements')
+    def read_elements(self, _type, locate, attributes=()):
+        """
+        通过一次 JS 调用将所有匹配元素转换为结构化记录，避免逐个元素读取 .text
+        :param _type: 定位方式
+        :param locate: 定位语句
+        :param attributes: 需要读取的属性名列表
+        :return: [{'text': 文本, 'attributes': {属性名: 值}, 'rect': {x, y, width, height}}, ...]
+        """
+        try:
+            records = self.driver.execute_script(READ_ELEMENTS_JS, None, self._get_by(_type), locate, list(attributes))
+            Logger.debug('读取元素 {}={} 共 {} 条记录', _type, locate, len(records))
+            return records
+        except Exception as e:
+            message = f'读取元素 {_type}={locate} 的记录失败 ({e})'
+            Logger.error(message)
+            raise ValueError(message) from e
+
+    def to_records(self, elements, attributes=()):
+        """
+        通过一次 JS 调用将 elements() 返回的元素列表转换为结构化记录，参见 read_elements
+        :param elements: 元素对象列表
+        :param attributes: 需要读取的属性名列表
+        :return: [{'text': 文本, 'attributes': {属性名: 值}, 'rect': {x, y, width, height}}, ...]
+        """
+        if not elements:
+            return []
+        try:
+            return self.driver.execute_script(READ_ELEMENTS_JS, list(elements), None, None, list(attributes))
+        except Exception as e:
+            message = f'读取元素记录失败 ({e})'
+            Logger.error(message)
+            raise ValueError(message) from e
+
+    @action('get_title', locator=False)
     def get_title(self):
         """
         获取title
         :return: 页面标题
         """
         title = self.driver.title
-        Logger.debug(f'获取页面标题：{title}')
+        Logger.debug('获取页面标题：{}', title)
         return title
 
-    def get_screen(self, doc, img_report=True):
+    @action('get_screen', locator=False)
+    def get_screen(self, doc, img_report=True, _type=None, locate=None):
         """
-        截取当前界面图片
+        截取当前界面图片，传入定位时只截取该元素；截图交给 ScreenshotStore 在后台线程中写入（按内容去重），
+        需要添加到报告的截图在测试结束时统一添加
         :param doc: str 名称
         :param img_report: bool 图片追加到测试报告 默认添加到报告
-        :return: 截图文件路径
+        :param _type: 定位方式，只截取元素时填写
+        :param locate: 定位语句，只截取元素时填写
+        :return: 截图文件路径（后台写入，需要立即读取时先调用 ScreenshotStore.shared().flush()）
         """
         try:
-            filename = doc + "_" + str(round(time.time() * 1000)) + ".png"
-            if len(filename) >= 200:
-                filename = str(round(time.time() * 1000)) + ".png"
-            filepath = os.path.join(PROPER_SCREEN_DIR, filename)
-
-            self.driver.save_screenshot(filepath)
-            if img_report:
-                allure.attach.file(filepath, name=filename, attachment_type=allure.attachment_type.PNG)
-            Logger.debug(f"截图成功已经存储在: {filepath}")
+            if _type is not None:
+                png = self._on_element(_type, locate, lambda e1: e1.screenshot_as_png, condition='visible')
+            else:
+                png = self.driver.get_screenshot_as_png()
+            name = doc + "_" + str(round(time.time() * 1000)) + ".png"
+            filepath = ScreenshotStore.shared().submit(png, name=name[-200:], attach=img_report)
+            Logger.debug("截图成功，将存储在: {}", filepath)
             return filepath
         except Exception as e:
             message = f'截取当前界面图片失败：{doc} ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('visual_assert', locator=False)
+    def visual_assert(self, name, element=None, tolerance=8, ignore_regions=(), max_diff_ratio=0.0,
+                      anti_aliasing=True):
+        """
+        截图与 DIFF_IMG_PATH 下的基准图片 {name}.png 对比，基准图片不存在（或设置了 UI_VISUAL_UPDATE=1）时保存为基准图片
+        不一致时把实际图片、基准图片和差异图添加到 Allure 报告，参见 VisualDiff
+        :param name: 基准图片名称
+        :param element: 只截取元素时填写 (定位方式, 定位语句)
+        :param tolerance: 每个颜色通道允许的差异（0-255）
+        :param ignore_regions: 忽略的区域 [(x, y, 宽, 高), ...]，坐标为截图中的像素
+        :param max_diff_ratio: 允许的差异像素比例
+        :param anti_aliasing: 是否忽略抗锯齿造成的差异
+        :return: 对比结果，图片与基准图片完全相同或新保存基准图片时为 None
+        """
+        # numpy 和 Pillow 只在图片对比时才导入
+        from utils.visual_diff import VisualDiff
+        try:
+            if element is not None:
+                png = self._on_element(*element, lambda e1: e1.screenshot_as_png, condition='visible')
+            else:
+                png = self.driver.get_screenshot_as_png()
+            baseline_path = os.path.join(DIFF_IMG_PATH, f'{name}.png')
+            passed, result, actual, expected = VisualDiff.assert_matches(
+                png, baseline_path, update=VISUAL_UPDATE_BASELINES, max_diff_ratio=max_diff_ratio,
+                tolerance=tolerance, ignore_regions=ignore_regions, anti_aliasing=anti_aliasing,
+            )
+        except Exception as e:
+            message = f'图片对比失败：{name} ({e})'
+            Logger.error(message)
+            raise ValueError(message) from e
+        if passed:
+            Logger.debug('图片与基准图片一致：{}', name)
+            return result
+        import allure
+        diff = VisualDiff.encode(VisualDiff.diff_image(actual, expected, result['mask']))
+        with open(baseline_path, 'rb') as f:
+            allure.attach(f.read(), name=f'{name}_expected', attachment_type=allure.attachment_type.PNG)
+        allure.attach(png, name=f'{name}_actual', attachment_type=allure.attachment_type.PNG)
+        allure.attach(diff, name=f'{name}_diff', attachment_type=allure.attachment_type.PNG)
+        if result['same_size']:
+            message = (f"图片与基准图片不一致：{name}，差异像素 {result['diff_pixels']} "
+                       f"({result['diff_ratio']:.4%})，忽略抗锯齿像素 {result['aa_pixels']}")
+        else:
+            message = (f'图片与基准图片尺寸不同：{name}，实际 {actual.shape[1]}x{actual.shape[0]}，'
+                       f'基准 {expected.shape[1]}x{expected.shape[0]}')
+        Logger.error(message)
+        raise AssertionError(message)
+
+    @action('alert_accept', locator=False)
     def alert_accept(self):
         """
         alert点确认
@@ -543,6 +1148,7 @@ class BasePage:
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('alert_dismiss', locator=False)
     def alert_dismiss(self):
         """
         alert点取消
@@ -556,6 +1162,7 @@ class BasePage:
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('switch_to_frame')
     def switch_to_frame(self, _type, locate):
         """
         进入frame
@@ -564,15 +1171,15 @@ class BasePage:
         :return: None
         """
         try:
-            self.element_wait(_type, locate)
-            frame_element = self.element(_type, locate)
-            self.driver.switch_to.frame(frame_element)
-            Logger.debug(f'进入frame：{_type}={locate}')
+            self._on_element(_type, locate, self.driver.switch_to.frame)
+            self.clear_element_cache()
+            Logger.debug('进入frame：{}={}', _type, locate)
         except Exception as e:
             message = f'进入frame失败：{_type}={locate} ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('switch_to_default_content', locator=False)
     def switch_to_default_content(self):
         """
         跳出frame
@@ -580,12 +1187,14 @@ class BasePage:
         """
         try:
             self.driver.switch_to.default_content()
+            self.clear_element_cache()
             Logger.debug("跳出frame")
         except Exception as e:
             message = '跳出frame失败 ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('get_selected')
     def get_selected(self, _type, locate, value_index, index=None):
         """
         通过index获取我们selected，然后选择我们selected
@@ -596,14 +1205,17 @@ class BasePage:
         :return: None
         """
         try:
-            selected_element = self.elements(_type, locate)[index] if index is not None else self.element(_type, locate)
-            Select(selected_element).select_by_index(value_index)
-            Logger.debug(f'选择元素 {_type}={locate} 的选项索引 {value_index}')
+            if index is not None:
+                Select(self.elements(_type, locate)[index]).select_by_index(value_index)
+            else:
+                self._on_element(_type, locate, lambda e1: Select(e1).select_by_index(value_index))
+            Logger.debug('选择元素 {}={} 的选项索引 {}', _type, locate, value_index)
         except Exception as e:
             message = f'选择元素 {_type}={locate} 的选项索引 {value_index} 失败 ({e})'
             Logger.error(message)
             raise ValueError(message) from e
 
+    @action('high_light')
     def high_light(self, _type, locate, style="background: yellow; border: 2px solid red;"):
         """
         高亮显示选中元素
@@ -613,9 +1225,11 @@ class BasePage:
         :return: None
         """
         try:
-            element = self.element(_type, locate)
-            self.driver.execute_script("arguments[0].setAttribute('style', arguments[1]);", element, style)
-            Logger.debug(f'高亮显示元素 {_type}={locate}')
+            self._on_element(
+                _type, locate,
+                lambda e1: self.driver.execute_script("arguments[0].setAttribute('style', arguments[1]);", e1, style)
+            )
+            Logger.debug('高亮显示元素 {}={}', _type, locate)
         except Exception as e:
             message = f'高亮显示元素 {_type}={locate} 失败 ({e})'
             Logger.error(message)
@@ -653,7 +1267,7 @@ class BasePage:
                 pyautogui.typewrite("y")
 
                 time.sleep(2)
-                Logger.debug(f'图片路径为{pic_dir}')
+                Logger.debug('图片路径为{}', pic_dir)
                 return pic_dir
             else:
                 Logger.error('图片另存为功能仅支持Windows平台')
@@ -663,21 +1277,23 @@ class BasePage:
             Logger.error(message)
             raise ValueError(message) from e
 
-    def get_capt(self, _type, locate, filename):
+    @action('get_capt')
+    def get_capt(self, _type, locate, filename=None):
         """
-        使用OCR获取验证码
+        使用OCR获取验证码：直接截取验证码元素的图片（内存中，不依赖操作系统的另存为对话框），识别引擎在进程内只加载一次
         :param _type: 定位类型
         :param locate: 定位器
-        :param filename: 图片名称
+        :param filename: 图片名称，填写时同时把验证码图片保存到截图目录，便于排查识别错误
         :return: 识别的文本
         """
         try:
-            ocr = ddddocr.DdddOcr()
-            with open(self.save_as_img(_type, locate, filename), 'rb') as f:
-                image = f.read()
-            res = ocr.classification(image)
-            r = res.lower()
-            Logger.debug(f"验证码: {r}")
+            image = self._on_element(_type, locate, lambda e1: e1.screenshot_as_png, condition='visible')
+            if filename:
+                os.makedirs(PROPER_SCREEN_DIR, exist_ok=True)
+                with open(os.path.join(PROPER_SCREEN_DIR, f'{filename}.png'), 'wb') as f:
+                    f.write(image)
+            r = Ocr.classify(image).lower()
+            Logger.debug("验证码: {}", r)
             return r
         except Exception as e:
             message = f'获取验证码失败 ({e})'
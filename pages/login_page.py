@@ -20,6 +20,8 @@ class LoginPage(BasePage):
         login_button.click()
 
     def login(self, username, password):
-        self.enter_username(username)
-        self.enter_password(password)
+        self.fill_form({
+            'username': (*self.USERNAME_INPUT, username),
+            'password': (*self.PASSWORD_INPUT, password),
+        })
         self.click_login_button()
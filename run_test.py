@@ -2,7 +2,8 @@ import subprocess
 import os
 import sys
 from datetime import datetime
-from config.pathconf import PROPER_ALLURE_DIR
+from config.pathconf import PROPER_ALLURE_DIR, TREND_DB, TREND_HISTORY, TREND_GATE
+from utils.trend_store import TrendStore
 
 
 def run_tests():
@@ -15,6 +16,9 @@ def run_tests():
     os.makedirs(allure_results_dir, exist_ok=True)
     os.makedirs(allure_report_dir, exist_ok=True)
 
+    # 测试进程通过 UI_RUN_ID 把性能数据写入趋势数据库
+    os.environ['UI_RUN_ID'] = now
+
     # 构建命令
     pytest_cmd = f"{sys.executable} -m pytest --alluredir={allure_results_dir}"
     allure_cmd = f"allure generate {allure_results_dir} -o {allure_report_dir} --clean"
@@ -34,6 +38,26 @@ def run_tests():
     # 打开 Allure 报告
     print(f"Allure报告已生成在: {allure_report_dir}")
 
+    # 测试结束后才打开趋势数据库：登记本次运行并与最近几次运行对比性能
+    store = TrendStore(TREND_DB)
+    try:
+        store.add_run(now, _git_commit())
+        regressions = store.compare(now, last=TREND_HISTORY)
+    finally:
+        store.close()
+    for r in regressions:
+        print(f"性能回归：{r['test']} {r['name']}: {r['value']} (中位数 {r['median']}, z={r['z']})")
+    if regressions and TREND_GATE:
+        sys.exit(1)
+
+
+def _git_commit():
+    try:
+        return subprocess.run('git rev-parse --short HEAD', shell=True, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except subprocess.CalledProcessError:
+        return None
+
 
 if __name__ == '__main__':
     run_tests()
@@ -1,9 +1,153 @@
+import os
+import json
+import allure
 import pytest
-from config.pathconf import BROWSER_NAME
-from utils.webdriver_factory import WebDriverFactory
+from config.pathconf import (
+    BROWSER_NAME, BROWSER_POOL_SIZE, BROWSER_POOL_MAX_LEASES,
+    NETWORK_MODE, NETWORK_CASSETTE, NETWORK_IGNORE_PARAMS, HAR_DIR,
+    EVENT_LOG_ENABLED, EVENT_LOG_DIR, PROFILE_ENABLED, PROFILE_DIR,
+    PAGE_METRICS_ENABLED, PAGE_METRICS_DIR, TREND_RUN_ID, TREND_DB,
+    TRACE_ENABLED, TRACE_DIR, TRACE_STEPS, TRACE_SCREENSHOTS,
+)
+from utils.browser_pool import BrowserPool
+from utils.command_tracer import CommandTracer
+from utils.resource_policy import ResourcePolicy
+from utils.network_replay import NetworkReplay
+from utils.event_log import EventLog
+from utils.step_profiler import StepProfiler
+from utils.page_metrics import PageMetrics
+from utils.trend_store import TrendRun, TrendStore
+from utils.screenshot_store import ScreenshotStore
+from utils.trace_recorder import TraceRecorder
 from utils.logger import Logger
 from pages.base_page import BasePage
 from pages.baidu_homepage_page import BaiduHomePage
+from pages.login_page import LoginPage
+
+
+@pytest.fixture(scope="session", autouse=True)
+def event_log():
+    # 开启 UI_EVENT_LOG=1 时记录页面操作的结构化事件，使用 python -m utils.event_query 查询
+    if not EVENT_LOG_ENABLED:
+        yield None
+        return
+    log = EventLog(EVENT_LOG_DIR).start()
+    yield log
+    log.close()
+
+
+@pytest.fixture(scope="session")
+def page_metrics():
+    # 开启 UI_PAGE_METRICS=1 时在页面跳转后采集页面性能指标，结束时写入 PAGE_METRICS_DIR
+    if not PAGE_METRICS_ENABLED:
+        yield None
+        return
+    collector = PageMetrics(PAGE_METRICS_DIR).start()
+    yield collector
+    collector.stop()
+
+
+@pytest.fixture(autouse=True)
+def attach_page_metrics(request, page_metrics):
+    yield
+    if page_metrics is None:
+        return
+    records = page_metrics.for_test(request.node.nodeid)
+    if records:
+        allure.attach(json.dumps(records, ensure_ascii=False, indent=2), name="页面性能指标",
+                      attachment_type=allure.attachment_type.JSON)
+
+
+@pytest.fixture(scope="session")
+def step_profiler():
+    # 开启 UI_PROFILE=1 时统计页面对象各方法的耗时，结束时写入 PROFILE_DIR
+    if not PROFILE_ENABLED:
+        yield None
+        return
+    profiler = StepProfiler(PROFILE_DIR).instrument(BasePage, LoginPage, BaiduHomePage)
+    yield profiler
+    profiler.uninstrument()
+    profiler.write()
+
+
+@pytest.fixture(autouse=True)
+def profile_test_steps(step_profiler):
+    if step_profiler is None:
+        yield
+        return
+    step_profiler.start_test()
+    yield
+    with allure.step("页面对象耗时统计"):
+        allure.attach(step_profiler.test_summary(), name="页面对象耗时", attachment_type=allure.attachment_type.TEXT)
+
+
+@pytest.fixture(scope="session")
+def trend_run():
+    # run_test.py 设置了运行 id 时记录每个测试的耗时、页面对象方法耗时和页面性能指标，结束时写入 TREND_DB
+    if not TREND_RUN_ID:
+        yield None
+        return
+    run = TrendRun(TREND_RUN_ID)
+    yield run
+    store = TrendStore(TREND_DB)
+    store.save(run)
+    store.close()
+
+
+@pytest.fixture(autouse=True)
+def record_trend(request, trend_run, step_profiler, page_metrics):
+    yield
+    report = getattr(request.node, "rep_call", None)
+    if trend_run is None or report is None:
+        return
+    trend_run.add_test(
+        request.node.nodeid, report.outcome, report.duration,
+        steps=step_profiler.test_rows() if step_profiler is not None else None,
+        page_metrics=page_metrics.for_test(request.node.nodeid) if page_metrics is not None else (),
+    )
+
+
+@pytest.fixture(autouse=True)
+def attach_screenshots():
+    # 测试中的截图在后台写入，测试结束时再添加到 Allure 报告
+    yield
+    for path, name in ScreenshotStore.shared().take_pending():
+        allure.attach.file(path, name=name, attachment_type=allure.attachment_type.PNG)
+
+
+@pytest.fixture(scope="session")
+def trace_recorder():
+    # 开启 UI_TRACE=1 时在内存中记录最近的页面操作步骤，测试失败时才写入 TRACE_DIR
+    if not TRACE_ENABLED:
+        yield None
+        return
+    recorder = TraceRecorder(TRACE_DIR, size=TRACE_STEPS, screenshots=TRACE_SCREENSHOTS).start()
+    yield recorder
+    recorder.stop()
+
+
+@pytest.fixture(autouse=True)
+def record_failure_trace(request, trace_recorder):
+    if trace_recorder is None:
+        yield
+        return
+    trace_recorder.start_test()
+    yield
+    if _test_failed(request.node):
+        path = trace_recorder.dump(request.node.nodeid, getattr(request.node, "execution_count", 1))
+        if path is not None:
+            allure.attach.file(path, name="失败追踪", extension="zip")
+
+
+@pytest.fixture(autouse=True)
+def capture_test_log(request):
+    # 测试日志先保存在内存中，只有测试失败（包括会被重试的失败）时才写入磁盘并添加到 Allure 报告
+    Logger.start_capture()
+    yield
+    if _test_failed(request.node):
+        content = Logger.dump_capture(request.node.nodeid)
+        allure.attach(content, name="测试日志", attachment_type=allure.attachment_type.TEXT)
+    Logger.stop_capture()
 
 
 @pytest.fixture(autouse=True)
@@ -19,17 +163,101 @@ def log_test_rerun(request):
         Logger.warning(f"重试测试（第{rerun - 1}次）：{node_id}")
 
 
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    # 保存每个阶段的测试结果，供 fixture 在清理时判断测试是否失败
+    outcome = yield
+    report = outcome.get_result()
+    setattr(item, f"rep_{report.when}", report)
+    recorder = item.funcargs.get("trace_recorder")
+    if recorder is not None and report.when == "call" and report.failed:
+        # 失败追踪的 HTML 片段在浏览器归还浏览器池（重置状态）之前读取
+        recorder.resolve_snippets()
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    # 统计测试执行期间浏览器驱动的命令数，添加到 Allure 报告，并检查 @pytest.mark.max_roundtrips 的限制
+    driver_instance = item.funcargs.get("driver")
+    tracer = getattr(driver_instance, "command_tracer", None)
+    if tracer is None:
+        return (yield)
+    window = tracer.window()
+    result = yield
+    summary = window.summary()
+    allure.attach(json.dumps(summary, ensure_ascii=False, indent=2), name="浏览器驱动命令统计",
+                  attachment_type=allure.attachment_type.JSON)
+    Logger.info(f"浏览器驱动命令：{item.nodeid} 共 {summary['count']} 次，耗时 {summary['total_ms']} 毫秒")
+    marker = item.get_closest_marker("max_roundtrips")
+    if marker is not None and summary["count"] > marker.args[0]:
+        pytest.fail(f"浏览器驱动命令 {summary['count']} 次，超过限制 {marker.args[0]} 次", pytrace=False)
+    return result
+
+
+def _test_failed(node):
+    reports = (getattr(node, f"rep_{when}", None) for when in ("setup", "call"))
+    return any(report is not None and report.failed for report in reports)
+
+
+@pytest.fixture(scope="session")
+def network_proxy():
+    # record / replay 模式下启动本地代理，浏览器和 requests 请求都经过代理
+    if NETWORK_MODE == "live":
+        yield None
+        return
+    proxy = NetworkReplay(NETWORK_MODE, os.path.join(HAR_DIR, NETWORK_CASSETTE), ignore_params=NETWORK_IGNORE_PARAMS)
+    proxy.start()
+    yield proxy
+    proxy.stop()
+
+
+@pytest.fixture(scope="session")
+def browser_pool(network_proxy):
+    proxy = network_proxy.address if network_proxy else None
+    pool = BrowserPool(BROWSER_NAME, BROWSER_POOL_SIZE, BROWSER_POOL_MAX_LEASES, proxy)
+    pool.start()
+    Logger.debug("浏览器池已启动")
+    yield pool
+    pool.close()
+    Logger.debug("浏览器池已关闭")
+
+
 # 由于使用了pytest-rerunfailures的重试机制，所用域目前仅支持function和session
+# 每个测试从浏览器池租用浏览器，归还时重置状态；测试失败的浏览器会被替换，重试时使用全新的浏览器
 @pytest.fixture(scope="function")
-def driver(request):
-    driver_instance = WebDriverFactory.get_driver(BROWSER_NAME)
-    Logger.debug("打开浏览器")
+def driver(request, browser_pool):
+    driver_instance = browser_pool.lease()
+    Logger.debug("从浏览器池租用浏览器")
+    # 未开启 UI_COMMAND_TRACE 时只为限制了命令数的测试记录命令，归还浏览器前移除
+    tracer_installed = (request.node.get_closest_marker("max_roundtrips") is not None
+                        and getattr(driver_instance, "command_tracer", None) is None)
+    if tracer_installed:
+        CommandTracer.install(driver_instance)
+    # 按 @pytest.mark.block_resources 拦截本测试的资源请求
+    marker = request.node.get_closest_marker("block_resources")
+    policy = ResourcePolicy(**marker.kwargs) if marker else None
+    if policy is not None:
+        policy.apply(driver_instance)
     yield driver_instance
-    driver_instance.quit()
-    Logger.debug("浏览器被关闭")
+    if policy is not None:
+        Logger.info(f"资源拦截统计：{request.node.nodeid} {policy.collect(driver_instance)}")
+        policy.clear(driver_instance)
+    if tracer_installed:
+        CommandTracer.uninstall(driver_instance)
+    browser_pool.release(driver_instance, failed=_test_failed(request.node))
+    Logger.debug("浏览器已归还浏览器池")
 
 
-@pytest.fixture(scope="class")
+@pytest.fixture(scope="function")
+def roundtrips(driver):
+    # 测试中浏览器驱动的命令统计，roundtrips.count 为当前已执行的命令数，roundtrips.summary() 为汇总
+    tracer = getattr(driver, "command_tracer", None)
+    if tracer is None:
+        pytest.skip("未记录浏览器驱动命令：设置 UI_COMMAND_TRACE=1 或为测试添加 @pytest.mark.max_roundtrips")
+    return tracer.window()
+
+
+@pytest.fixture(scope="function")
 def base(driver):
     return BasePage(driver)
 
@@ -38,27 +266,3 @@ def base(driver):
 def baidu_homepage(driver):
     return BaiduHomePage(driver)
 
-
-# TODO 分离建立干净driver实例和开启关闭浏览器的作用域
-'''
-@pytest.fixture(scope='class')
-def browser_class_scope():
-    # 这个 fixture 负责启动和关闭浏览器
-    print("启动浏览器")
-    driver_instance = WebDriverFactory.get_driver(BROWSER_NAME)
-    yield driver_instance
-    print("关闭浏览器")
-    driver_instance.quit()
-
-@pytest.fixture(scope='function')
-def driver(browser_class_scope):
-    # 这个 fixture 负责为每个测试函数提供一个干净的 driver 实例
-    # 在运行每个测试之前，重置浏览器状态
-    browser_class_scope.delete_all_cookies()
-    browser_class_scope.execute_script("window.localStorage.clear();")
-    browser_class_scope.execute_script("window.sessionStorage.clear();")
-    # 可以添加其他的状态重置代码，如导航到一个空白页等
-    browser_class_scope.get("about:blank")
-    yield browser_class_scope
-    # 如果需要，可以在这里添加每个测试后的清理代码
-'''
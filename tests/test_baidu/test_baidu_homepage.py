@@ -25,8 +25,7 @@ class TestBaidu:
             baidu_homepage.click_search_button()
 
         with allure.step("断言检查网页title"):
-            base.sleep(2)
-            title = base.get_title()
+            title = base.wait_for_title_contains(keyword)
             assert keyword in title, f"Expected {keyword} in title, but got '{title}'"
 
     @allure.title("点击下一个")  # 测试用例名
@@ -35,5 +34,9 @@ class TestBaidu:
     @allure.testcase('', 'test case')  # 测试用例case文档链接及其文档名
     @allure.severity(allure.severity_level.NORMAL)
     def test_click_next_page(self, base, baidu_homepage):
+        # 每个测试使用重置过的浏览器，先打开搜索结果页
+        with allure.step("打开搜索结果页"):
+            base.open("https://www.baidu.com/s?wd=今天天气真好")
+
         with allure.step("点击下一步"):
             base.click("css", ".s-tab-item.s-tab-item_1CwH-.s-tab-video_1Sf_u.s-tab-video")
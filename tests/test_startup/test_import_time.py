@@ -0,0 +1,32 @@
+import os
+import allure
+import pytest
+
+from utils.import_cost import measure, cumulative_ms
+
+# 导入 pages.base_page 的时间预算（毫秒），可通过 UI_IMPORT_BUDGET_MS 调整
+IMPORT_TIME_BUDGET_MS = float(os.environ.get('UI_IMPORT_BUDGET_MS', '1500'))
+# 只在使用时才加载的重量级依赖
+LAZY_MODULES = ('ddddocr', 'onnxruntime', 'requests', 'allure', 'numpy', 'PIL', 'cv2')
+
+
+@allure.epic("测试框架")
+@allure.feature("启动性能")
+class TestImportTime:
+    @allure.title("导入页面基类不加载可选的重量级依赖")
+    @allure.severity(allure.severity_level.NORMAL)
+    def test_base_page_does_not_import_heavy_modules(self):
+        entries = measure('pages.base_page')
+        imported = {name.split('.')[0] for name, _, _, _ in entries}
+        loaded = [module for module in LAZY_MODULES if module in imported]
+        assert not loaded, f"导入 pages.base_page 时加载了 {loaded}"
+
+    @allure.title("导入页面基类的耗时不超出预算")
+    @allure.severity(allure.severity_level.NORMAL)
+    @pytest.mark.slow
+    def test_base_page_import_time_budget(self):
+        # 取 3 次中最快的一次，减少机器负载的影响
+        elapsed = min(cumulative_ms(measure('pages.base_page'), 'pages.base_page') for _ in range(3))
+        allure.attach(f"{elapsed:.1f} ms", name="导入耗时", attachment_type=allure.attachment_type.TEXT)
+        message = f"导入 pages.base_page 耗时 {elapsed:.1f} ms，超出预算 {IMPORT_TIME_BUDGET_MS} ms"
+        assert elapsed <= IMPORT_TIME_BUDGET_MS, message
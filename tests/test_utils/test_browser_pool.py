@@ -0,0 +1,231 @@
+import time
+import threading
+import allure
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from selenium.common.exceptions import NoAlertPresentException
+
+from utils.browser_pool import BrowserPool
+from utils.resource_policy import ResourcePolicy
+from utils.webdriver_factory import WebDriverFactory
+from utils.command_tracer import CommandTracer
+from pages.base_page import BasePage
+
+
+class _FakeAlert:
+    def dismiss(self):
+        raise NoAlertPresentException()
+
+
+class _FakeSwitchTo:
+    def __init__(self, driver):
+        self.driver = driver
+        self.alert = _FakeAlert()
+
+    def window(self, handle):
+        self.driver.current_window = handle
+
+
+class _FakeExecutor:
+    def execute(self, command, params):
+        return {'value': None}
+
+
+class FakeDriver:
+    """
+    只实现浏览器池用到的接口，记录执行过的 CDP 命令
+    """
+
+    def __init__(self):
+        self.window_handles = ['main']
+        self.current_window = 'main'
+        self.urls = {'main': 'about:blank'}
+        self.switch_to = _FakeSwitchTo(self)
+        self.cdp_commands = []
+        self.command_executor = _FakeExecutor()
+        self.quitted = False
+
+    @property
+    def current_url(self):
+        return self.urls.get(self.current_window, 'about:blank')
+
+    url = current_url
+
+    def open_window(self, handle, url):
+        self.window_handles.append(handle)
+        self.urls[handle] = url
+
+    def close(self):
+        self.window_handles.remove(self.current_window)
+
+    def execute_script(self, script, *args):
+        return None
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((command, params))
+
+    def get(self, url):
+        self.urls[self.current_window] = url
+
+    def quit(self):
+        self.quitted = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(WebDriverFactory, 'get_driver', staticmethod(lambda browser_name, proxy=None: FakeDriver()))
+    browser_pool = BrowserPool('chrome', size=1, max_leases=2)
+    browser_pool.start()
+    yield browser_pool
+    browser_pool.close()
+
+
+@allure.epic("测试框架")
+@allure.feature("浏览器池")
+class TestBrowserPool:
+    @allure.title("归还后重置浏览器状态并复用同一个浏览器")
+    def test_lease_and_release(self, pool):
+        driver = pool.lease(timeout=1)
+        BasePage(driver).open('https://example.com/login?next=1')
+        driver.open_window('popup', 'https://sso.example.org/auth')
+        pool.release(driver)
+        assert driver.window_handles == ['main'] and driver.url == 'about:blank'
+        # 按测试访问过的域名逐个清除存储，不使用通配符
+        cleared = [params['origin'] for command, params in driver.cdp_commands
+                   if command == 'Storage.clearDataForOrigin']
+        assert cleared == ['https://example.com', 'https://sso.example.org']
+        assert not driver.visited_urls
+        assert pool.lease(timeout=1) is driver
+
+    @allure.title("多个资源拦截策略合并生效，归还时全部清除")
+    def test_release_clears_resource_policies(self, pool):
+        driver = pool.lease(timeout=1)
+        page_policy = ResourcePolicy(resource_types=['font'])
+        marker_policy = ResourcePolicy(patterns=['*ads*'])
+        page_policy.apply(driver)
+        marker_policy.apply(driver)
+        assert set(driver.cdp_commands[-1][1]['urls']) == {'*ads*', *ResourcePolicy.RESOURCE_TYPE_PATTERNS['font']}
+        marker_policy.clear(driver)
+        assert driver.cdp_commands[-1] == ('Network.setBlockedURLs',
+                                           {'urls': ResourcePolicy.RESOURCE_TYPE_PATTERNS['font']})
+        pool.release(driver)
+        assert ('Network.setBlockedURLs', {'urls': []}) in driver.cdp_commands
+        assert not driver.blocked_urls
+
+    @allure.title("测试失败时关闭浏览器并在后台补充新的浏览器")
+    def test_release_failed_replaces_driver(self, pool):
+        driver = pool.lease(timeout=1)
+        pool.release(driver, failed=True)
+        assert driver.quitted
+        replacement = pool.lease(timeout=5)
+        assert replacement is not driver and not replacement.quitted
+
+    @allure.title("租用次数达到上限时替换浏览器")
+    def test_release_exhausted_replaces_driver(self, pool):
+        driver = pool.lease(timeout=1)
+        pool.release(driver)
+        assert pool.lease(timeout=1) is driver
+        pool.release(driver)
+        assert driver.quitted and pool.lease(timeout=5) is not driver
+
+    @allure.title("没有空闲浏览器时等待超时")
+    def test_lease_timeout(self, pool):
+        pool.lease(timeout=1)
+        start = time.perf_counter()
+        with pytest.raises(ValueError, match='没有可用的浏览器'):
+            pool.lease(timeout=0.2)
+        assert time.perf_counter() - start >= 0.2
+
+
+@pytest.fixture(scope="module")
+def browser_pool():
+    # 覆盖 tests/conftest.py 中的浏览器池：只有一个假浏览器，本模块中使用 driver 的测试依次租用同一个浏览器
+    original = WebDriverFactory.get_driver
+    WebDriverFactory.get_driver = staticmethod(lambda browser_name, proxy=None: FakeDriver())
+    browser_pool = BrowserPool('chrome', size=1)
+    try:
+        browser_pool.start()
+    finally:
+        WebDriverFactory.get_driver = original
+    yield browser_pool
+    browser_pool.close()
+
+
+_leased_drivers = []
+
+
+@allure.epic("测试框架")
+@allure.feature("浏览器驱动命令统计")
+class TestCommandTracerOnPooledDriver:
+    @allure.title("限制命令数的测试在浏览器上安装命令追踪")
+    @pytest.mark.max_roundtrips(5)
+    def test_traced(self, driver, roundtrips):
+        _leased_drivers.append(driver)
+        driver.command_executor.execute('getTitle', {})
+        assert roundtrips.count == 1
+
+    @allure.title("归还浏览器时移除命令追踪，下一个测试不再记录命令")
+    def test_next_test_not_traced(self, driver):
+        assert _leased_drivers == [driver]
+        assert getattr(driver, 'command_tracer', None) is None
+        assert driver.command_executor.execute == _FakeExecutor.execute.__get__(driver.command_executor)
+
+    @allure.title("未安装命令追踪时 roundtrips 跳过测试")
+    def test_roundtrips_skips_without_tracer(self, request, driver):
+        with pytest.raises(pytest.skip.Exception):
+            request.getfixturevalue('roundtrips')
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'<html><head><title>pool</title></head><body>pool</body></html>'
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_site():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def chrome_pool(monkeypatch):
+    get_driver = WebDriverFactory.get_driver
+    monkeypatch.setattr(WebDriverFactory, 'get_driver', staticmethod(
+        lambda browser_name, proxy=None: get_driver(browser_name, profile='headless', proxy=proxy)))
+    browser_pool = BrowserPool('chrome', size=1)
+    try:
+        browser_pool.start()
+    except Exception as e:
+        pytest.skip(f'无法启动 Chromium: {e}')
+    yield browser_pool
+    browser_pool.close()
+
+
+@allure.epic("测试框架")
+@allure.feature("浏览器池")
+@pytest.mark.slow
+class TestBrowserPoolChromium:
+    @allure.title("真实 Chromium：归还后清除存储并复用同一个浏览器")
+    def test_release_reuses_driver(self, chrome_pool, local_site):
+        driver = chrome_pool.lease(timeout=30)
+        BasePage(driver).open(local_site)
+        driver.execute_script("window.localStorage.setItem('token', 'secret');")
+        chrome_pool.release(driver)
+        assert driver.current_url == 'about:blank'
+
+        reused = chrome_pool.lease(timeout=30)
+        assert reused is driver
+        BasePage(reused).open(local_site)
+        assert reused.execute_script("return window.localStorage.getItem('token');") is None
+        chrome_pool.release(reused)
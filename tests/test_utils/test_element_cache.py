@@ -0,0 +1,86 @@
+import allure
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.remote.webelement import WebElement
+
+from pages.base_page import BasePage
+
+
+class FakeElement(WebElement):
+    """
+    按调用次数变为可见、可用的元素，stale 为 True 时所有检查都抛出 StaleElementReferenceException
+    """
+
+    def __init__(self, enabled_after=0):
+        self.enabled_after = enabled_after
+        self.checks = 0
+        self.stale = False
+        self.clicks = 0
+
+    def _check(self):
+        if self.stale:
+            raise StaleElementReferenceException('stale')
+
+    def is_displayed(self):
+        self._check()
+        return True
+
+    def is_enabled(self):
+        self._check()
+        self.checks += 1
+        return self.checks > self.enabled_after
+
+    def click(self):
+        self._check()
+        self.clicks += 1
+
+
+class FakeDriver:
+    def __init__(self, *elements):
+        self.elements = list(elements)
+        self.finds = 0
+
+    def find_element(self, by, value):
+        self.finds += 1
+        return self.elements[min(self.finds, len(self.elements)) - 1]
+
+
+@allure.epic("测试框架")
+@allure.feature("元素缓存")
+class TestElementCache:
+    @allure.title("相同条件命中缓存时不再请求浏览器")
+    def test_hit_same_condition(self):
+        element = FakeElement()
+        page = BasePage(FakeDriver(element))
+        assert page.cached_element('id', 'su') is element
+        assert page.cached_element('id', 'su') is element
+        assert page.driver.finds == 1 and element.checks == 0
+
+    @allure.title("presence 缓存的元素用于 clickable 时等待元素可点击，不重新查找")
+    def test_hit_with_stricter_condition(self):
+        element = FakeElement(enabled_after=2)
+        page = BasePage(FakeDriver(element))
+        page.cached_element('id', 'su', condition='presence')
+        assert page.cached_element('id', 'su', wait=2, condition='clickable') is element
+        assert element.checks == 3 and page.driver.finds == 1
+        # 已满足 clickable 的元素再次用于 clickable、visible 时不再检查
+        page.cached_element('id', 'su', condition='clickable')
+        page.cached_element('id', 'su', condition='visible')
+        assert element.checks == 3
+
+    @allure.title("缓存的元素在超时前不可点击时报错")
+    def test_hit_with_stricter_condition_timeout(self):
+        element = FakeElement(enabled_after=1000)
+        page = BasePage(FakeDriver(element))
+        page.cached_element('id', 'su')
+        with pytest.raises(ValueError, match='clickable'):
+            page.cached_element('id', 'su', wait=0.1, condition='clickable')
+
+    @allure.title("缓存的元素失效时重新定位后执行操作")
+    def test_stale_cached_element_relocated(self):
+        stale, fresh = FakeElement(), FakeElement()
+        page = BasePage(FakeDriver(stale, fresh))
+        page.cached_element('id', 'su')
+        stale.stale = True
+        page._on_element('id', 'su', lambda e: e.click(), condition='clickable')
+        assert fresh.clicks == 1 and page.driver.finds == 2
@@ -0,0 +1,59 @@
+import json
+import gzip
+import time
+import allure
+import pytest
+
+from utils.event_query import aggregate, iter_events, main
+
+
+def _event(action, locator, duration_ms, outcome='ok', depth=0):
+    return {'ts': time.time(), 'action': action, 'locator': locator, 'duration_ms': duration_ms,
+            'outcome': outcome, 'depth': depth}
+
+
+@pytest.fixture
+def event_dir(tmp_path):
+    # 一个未压缩文件（最后一行不完整）和一个轮转后压缩的文件
+    events = [_event('click', 'css=#su', ms) for ms in (10, 20, 30, 40, 1000)]
+    events.append(_event('element_wait', 'css=#su', 5, depth=1))
+    events.append(_event('input', 'id=kw', 15, outcome='error'))
+    lines = [json.dumps(event) for event in events]
+    (tmp_path / 'events_20260101-000000_main_1.jsonl').write_text('\n'.join(lines[:4]) + '\n\n{"ts": 1', 'utf-8')
+    with gzip.open(tmp_path / 'events_20260101-000000_gw0_1.jsonl.gz', 'wt', encoding='utf-8') as f:
+        f.write('\n'.join(lines[4:]) + '\n')
+    (tmp_path / 'other.jsonl').write_text(lines[0] + '\n', 'utf-8')
+    return str(tmp_path)
+
+
+@allure.epic("测试框架")
+@allure.feature("事件日志查询")
+class TestEventQuery:
+    @allure.title("读取未压缩和 gzip 压缩的事件文件，跳过不完整的行和其他文件")
+    def test_iter_events(self, event_dir):
+        assert len(list(iter_events(event_dir))) == 7
+
+    @allure.title("按操作和定位汇总耗时、分位数和失败次数")
+    def test_aggregate(self, event_dir):
+        stats = aggregate(iter_events(event_dir))
+        assert set(stats) == {('click', 'css=#su'), ('input', 'id=kw')}
+        click = stats[('click', 'css=#su')]
+        assert click['count'] == 5 and click['errors'] == 0
+        assert click['mean_ms'] == 220 and click['max_ms'] == 1000 and click['total_ms'] == 1100
+        # 分位数按对数分桶估算，误差在一个桶（约 10%）以内
+        assert 30 <= click['p50_ms'] <= 33
+        assert click['p95_ms'] == 1000
+        assert stats[('input', 'id=kw')]['errors'] == 1
+
+    @allure.title("可以只统计指定操作或包括嵌套的操作")
+    def test_aggregate_filters(self, event_dir):
+        assert set(aggregate(iter_events(event_dir), action='input')) == {('input', 'id=kw')}
+        nested = aggregate(iter_events(event_dir), top_level_only=False)
+        assert nested[('element_wait', 'css=#su')]['count'] == 1
+
+    @allure.title("--by 接受省略 _ms 的排序字段")
+    def test_main_sort_alias(self, event_dir, capsys):
+        main(['slowest', '--dir', event_dir, '--by', 'p95', '--top', '1'])
+        assert json.loads(capsys.readouterr().out)['locator'] == 'css=#su'
+        main(['failures', '--dir', event_dir, '--top', '1'])
+        assert json.loads(capsys.readouterr().out)['locator'] == 'id=kw'
@@ -0,0 +1,90 @@
+import allure
+import pytest
+
+from utils.link_checker import LinkChecker
+
+
+@pytest.fixture
+def checker(monkeypatch):
+    # 不发出真实请求：按 {(方法, 地址): 状态码或异常} 返回结果，并记录每次请求
+    LinkChecker.clear_cache()
+    link_checker = LinkChecker(max_workers=4, per_host=2)
+    link_checker.responses = {}
+    link_checker.requests = []
+
+    def request(method, url):
+        link_checker.requests.append((method, url))
+        response = link_checker.responses.get((method, url), 200)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(link_checker, '_request', request)
+    yield link_checker
+    LinkChecker.clear_cache()
+
+
+@allure.epic("测试框架")
+@allure.feature("链接检查")
+class TestLinkChecker:
+    @allure.title("检查结果在 TTL 内使用缓存")
+    def test_cache(self, checker):
+        url = 'https://example.com/a'
+        assert checker.check(url)['ok']
+        assert checker.check(url)['ok']
+        assert checker.requests == [('HEAD', url)]
+
+    @allure.title("缓存过期后重新请求")
+    def test_cache_expired(self, checker):
+        url = 'https://example.com/a'
+        checker.ttl = 0
+        checker.check(url)
+        checker.check(url)
+        assert checker.requests == [('HEAD', url), ('HEAD', url)]
+
+    @allure.title("fresh=True 时忽略缓存重新请求，并更新缓存")
+    def test_fresh(self, checker):
+        url = 'https://example.com/a'
+        assert checker.check(url)['ok']
+        checker.responses[('HEAD', url)] = checker.responses[('GET', url)] = 404
+        assert checker.check(url)['ok']
+        assert not checker.check(url, fresh=True)['ok']
+        assert not checker.check(url)['ok']
+        assert checker.requests == [('HEAD', url), ('HEAD', url), ('GET', url)]
+
+    @allure.title("请求异常的结果不按完整 TTL 缓存")
+    def test_error_not_cached(self, checker):
+        url = 'https://example.com/timeout'
+        checker.error_ttl = 0
+        checker.responses[('HEAD', url)] = TimeoutError('timed out')
+        result = checker.check(url)
+        assert not result['ok'] and result['error'] == 'timed out'
+        del checker.responses[('HEAD', url)]
+        assert checker.check(url)['ok']
+        assert checker.requests == [('HEAD', url), ('HEAD', url)]
+
+    @allure.title("HEAD 请求不被支持时改用 GET 请求")
+    def test_head_fallback_to_get(self, checker):
+        url = 'https://example.com/no-head'
+        checker.responses[('HEAD', url)] = 405
+        result = checker.check(url)
+        assert result['ok'] and result['method'] == 'GET' and result['status'] == 200
+        assert checker.requests == [('HEAD', url), ('GET', url)]
+
+    @allure.title("GET 请求也失败时判定为失效链接")
+    def test_broken_link(self, checker):
+        url = 'https://example.com/missing'
+        checker.responses[('HEAD', url)] = checker.responses[('GET', url)] = 404
+        result = checker.check(url)
+        assert not result['ok'] and result['status'] == 404 and result['method'] == 'GET'
+
+    @allure.title("重复的地址只请求一次，结果顺序与输入一致")
+    def test_check_all_dedup(self, checker):
+        urls = ['https://example.com/a', 'https://example.com/b', 'https://example.com/a']
+        results = checker.check_all(urls)
+        assert [result['url'] for result in results] == urls
+        assert sorted(checker.requests) == [('HEAD', 'https://example.com/a'), ('HEAD', 'https://example.com/b')]
+
+    @allure.title("进程内共享的 LinkChecker 只创建一次")
+    def test_shared(self):
+        assert LinkChecker.shared() is LinkChecker.shared()
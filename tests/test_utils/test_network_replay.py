@@ -0,0 +1,94 @@
+import os
+import ssl
+import allure
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.network_replay import NetworkReplay, ResponseStore
+
+URL = 'https://example.com/api?wd=test&_t=1'
+
+
+def _record(store, url, body, method='GET'):
+    store.add(method, url, b'', 200, 'OK', [('Content-Type', 'text/plain')], body)
+
+
+@allure.epic("测试框架")
+@allure.feature("网络录制回放")
+class TestResponseStore:
+    @allure.title("保存后重新加载可以回放录制的响应")
+    def test_round_trip(self, tmp_path):
+        store = ResponseStore(str(tmp_path), ignore_params=['_t'])
+        _record(store, URL, b'first')
+        _record(store, URL, b'second')
+        store.save()
+
+        replay = ResponseStore(str(tmp_path), ignore_params=['_t'])
+        # 忽略的查询参数不同也能匹配，同一请求按录制顺序依次返回，之后重复返回最后一个
+        other_url = URL.replace('_t=1', '_t=2')
+        assert replay.lookup('GET', other_url, b'') == (200, 'OK', [['Content-Type', 'text/plain']], b'first')
+        assert replay.lookup('GET', other_url, b'')[3] == b'second'
+        assert replay.lookup('GET', other_url, b'')[3] == b'second'
+        assert replay.lookup('POST', URL, b'') is None
+
+    @allure.title("多个进程同时录制时合并各自录制的请求")
+    def test_save_merges_workers(self, tmp_path):
+        first, second = ResponseStore(str(tmp_path)), ResponseStore(str(tmp_path))
+        _record(first, 'https://example.com/a', b'a')
+        _record(second, 'https://example.com/b', b'b')
+        first.save()
+        second.save()
+
+        replay = ResponseStore(str(tmp_path))
+        assert replay.lookup('GET', 'https://example.com/a', b'')[3] == b'a'
+        assert replay.lookup('GET', 'https://example.com/b', b'')[3] == b'b'
+
+    @allure.title("重新录制的请求替换之前的响应，不重复追加")
+    def test_rerecord_replaces_entries(self, tmp_path):
+        store = ResponseStore(str(tmp_path))
+        _record(store, URL, b'old')
+        _record(store, 'https://example.com/other', b'other')
+        store.save()
+
+        rerecord = ResponseStore(str(tmp_path))
+        _record(rerecord, URL, b'new')
+        rerecord.save()
+        rerecord.save()
+
+        replay = ResponseStore(str(tmp_path))
+        assert replay.lookup('GET', URL, b'')[3] == b'new'
+        assert len(replay._index[replay._key('GET', URL, b'')]) == 1
+        assert replay.lookup('GET', 'https://example.com/other', b'')[3] == b'other'
+
+
+@allure.epic("测试框架")
+@allure.feature("网络录制回放")
+class TestNetworkReplay:
+    @allure.title("多个进程同时启动代理时只生成一份证书，证书和私钥匹配")
+    def test_parallel_certificate_generation(self, tmp_path):
+        directory = str(tmp_path / 'har' / 'cassette')
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            proxies = list(executor.map(lambda _: NetworkReplay('replay', directory), range(4)))
+        assert all(proxy.ssl_context is not None for proxy in proxies)
+        har_dir = tmp_path / 'har'
+        assert not [name for name in os.listdir(har_dir) if name.endswith('.tmp')]
+        ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER).load_cert_chain(har_dir / 'proxy_cert.pem', har_dir / 'proxy_key.pem')
+
+    @allure.title("回放模式下代理返回录制的响应并统计命中次数")
+    def test_replay_through_proxy(self, tmp_path):
+        directory = str(tmp_path / 'har' / 'cassette')
+        store = ResponseStore(directory)
+        _record(store, 'http://example.test/a', b'recorded')
+        store.save()
+        proxy = NetworkReplay('replay', directory)
+        proxy.start()
+        try:
+            proxies = {'http': f'http://{proxy.address}'}
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                responses = list(executor.map(
+                    lambda _: requests.get('http://example.test/a', proxies=proxies, timeout=5), range(8)))
+            assert all(response.content == b'recorded' for response in responses)
+            assert requests.get('http://example.test/b', proxies=proxies, timeout=5).status_code == 404
+        finally:
+            proxy.stop()
+        assert proxy.stats == {'recorded': 0, 'hits': 8, 'misses': 1}
@@ -0,0 +1,38 @@
+import io
+import os
+import allure
+from PIL import Image
+
+from utils.screenshot_store import ScreenshotStore
+
+
+def _png(color):
+    output = io.BytesIO()
+    Image.new('RGB', (4, 4), color).save(output, format='PNG')
+    return output.getvalue()
+
+
+@allure.epic("测试框架")
+@allure.feature("截图存储")
+class TestScreenshotStore:
+    @allure.title("相同内容的截图只保存一份，登记的截图写入后才返回")
+    def test_submit_and_take_pending(self, tmp_path):
+        store = ScreenshotStore(str(tmp_path))
+        path = store.submit(_png('red'), name='first', attach=True)
+        assert store.submit(_png('red'), name='again', attach=True) == path
+        store.submit(_png('blue'))
+        pending = store.take_pending()
+        assert pending == [(path, 'first'), (path, 'again')]
+        assert os.path.exists(path)
+        assert store.take_pending() == []
+
+    @allure.title("写入失败的截图不添加到报告")
+    def test_failed_write_is_skipped(self, tmp_path, monkeypatch):
+        store = ScreenshotStore(str(tmp_path))
+
+        def write(path, data):
+            raise OSError('disk full')
+
+        monkeypatch.setattr(store, '_write', write)
+        store.submit(_png('green'), name='broken', attach=True)
+        assert store.take_pending() == []
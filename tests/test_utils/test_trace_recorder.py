@@ -0,0 +1,82 @@
+import io
+import json
+import zipfile
+import allure
+from PIL import Image
+from selenium.webdriver.common.by import By
+
+from pages.base_page import BasePage
+from utils.trace_recorder import TraceRecorder
+
+
+def _png():
+    output = io.BytesIO()
+    Image.new('RGB', (4, 4), 'white').save(output, format='PNG')
+    return output.getvalue()
+
+
+class FakeDriver:
+    """
+    记录执行的脚本，元素的 HTML 片段为 <元素名>
+    """
+
+    def __init__(self):
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        return f'<{args[0]}>'
+
+    def get_screenshot_as_png(self):
+        return _png()
+
+
+def _event(action, locator, outcome='ok'):
+    return {'ts': 0, 'action': action, 'locator': locator, 'duration_ms': 1.0, 'round_trips': None,
+            'outcome': outcome, 'error': None, 'test': None, 'worker': 'main', 'depth': 0}
+
+
+@allure.epic("测试框架")
+@allure.feature("失败追踪")
+class TestTraceRecorder:
+    @allure.title("记录步骤时不执行额外的浏览器驱动命令，打包时才读取 HTML 片段")
+    def test_snippets_read_on_dump(self, tmp_path):
+        driver = FakeDriver()
+        page = BasePage(driver)
+        page._element_cache[(By.ID, 'kw')] = 'input'
+        recorder = TraceRecorder(str(tmp_path))
+        recorder.record(_event('input', 'id=kw'), page)
+        recorder.record(_event('click', 'id=su'), page)
+        assert driver.scripts == []
+
+        path = recorder.dump('tests/test_demo.py::test_demo')
+        with zipfile.ZipFile(path) as archive:
+            steps = json.loads(archive.read('trace.json'))['steps']
+        assert [step['snippet'] for step in steps] == ['<input>', None]
+        assert len(driver.scripts) == 1
+
+    @allure.title("失败后先读取 HTML 片段，浏览器重置后打包仍然保留")
+    def test_resolve_snippets_before_reset(self, tmp_path):
+        driver = FakeDriver()
+        page = BasePage(driver)
+        page._element_cache[(By.ID, 'kw')] = 'input'
+        recorder = TraceRecorder(str(tmp_path))
+        recorder.record(_event('input', 'id=kw', outcome='error'), page)
+        recorder.resolve_snippets()
+        driver.execute_script = None
+        path = recorder.dump('tests/test_demo.py::test_demo')
+        with zipfile.ZipFile(path) as archive:
+            steps = json.loads(archive.read('trace.json'))['steps']
+            assert steps[0]['snippet'] == '<input>'
+            assert Image.open(io.BytesIO(archive.read(steps[0]['screenshot']))).size == (4, 4)
+
+    @allure.title("只记录最外层的操作，超出容量时保留最近的步骤")
+    def test_ring_buffer(self, tmp_path):
+        page = BasePage(FakeDriver())
+        recorder = TraceRecorder(str(tmp_path), size=2)
+        recorder.record(dict(_event('element_wait', 'id=kw'), depth=1), page)
+        for name in ('open', 'input', 'click'):
+            recorder.record(_event(name, None), page)
+        assert [step['action'] for step in recorder.steps] == ['input', 'click']
+        recorder.start_test()
+        assert recorder.dump('tests/test_demo.py::test_demo') is None
@@ -0,0 +1,106 @@
+import allure
+import pytest
+
+from utils.trend_store import TrendRun, TrendStore
+
+TEST = 'tests/test_demo.py::test_demo'
+
+
+@pytest.fixture
+def store():
+    trend_store = TrendStore(':memory:')
+    yield trend_store
+    trend_store.close()
+
+
+def _save_runs(store, durations, page_metrics=None):
+    # 运行 id 按顺序递增，最后一个为最近一次运行
+    for index, duration in enumerate(durations):
+        run = TrendRun(f'run-{index:02d}')
+        metrics = page_metrics[index] if page_metrics else ()
+        run.add_test(TEST, 'passed', duration / 1000, page_metrics=metrics)
+        store.save(run)
+
+
+def _page(url, transfer_bytes, lcp_ms=1000):
+    return [{'url': url, 'lcp_ms': lcp_ms, 'navigation': {'transfer_bytes': transfer_bytes}, 'resources': {}}]
+
+
+@allure.epic("测试框架")
+@allure.feature("性能趋势")
+class TestTrendStore:
+    @allure.title("超出历史中位数和 MAD 范围的耗时判定为回归")
+    def test_regression_detected(self, store):
+        _save_runs(store, [1000, 1020, 980, 1010, 990, 1500])
+        regressions = store.compare()
+        assert len(regressions) == 1
+        regression = regressions[0]
+        assert regression['name'] == 'duration_ms' and regression['value'] == 1500
+        assert regression['median'] == 1000 and regression['mad'] == 10 and regression['history'] == 5
+        assert regression['z'] == round(500 / (1.4826 * 10), 2)
+
+    @allure.title("历史波动范围内的变化不判定为回归")
+    def test_noise_ignored(self, store):
+        _save_runs(store, [1000, 1400, 700, 1300, 800, 1350])
+        assert store.compare() == []
+
+    @allure.title("变化低于绝对值下限时不判定为回归")
+    def test_min_delta(self, store):
+        _save_runs(store, [100, 100, 100, 100, 140])
+        assert store.compare() == []
+        assert store.compare(min_delta=10.0)[0]['value'] == 140
+
+    @allure.title("历史样本不足时不判断")
+    def test_min_history(self, store):
+        _save_runs(store, [1000, 1000, 5000])
+        assert store.compare() == []
+        assert store.compare(min_history=2)
+
+    @allure.title("对比指定的运行时只使用更早的运行作为历史")
+    def test_compare_run_id(self, store):
+        _save_runs(store, [1000, 1000, 1000, 5000, 1000])
+        assert store.compare() == []
+        assert store.compare('run-03')[0]['history'] == 3
+
+    @allure.title("失败的测试不参与对比")
+    def test_failed_tests_ignored(self, store):
+        _save_runs(store, [1000, 1000, 1000])
+        run = TrendRun('run-03')
+        run.add_test(TEST, 'failed', 60)
+        store.save(run)
+        assert store.compare() == []
+
+    @allure.title("页面指标按协议、域名和路径归为同一序列")
+    def test_page_url_normalized(self, store):
+        urls = [f'https://example.com/search?wd={i}#top' for i in range(5)]
+        _save_runs(store, [1000] * 5, [_page(url, 100 * 1024, lcp_ms=1000 + i) for i, url in enumerate(urls)])
+        names = {row[0] for row in store.connection.execute("SELECT DISTINCT name FROM samples WHERE kind = 'page'")}
+        assert names == {'https://example.com/search lcp_ms', 'https://example.com/search transfer_kb'}
+
+    @allure.title("传输大小使用 KB 的绝对值下限")
+    def test_transfer_kb_threshold(self, store):
+        sizes = [100, 101, 99, 100, 130]
+        _save_runs(store, [1000] * 5, [_page('https://example.com/', size * 1024) for size in sizes])
+        regressions = store.compare()
+        assert [r['name'] for r in regressions] == ['https://example.com/ transfer_kb']
+        assert store.compare(min_delta_kb=50.0) == []
+
+    @allure.title("同一次运行中同一序列的多个样本取中位数，不只取最后一个")
+    def test_repeated_samples_median(self, store):
+        visits = [[100], [101], [99], [100], [100, 100, 300]]
+        _save_runs(store, [1000] * 5, [sum((_page('https://example.com/', kb * 1024) for kb in run), [])
+                                       for run in visits])
+        assert store.compare() == []
+        assert store.compare(min_delta_kb=0.5) == []
+        run = TrendRun('run-05')
+        for kb in (100, 300, 300):
+            run.add_test(TEST, 'passed', 1, page_metrics=_page('https://example.com/', kb * 1024))
+        store.save(run)
+        assert [r['value'] for r in store.compare()] == [300]
+
+    @allure.title("测试进程先写入数据时，登记运行只补充代码版本")
+    def test_add_run_after_save(self, store):
+        _save_runs(store, [1000])
+        started = store.runs()[0][1]
+        store.add_run('run-00', 'abc1234')
+        assert store.runs() == [('run-00', started, 'abc1234')]
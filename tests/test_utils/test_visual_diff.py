@@ -0,0 +1,86 @@
+import allure
+import numpy as np
+
+from utils.visual_diff import VisualDiff
+
+
+def _image(height=20, width=30, color=(200, 200, 200)):
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:] = color
+    return image
+
+
+@allure.epic("测试框架")
+@allure.feature("图片对比")
+class TestVisualDiff:
+    @allure.title("相同图片没有差异像素")
+    def test_identical(self):
+        result = VisualDiff.compare(_image(), _image())
+        assert result['same_size'] and result['diff_pixels'] == 0 and result['diff_ratio'] == 0.0
+
+    @allure.title("颜色容差内的差异不计入")
+    def test_tolerance(self):
+        assert VisualDiff.compare(_image(), _image(color=(205, 195, 200)), tolerance=8)['diff_pixels'] == 0
+        assert VisualDiff.compare(_image(), _image(color=(205, 195, 200)), tolerance=4)['diff_pixels'] == 600
+
+    @allure.title("亮度相同的色相变化被识别为差异")
+    def test_hue_change_with_same_luma(self):
+        expected = _image(color=(120, 120, 120))
+        actual = _image(color=(160, 100, 126))
+        result = VisualDiff.compare(actual, expected, anti_aliasing=False)
+        assert result['diff_pixels'] == expected.shape[0] * expected.shape[1]
+
+    @allure.title("少量像素的变化被识别为差异")
+    def test_few_pixels_changed(self):
+        expected = _image()
+        actual = expected.copy()
+        actual[5, 5] = actual[12, 20] = (0, 0, 0)
+        result = VisualDiff.compare(actual, expected)
+        assert result['diff_pixels'] == 2
+        assert result['mask'][5, 5] and result['mask'][12, 20]
+
+    @allure.title("尺寸不同时全部判定为差异")
+    def test_size_mismatch(self):
+        result = VisualDiff.compare(_image(width=31), _image())
+        assert not result['same_size'] and result['diff_ratio'] == 1.0
+
+    @allure.title("忽略区域内的差异不计入")
+    def test_ignore_regions(self):
+        expected = _image()
+        actual = expected.copy()
+        actual[2:6, 3:9] = (0, 0, 0)
+        actual[15, 25] = (0, 0, 0)
+        result = VisualDiff.compare(actual, expected, ignore_regions=[(3, 2, 6, 4)])
+        assert result['diff_pixels'] == 1
+        assert result['mask'][15, 25] and not result['mask'][2:6, 3:9].any()
+
+    @allure.title("抗锯齿造成的 1 像素偏移不计入")
+    def test_anti_aliasing(self):
+        expected = _image(color=(255, 255, 255))
+        expected[:, 10:12] = (0, 0, 0)
+        # 竖线向右偏移 1 像素，边缘像素在对方的邻域内都有相同颜色
+        actual = _image(color=(255, 255, 255))
+        actual[:, 11:13] = (0, 0, 0)
+        result = VisualDiff.compare(actual, expected, anti_aliasing=True)
+        assert result['diff_pixels'] == 0 and result['aa_pixels'] == 40
+        assert VisualDiff.compare(actual, expected, anti_aliasing=False)['diff_pixels'] == 40
+
+    @allure.title("孤立的新像素不被当作抗锯齿")
+    def test_anti_aliasing_keeps_real_changes(self):
+        expected = _image(color=(255, 255, 255))
+        actual = expected.copy()
+        actual[10, 10] = (0, 0, 0)
+        result = VisualDiff.compare(actual, expected, anti_aliasing=True)
+        assert result['diff_pixels'] == 1 and result['aa_pixels'] == 0
+
+    @allure.title("与基准图片对比：相同内容直接通过，差异超出比例时失败")
+    def test_assert_matches(self, tmp_path):
+        baseline = str(tmp_path / 'baseline' / 'page.png')
+        expected = _image()
+        assert VisualDiff.assert_matches(VisualDiff.encode(expected), baseline)[0]
+        assert VisualDiff.assert_matches(VisualDiff.encode(expected), baseline) == (True, None, None, None)
+        actual = expected.copy()
+        actual[0, 0] = (0, 0, 0)
+        passed, result, _, _ = VisualDiff.assert_matches(VisualDiff.encode(actual), baseline)
+        assert not passed and result['diff_pixels'] == 1
+        assert VisualDiff.assert_matches(VisualDiff.encode(actual), baseline, max_diff_ratio=0.01)[0]
@@ -0,0 +1,106 @@
+import allure
+import pytest
+from selenium.common.exceptions import (
+    NoSuchElementException, StaleElementReferenceException, TimeoutException, WebDriverException,
+)
+
+from utils import waiter
+from utils.waiter import Waiter
+
+
+class FakeClock:
+    """
+    替代 time.monotonic / time.sleep：sleep 只推进时间并记录每次等待的间隔
+    """
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+class FakeCondition:
+    """
+    按调用次数返回结果：results 中的异常会被抛出，用完后返回 default
+    """
+
+    def __init__(self, *results, default=False):
+        self.results = list(results)
+        self.default = default
+        self.calls = 0
+
+    def __call__(self, driver):
+        self.calls += 1
+        result = self.results.pop(0) if self.results else self.default
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = FakeClock()
+    monkeypatch.setattr(waiter.time, 'monotonic', fake_clock.monotonic)
+    monkeypatch.setattr(waiter.time, 'sleep', fake_clock.sleep)
+    Waiter.reset_stats()
+    yield fake_clock
+    Waiter.reset_stats()
+
+
+@allure.epic("测试框架")
+@allure.feature("自适应等待")
+class TestWaiter:
+    @allure.title("条件满足时立即返回条件函数的值")
+    def test_returns_value(self, clock):
+        condition = FakeCondition(False, False, 'element')
+        assert Waiter(None).until(condition, 'ready') == 'element'
+        assert condition.calls == 3
+        assert clock.sleeps == [0.02, 0.03]
+        assert Waiter.stats()['ready']['polls'] == 3 and Waiter.stats()['ready']['timeouts'] == 0
+
+    @allure.title("轮询间隔按倍数递增，不超过最大间隔，最后一次等待不超过剩余时间")
+    def test_backoff_sequence(self, clock):
+        with pytest.raises(TimeoutException):
+            Waiter(None, timeout=2).until(FakeCondition())
+        assert clock.sleeps == [0.02, 0.03, 0.045, 0.0675, 0.10125, 0.151875, 0.227813, 0.341719, 0.5, 0.5,
+                                0.014844]
+        assert sum(clock.sleeps) == pytest.approx(2)
+
+    @allure.title("超时时抛出 TimeoutException 并记录超时次数")
+    def test_timeout_message(self, clock):
+        with pytest.raises(TimeoutException, match=r'等待条件\(visible\)超时: 1秒'):
+            Waiter(None, timeout=1).until(FakeCondition(), 'visible')
+        stat = Waiter.stats()['visible']
+        assert stat['count'] == 1 and stat['timeouts'] == 1 and stat['max'] == pytest.approx(1)
+
+    @allure.title("忽略元素不存在、元素失效异常并继续轮询，超时时保留最后一个异常")
+    def test_ignored_exceptions(self, clock):
+        condition = FakeCondition(NoSuchElementException('missing'), StaleElementReferenceException('stale'), True)
+        assert Waiter(None).until(condition) is True
+        assert condition.calls == 3
+
+        stale = StaleElementReferenceException('stale')
+        with pytest.raises(TimeoutException) as exc_info:
+            Waiter(None, timeout=0.1).until(FakeCondition(default=stale))
+        assert exc_info.value.__cause__ is stale
+
+    @allure.title("其他异常直接抛出，不等待到超时")
+    def test_other_exceptions_raised(self, clock):
+        condition = FakeCondition(False, WebDriverException('session deleted'))
+        with pytest.raises(WebDriverException, match='session deleted'):
+            Waiter(None).until(condition)
+        assert condition.calls == 2 and clock.sleeps == [0.02]
+
+    @allure.title("实例参数覆盖全局配置，不支持的配置项抛出 ValueError")
+    def test_configure(self, clock):
+        condition = FakeCondition(False, False, False, False, True)
+        Waiter(None, timeout=1, initial_interval=0.1, backoff=2, max_interval=0.3).until(condition)
+        assert clock.sleeps == [0.1, 0.2, 0.3, 0.3]
+        with pytest.raises(ValueError):
+            Waiter.configure(interval=1)
@@ -0,0 +1,98 @@
+import os
+import time
+import threading
+import functools
+
+from utils.logger import Logger
+
+# 页面操作事件的监听器，每个监听器接收 (事件, 页面对象)
+_listeners = []
+# 记录当前线程中页面操作的嵌套深度（如 click 中调用 element_wait）
+_local = threading.local()
+
+
+def add_listener(listener):
+    """
+    注册页面操作事件的监听器
+    :param listener: 接收 (event, page) 的函数
+    :return: None
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener):
+    """
+    移除页面操作事件的监听器
+    :param listener: 已注册的函数
+    :return: None
+    """
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def current_test():
+    """
+    当前正在执行的测试 node id
+    :return: node id，不在测试中时返回 None
+    """
+    current = os.environ.get('PYTEST_CURRENT_TEST')
+    return current.rsplit(' ', 1)[0] if current else None
+
+
+def round_trips(driver):
+    """
+    浏览器驱动已执行的命令数，驱动没有安装命令追踪时返回 None，参见 CommandTracer
+    :param driver: WebDriver 实例
+    :return: 命令数
+    """
+    tracer = getattr(driver, 'command_tracer', None)
+    return tracer.count if tracer is not None else None
+
+
+def action(name, locator=True):
+    """
+    页面操作装饰器：有监听器时记录操作的耗时、请求次数和结果，并通知所有监听器；没有监听器时直接调用，几乎没有开销
+    :param name: 操作名称
+    :param locator: 操作的前两个参数是否为 (定位方式, 定位语句)
+    :return: 装饰器
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(page, *args, **kwargs):
+            if not _listeners:
+                return func(page, *args, **kwargs)
+            depth = getattr(_local, 'depth', 0)
+            _local.depth = depth + 1
+            trips_before = round_trips(page.driver)
+            start = time.perf_counter()
+            outcome, error = 'ok', None
+            try:
+                return func(page, *args, **kwargs)
+            except Exception as e:
+                outcome, error = 'error', str(e)
+                raise
+            finally:
+                _local.depth = depth
+                duration = time.perf_counter() - start
+                trips_after = round_trips(page.driver)
+                event = {
+                    'ts': time.time(),
+                    'action': name,
+                    'locator': f'{args[0]}={args[1]}' if locator and len(args) >= 2 else None,
+                    'duration_ms': round(duration * 1000, 3),
+                    'round_trips': trips_after - trips_before if trips_before is not None else None,
+                    'outcome': outcome,
+                    'error': error,
+                    'test': current_test(),
+                    'worker': os.environ.get('PYTEST_XDIST_WORKER', 'main'),
+                    'depth': depth,
+                }
+                for listener in list(_listeners):
+                    try:
+                        listener(event, page)
+                    except Exception as e:
+                        # 监听器的错误不影响页面操作本身
+                        Logger.warning('页面操作事件监听器执行失败: {} ({})', listener, e)
+        return wrapper
+    return decorator
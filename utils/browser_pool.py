@@ -0,0 +1,166 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from selenium.common.exceptions import NoAlertPresentException, WebDriverException
+
+from utils.logger import Logger
+from utils.resource_policy import ResourcePolicy
+from utils.webdriver_factory import WebDriverFactory
+
+
+class BrowserPool:
+    """
+    预热的浏览器池：启动时一次性并行打开多个浏览器，测试用例租用后归还，
+    归还时重置浏览器状态（cookie、localStorage、sessionStorage、多余窗口、弹框），
+    租用次数达到上限或测试失败时关闭该浏览器，并在后台启动新的浏览器补充到池中
+    """
+
+    def __init__(self, browser_name, size=1, max_leases=20, proxy=None):
+        """
+        :param browser_name: 浏览器名称
+        :param size: 池中浏览器数量
+        :param max_leases: 单个浏览器最多被租用的次数，超过后重新启动
+        :param proxy: 浏览器使用的代理地址，参见 WebDriverFactory.get_driver
+        """
+        self.browser_name = browser_name
+        self.proxy = proxy
+        self.size = size
+        self.max_leases = max_leases
+        self._idle = queue.Queue()
+        self._lease_counts = {}
+        self._launchers = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _launch(self):
+        driver = WebDriverFactory.get_driver(self.browser_name, proxy=self.proxy)
+        with self._lock:
+            self._lease_counts[id(driver)] = 0
+        Logger.debug('浏览器池启动浏览器: {}', self.browser_name)
+        return driver
+
+    def _replenish(self):
+        try:
+            driver = self._launch()
+        except Exception as e:
+            Logger.error(f'浏览器池补充浏览器失败: ({e})')
+            return
+        if self._closed:
+            self._quit(driver)
+        else:
+            self._idle.put(driver)
+
+    def _quit(self, driver):
+        with self._lock:
+            self._lease_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+            Logger.debug('浏览器池关闭浏览器')
+        except Exception as e:
+            Logger.warning(f'浏览器池关闭浏览器失败: ({e})')
+
+    def start(self):
+        """
+        并行启动池中所有浏览器
+        :return: None
+        """
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            for driver in executor.map(lambda _: self._launch(), range(self.size)):
+                self._idle.put(driver)
+
+    def lease(self, timeout=60):
+        """
+        租用一个浏览器，池中没有空闲浏览器时等待其他测试归还
+        :param timeout: 等待时间（秒）
+        :return: WebDriver 实例
+        """
+        try:
+            driver = self._idle.get(timeout=timeout)
+        except queue.Empty as e:
+            message = f'{timeout}秒内没有可用的浏览器'
+            Logger.error(message)
+            raise ValueError(message) from e
+        with self._lock:
+            self._lease_counts[id(driver)] += 1
+        return driver
+
+    def release(self, driver, failed=False):
+        """
+        归还浏览器，测试失败、租用次数达到上限或重置状态失败时关闭该浏览器并在后台补充新的浏览器
+        :param driver: WebDriver 实例
+        :param failed: 测试是否失败，失败的浏览器不再复用，保证重试时使用全新的浏览器
+        :return: None
+        """
+        with self._lock:
+            exhausted = self._lease_counts.get(id(driver), 0) >= self.max_leases
+        if not failed and not exhausted:
+            try:
+                self.reset(driver)
+                self._idle.put(driver)
+                return
+            except Exception as e:
+                Logger.warning(f'重置浏览器状态失败，重新启动浏览器: ({e})')
+        self._quit(driver)
+        launcher = threading.Thread(target=self._replenish, daemon=True)
+        launcher.start()
+        self._launchers.append(launcher)
+
+    @staticmethod
+    def _origin(url):
+        parts = urlsplit(url or '')
+        return f'{parts.scheme}://{parts.netloc}' if parts.scheme in ('http', 'https') and parts.netloc else None
+
+    @classmethod
+    def reset(cls, driver):
+        """
+        重置浏览器状态：关闭弹框和多余窗口，清除 localStorage、sessionStorage 和 cookie，
+        Chromium 系浏览器还会清除测试访问过的所有域名的存储（参见 BasePage.open）和资源拦截规则，最后打开空白页
+        :param driver: WebDriver 实例
+        :return: None
+        """
+        try:
+            driver.switch_to.alert.dismiss()
+        except NoAlertPresentException:
+            pass
+        origins = {cls._origin(url) for url in getattr(driver, 'visited_urls', ())}
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            origins.add(cls._origin(driver.current_url))
+            driver.close()
+        driver.switch_to.window(handles[0])
+        origins.add(cls._origin(driver.current_url))
+        origins.discard(None)
+        try:
+            driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+        except WebDriverException:
+            # about:blank 等页面没有可访问的存储
+            pass
+        if hasattr(driver, 'execute_cdp_cmd'):
+            # Chromium 系浏览器可以清除所有域名的 cookie，存储需要按域名逐个清除，上面的脚本只能清除当前域名的存储
+            driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            for origin in sorted(origins):
+                try:
+                    driver.execute_cdp_cmd('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
+                except WebDriverException as e:
+                    Logger.debug('清除域名 {} 的存储失败 ({})', origin, e)
+            # 页面对象和测试标记启用的资源拦截规则不带到下一个测试
+            ResourcePolicy.clear_all(driver)
+        else:
+            driver.delete_all_cookies()
+        driver.visited_urls = set()
+        driver.get('about:blank')
+        Logger.debug('重置浏览器状态')
+
+    def close(self):
+        """
+        关闭池中所有浏览器
+        :return: None
+        """
+        self._closed = True
+        for launcher in self._launchers:
+            launcher.join()
+        while not self._idle.empty():
+            self._quit(self._idle.get_nowait())
@@ -0,0 +1,138 @@
+import json
+import time
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+
+class CommandWindow:
+    """
+    命令统计窗口：统计从创建窗口开始浏览器驱动执行的命令
+    """
+
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self.start = tracer.count
+
+    @property
+    def count(self):
+        """
+        窗口内执行的命令数
+        """
+        return self.tracer.count - self.start
+
+    def records(self):
+        """
+        窗口内的命令记录（超过追踪器的保留上限时只包含最近的记录）
+        :return: [{'command', 'elapsed_ms', 'request_bytes', 'response_bytes'}, ...]
+        """
+        return [record for seq, record in self.tracer.records if seq >= self.start]
+
+    def summary(self):
+        """
+        按命令名称汇总窗口内的命令
+        :return: {'count', 'total_ms', 'request_bytes', 'response_bytes', 'by_command': {名称: {'count', 'total_ms'}}}
+        """
+        result = {'count': self.count, 'total_ms': 0.0, 'request_bytes': 0, 'response_bytes': 0, 'by_command': {}}
+        for record in self.records():
+            result['total_ms'] += record['elapsed_ms']
+            result['request_bytes'] += record['request_bytes']
+            result['response_bytes'] += record['response_bytes']
+            command = result['by_command'].setdefault(record['command'], {'count': 0, 'total_ms': 0.0})
+            command['count'] += 1
+            command['total_ms'] += record['elapsed_ms']
+        result['total_ms'] = round(result['total_ms'], 3)
+        for command in result['by_command'].values():
+            command['total_ms'] = round(command['total_ms'], 3)
+        return result
+
+
+class CommandTracer:
+    """
+    浏览器驱动命令追踪：包装 driver.command_executor.execute，记录每个 HTTP 命令的名称、耗时和数据大小
+    安装后可通过 driver.command_tracer 访问
+    """
+
+    def __init__(self, driver, max_records=10000):
+        """
+        :param driver: WebDriver 实例
+        :param max_records: 最多保留的命令记录数
+        """
+        self.count = 0
+        self.records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        executor = driver.command_executor
+        original_execute = executor.execute
+        self._executor = executor
+        self._original_execute = original_execute
+
+        def execute(command, params):
+            if getattr(self._local, 'suspended', False):
+                return original_execute(command, params)
+            start = time.perf_counter()
+            response = None
+            try:
+                response = original_execute(command, params)
+                return response
+            finally:
+                self._record(command, time.perf_counter() - start, params, response)
+
+        executor.execute = execute
+        driver.command_tracer = self
+
+    @classmethod
+    def install(cls, driver):
+        """
+        为浏览器驱动安装命令追踪，已安装时直接返回
+        :param driver: WebDriver 实例
+        :return: CommandTracer
+        """
+        tracer = getattr(driver, 'command_tracer', None)
+        return tracer if tracer is not None else cls(driver)
+
+    @staticmethod
+    def uninstall(driver):
+        """
+        移除浏览器驱动的命令追踪，恢复原来的 command_executor.execute，未安装时不做任何操作
+        :param driver: WebDriver 实例
+        :return: None
+        """
+        tracer = getattr(driver, 'command_tracer', None)
+        if tracer is None:
+            return
+        tracer._executor.execute = tracer._original_execute
+        del driver.command_tracer
+
+    def _record(self, command, elapsed, params, response):
+        value = response.get('value') if isinstance(response, dict) else None
+        record = {
+            'command': command,
+            'elapsed_ms': round(elapsed * 1000, 3),
+            'request_bytes': len(json.dumps(params)) if params else 0,
+            # 截图等大字符串直接取长度，其他返回值只做粗略估计，避免额外的序列化开销
+            'response_bytes': len(value) if isinstance(value, str) else 0,
+        }
+        with self._lock:
+            self.records.append((self.count, record))
+            self.count += 1
+
+    @contextmanager
+    def suspend(self):
+        """
+        当前线程中暂停记录命令，用于框架自身的辅助命令（如失败追踪读取元素片段），不计入测试的命令数
+        :return: 上下文管理器
+        """
+        suspended = getattr(self._local, 'suspended', False)
+        self._local.suspended = True
+        try:
+            yield
+        finally:
+            self._local.suspended = suspended
+
+    def window(self):
+        """
+        从当前开始统计命令
+        :return: CommandWindow
+        """
+        return CommandWindow(self)
@@ -0,0 +1,101 @@
+import os
+import json
+import gzip
+import shutil
+import threading
+from datetime import datetime
+
+from utils.logger import Logger
+from utils import action_events
+
+
+class EventLog:
+    """
+    页面操作的结构化事件日志：每个事件一行 JSON（JSONL），每个测试进程写入自己的文件，
+    文件超过 max_bytes 后轮转，并在后台线程中压缩（gzip，安装了 zstandard 时可使用 zstd）
+    使用 python -m utils.event_query 查询
+    """
+
+    def __init__(self, directory, max_bytes=50 * 1024 * 1024, compression='gzip'):
+        """
+        :param directory: 事件日志目录
+        :param max_bytes: 单个文件的最大字节数
+        :param compression: 轮转后的压缩方式 gzip / zstd / none
+        """
+        if compression not in ('gzip', 'zstd', 'none'):
+            message = f"压缩方式（{compression}）错误, 支持的压缩方式：(gzip, zstd, none)"
+            Logger.error(message)
+            raise ValueError(message)
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compression = compression
+        self.worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+        self._lock = threading.Lock()
+        self._compressors = []
+        self._file = None
+        self._path = None
+        self._sequence = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self):
+        self._sequence += 1
+        name = f"events_{datetime.now().strftime('%Y%m%d-%H%M%S')}_{self.worker}_{self._sequence}.jsonl"
+        self._path = os.path.join(self.directory, name)
+        self._file = open(self._path, 'a', encoding='utf-8')
+
+    def _rotate(self):
+        self._file.close()
+        path = self._path
+        self._file = None
+        if self.compression != 'none':
+            compressor = threading.Thread(target=self._compress, args=(path,), daemon=True)
+            compressor.start()
+            self._compressors.append(compressor)
+
+    def _compress(self, path):
+        try:
+            if self.compression == 'zstd':
+                import zstandard
+                with open(path, 'rb') as src, open(path + '.zst', 'wb') as dst:
+                    zstandard.ZstdCompressor().copy_stream(src, dst)
+            else:
+                with open(path, 'rb') as src, gzip.open(path + '.gz', 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+            os.remove(path)
+        except Exception as e:
+            Logger.warning('压缩事件日志失败: {} ({})', path, e)
+
+    def write(self, event, page=None):
+        """
+        写入一个事件，可直接作为 action_events 的监听器
+        :param event: 事件
+        :param page: 页面对象（未使用）
+        :return: None
+        """
+        line = json.dumps(event, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            if self._file is None:
+                self._open()
+            self._file.write(line)
+            if self._file.tell() >= self.max_bytes:
+                self._rotate()
+
+    def start(self):
+        """
+        开始记录页面操作事件
+        :return: self
+        """
+        action_events.add_listener(self.write)
+        return self
+
+    def close(self):
+        """
+        停止记录，压缩当前文件并等待所有压缩完成
+        :return: None
+        """
+        action_events.remove_listener(self.write)
+        with self._lock:
+            if self._file is not None:
+                self._rotate()
+        for compressor in self._compressors:
+            compressor.join()
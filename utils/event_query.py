@@ -0,0 +1,142 @@
+"""
+查询页面操作事件日志（参见 EventLog），流式读取，不会把所有事件加载到内存中
+
+用法：
+    python -m utils.event_query slowest --days 7 --top 20 --by p95_ms
+    python -m utils.event_query failures --days 1
+"""
+import os
+import io
+import sys
+import json
+import gzip
+import math
+import time
+import argparse
+from collections import defaultdict
+
+from config.pathconf import EVENT_LOG_DIR
+
+# 耗时直方图：按对数分桶（每桶约 10%），用于流式计算分位数
+_BUCKET_BASE = 1.1
+
+
+def _open(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith('.zst'):
+        import zstandard
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb')), encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_events(directory=EVENT_LOG_DIR, days=None):
+    """
+    逐行读取事件日志
+    :param directory: 事件日志目录
+    :param days: 只读取最近几天的事件
+    :return: 事件生成器
+    """
+    since = time.time() - days * 86400 if days else 0
+    if not os.path.isdir(directory):
+        return
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not name.startswith('events_') or os.path.getmtime(path) < since:
+            continue
+        with _open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # 进程异常退出时最后一行可能不完整
+                    continue
+                if event.get('ts', 0) >= since:
+                    yield event
+
+
+class _Stat:
+    __slots__ = ('count', 'errors', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = defaultdict(int)
+
+    def add(self, duration, failed):
+        self.count += 1
+        self.errors += failed
+        self.total += duration
+        self.max = max(self.max, duration)
+        self.buckets[math.floor(math.log(max(duration, 0.001), _BUCKET_BASE))] += 1
+
+    def percentile(self, p):
+        target = self.count * p
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= target:
+                return min(_BUCKET_BASE ** (bucket + 1), self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_ms': round(self.total / self.count, 3),
+            'p50_ms': round(self.percentile(0.5), 3),
+            'p95_ms': round(self.percentile(0.95), 3),
+            'max_ms': round(self.max, 3),
+            'total_ms': round(self.total, 3),
+        }
+
+
+def aggregate(events, action=None, top_level_only=True):
+    """
+    按 (操作, 定位) 汇总耗时
+    :param events: 事件可迭代对象
+    :param action: 只统计指定的操作
+    :param top_level_only: 只统计最外层操作（不包括 click 内部的 element_wait 等）
+    :return: {(操作, 定位): 汇总}
+    """
+    stats = defaultdict(_Stat)
+    for event in events:
+        if action and event.get('action') != action:
+            continue
+        if top_level_only and event.get('depth', 0) > 0:
+            continue
+        stats[(event.get('action'), event.get('locator'))].add(event.get('duration_ms', 0.0),
+                                                                event.get('outcome') != 'ok')
+    return {key: stat.summary() for key, stat in stats.items()}
+
+
+def _sort_field(value):
+    # --by 同时接受 p95 等省略 _ms 的写法
+    return value if value.endswith('_ms') else f'{value}_ms'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='查询页面操作事件日志')
+    parser.add_argument('command', choices=['slowest', 'failures'], help='slowest: 最慢的定位; failures: 失败最多的定位')
+    parser.add_argument('--dir', default=EVENT_LOG_DIR, help='事件日志目录')
+    parser.add_argument('--days', type=float, default=7, help='最近几天的事件')
+    parser.add_argument('--top', type=int, default=20, help='显示前几条')
+    parser.add_argument('--by', default='p95_ms', type=_sort_field,
+                        choices=['mean_ms', 'p50_ms', 'p95_ms', 'max_ms', 'total_ms'], help='slowest 的排序字段')
+    parser.add_argument('--action', help='只统计指定的操作，如 click')
+    parser.add_argument('--all-depths', action='store_true', help='包括嵌套的操作')
+    args = parser.parse_args(argv)
+
+    stats = aggregate(iter_events(args.dir, args.days), args.action, not args.all_depths)
+    sort_key = args.by if args.command == 'slowest' else 'errors'
+    rows = sorted(stats.items(), key=lambda item: item[1][sort_key], reverse=True)[:args.top]
+    for (action, locator), summary in rows:
+        sys.stdout.write(json.dumps({'action': action, 'locator': locator, **summary}, ensure_ascii=False) + '\n')
+
+
+if __name__ == '__main__':
+    main()
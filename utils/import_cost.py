@@ -0,0 +1,69 @@
+"""
+模块导入耗时报告：在新的解释器中用 python -X importtime 导入指定模块，按模块列出自身和累计导入耗时
+
+用法：python -m utils.import_cost pages.base_page --top 20 --sort cumulative
+"""
+import os
+import sys
+import argparse
+import subprocess
+
+from config.pathconf import BASE_DIR
+
+
+def measure(module, python=sys.executable):
+    """
+    在新的解释器中导入模块并解析 -X importtime 的输出
+    :param module: 模块名，如 pages.base_page
+    :param python: Python 解释器路径
+    :return: [(模块名, 自身耗时(微秒), 累计耗时(微秒), 嵌套深度), ...]，按导入完成的顺序
+    """
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run([python, '-X', 'importtime', '-c', f'import {module}'], cwd=BASE_DIR,
+                            env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'导入模块 {module} 失败:\n{result.stderr[-2000:]}')
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        if not self_us.strip().isdigit():
+            # 表头：self [us] | cumulative | imported package
+            continue
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        entries.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return entries
+
+
+def cumulative_ms(entries, module):
+    """
+    指定模块的累计导入耗时（毫秒）
+    :param entries: measure 的结果
+    :param module: 模块名
+    :return: 毫秒，模块未导入时返回 None
+    """
+    for name, _, cumulative, _ in entries:
+        if name == module:
+            return cumulative / 1000
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='模块导入耗时报告')
+    parser.add_argument('module', nargs='?', default='pages.base_page', help='需要导入的模块')
+    parser.add_argument('--top', type=int, default=20, help='显示耗时最多的模块数量')
+    parser.add_argument('--sort', choices=('self', 'cumulative'), default='self', help='排序方式')
+    args = parser.parse_args(argv)
+
+    entries = measure(args.module)
+    index = 1 if args.sort == 'self' else 2
+    print(f"{'self(ms)':>10}{'cumulative(ms)':>16}  module")
+    for name, self_us, cumulative_us, depth in sorted(entries, key=lambda e: e[index], reverse=True)[:args.top]:
+        print(f'{self_us / 1000:>10.1f}{cumulative_us / 1000:>16.1f}  {name}')
+    print(f'导入 {args.module} 共 {len(entries)} 个模块，累计 {cumulative_ms(entries, args.module):.1f} ms')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
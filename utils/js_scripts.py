@@ -0,0 +1,292 @@
+"""
+在浏览器中执行的 JS 脚本
+"""
+
+# 在页面内按 Selenium 的定位方式查找元素，by 为 By 类属性的值
+# 链接文本按 a 标签的可见文本匹配，其余定位方式转换为 CSS 选择器或 XPath
+FIND_ELEMENT_JS = """
+var __find = function (by, value, all) {
+    var nodes = [];
+    if (by === 'xpath') {
+        var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        for (var i = 0; i < result.snapshotLength; i++) {
+            nodes.push(result.snapshotItem(i));
+        }
+    } else if (by === 'link text' || by === 'partial link text') {
+        nodes = Array.prototype.filter.call(document.querySelectorAll('a'), function (a) {
+            var text = (a.innerText || a.textContent || '').trim();
+            return by === 'link text' ? text === value : text.indexOf(value) !== -1;
+        });
+    } else {
+        var selector = {
+            'id': '#' + CSS.escape(value),
+            'name': '[name="' + CSS.escape(value) + '"]',
+            'class name': '.' + CSS.escape(value),
+            'tag name': value,
+            'css selector': value
+        }[by];
+        nodes = all ? Array.prototype.slice.call(document.querySelectorAll(selector))
+                    : [document.querySelector(selector)].filter(Boolean);
+    }
+    return all ? nodes : (nodes[0] || null);
+};
+"""
+
+# 通过 MutationObserver 在页面内等待元素出现，出现或超时后才返回，整个等待只需要一次请求
+# arguments: by, value, timeout(毫秒), callback
+OBSERVE_ELEMENT_JS = FIND_ELEMENT_JS + """
+var by = arguments[0], value = arguments[1], timeout = arguments[2];
+var done = arguments[arguments.length - 1];
+var found = __find(by, value, false);
+if (found) {
+    return done(found);
+}
+var timer = null;
+var observer = new MutationObserver(function () {
+    var element = __find(by, value, false);
+    if (element) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(element);
+    }
+});
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+timer = setTimeout(function () {
+    observer.disconnect();
+    done(null);
+}, timeout);
+"""
+
+# 统计页面内未完成的 fetch/XHR 请求数量，首次执行时注入监控代码（注入之前发出的请求无法统计）
+# 返回 [document.readyState, 未完成请求数, 距最近一次请求开始或结束的毫秒数]
+NETWORK_STATE_JS = """
+var monitor = window.__uiNetworkMonitor;
+if (!monitor) {
+    monitor = window.__uiNetworkMonitor = {pending: 0, last: Date.now()};
+    var begin = function () {
+        monitor.pending++;
+        monitor.last = Date.now();
+    };
+    var end = function () {
+        monitor.pending = Math.max(0, monitor.pending - 1);
+        monitor.last = Date.now();
+    };
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            begin();
+            return originalFetch.apply(this, arguments).then(
+                function (response) { end(); return response; },
+                function (error) { end(); throw error; }
+            );
+        };
+    }
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        begin();
+        this.addEventListener('loadend', end);
+        return originalSend.apply(this, arguments);
+    };
+}
+return [document.readyState, monitor.pending, Date.now() - monitor.last];
+"""
+
+# 等待 DOM 在指定时间内没有任何变化，返回是否在超时前达到静默
+# arguments: quiet(毫秒), timeout(毫秒), callback
+DOM_QUIET_JS = """
+var quiet = arguments[0], timeout = arguments[1];
+var done = arguments[arguments.length - 1];
+var quietTimer = null, timeoutTimer = null;
+var observer = new MutationObserver(function () {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(finish, quiet, true);
+});
+var finish = function (result) {
+    observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(timeoutTimer);
+    done(result);
+};
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+quietTimer = setTimeout(finish, quiet, true);
+timeoutTimer = setTimeout(finish, timeout, false);
+"""
+
+# 读取元素的文本或属性，text 读取可见文本，其余优先读取同名属性(property)，与 Selenium 的 get_attribute 保持一致
+READ_FIELD_JS = """
+var __read = function (element, field) {
+    if (field === 'text') {
+        return (element.innerText !== undefined ? element.innerText : element.textContent).trim();
+    }
+    var value = element[field];
+    if (typeof value === 'boolean') {
+        return value ? 'true' : null;
+    }
+    if (value !== undefined && value !== null && typeof value !== 'object' && typeof value !== 'function') {
+        return String(value);
+    }
+    return element.getAttribute(field);
+};
+"""
+
+# 一次读取多个元素的文本或属性
+# arguments: [[名称, by, value, 字段], ...]
+# 返回 {名称: [是否找到元素, 值]}
+READ_MANY_JS = FIND_ELEMENT_JS + READ_FIELD_JS + """
+var result = {};
+arguments[0].forEach(function (spec) {
+    var element = __find(spec[1], spec[2], false);
+    result[spec[0]] = element ? [true, __read(element, spec[3])] : [false, null];
+});
+return result;
+"""
+
+# 将多个元素转换为结构化记录（文本、属性、位置大小）
+# arguments: 元素列表(为 null 时按 by, value 在页面内查找), by, value, [属性名, ...]
+READ_ELEMENTS_JS = FIND_ELEMENT_JS + READ_FIELD_JS + """
+var elements = arguments[0] || __find(arguments[1], arguments[2], true);
+var attributes = arguments[3];
+return elements.map(function (element) {
+    var rect = element.getBoundingClientRect();
+    var values = {};
+    attributes.forEach(function (name) {
+        values[name] = __read(element, name);
+    });
+    return {
+        text: __read(element, 'text'),
+        attributes: values,
+        rect: {x: rect.x, y: rect.y, width: rect.width, height: rect.height}
+    };
+});
+"""
+
+# 批量定位表单字段，并清空或直接设置字段的值（触发 input/change 事件）
+# arguments: [[名称, by, value], ...], 是否清空, 字段值列表(为 null 时不设置值)
+# 返回 {名称: [元素或 null, 错误信息或 null]}
+FILL_FORM_JS = FIND_ELEMENT_JS + """
+var specs = arguments[0], clear = arguments[1], values = arguments[2];
+var setValue = function (element, value) {
+    if (element.isContentEditable) {
+        element.textContent = value;
+    } else {
+        // 使用原型上的 setter，兼容 React 等框架对 value 属性的拦截
+        var proto = Object.getPrototypeOf(element);
+        var descriptor = Object.getOwnPropertyDescriptor(proto, 'value');
+        descriptor && descriptor.set ? descriptor.set.call(element, value) : element.value = value;
+    }
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+};
+var result = {};
+specs.forEach(function (spec, index) {
+    var element = __find(spec[1], spec[2], false);
+    if (!element) {
+        result[spec[0]] = [null, 'element not found'];
+        return;
+    }
+    if (element.disabled || element.readOnly) {
+        result[spec[0]] = [element, 'element is disabled or readonly'];
+        return;
+    }
+    if (values) {
+        element.focus();
+        setValue(element, values[index]);
+        element.dispatchEvent(new Event('change', {bubbles: true}));
+        element.blur();
+    } else if (clear) {
+        setValue(element, '');
+        element.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+    result[spec[0]] = [element, null];
+});
+return result;
+"""
+
+# 收集页面中所有链接、图片、脚本、样式表的地址（去重，只保留 http/https）
+# 返回 [[地址, 标签名], ...]
+HARVEST_LINKS_JS = """
+var seen = {}, links = [];
+var collect = function (selector, attribute) {
+    document.querySelectorAll(selector).forEach(function (element) {
+        // 去掉锚点后再去重，同一页面的不同锚点只检查一次
+        var url = (element[attribute] || '').split('#')[0];
+        if (url && /^https?:/.test(url) && !seen[url]) {
+            seen[url] = true;
+            links.push([url, element.tagName.toLowerCase()]);
+        }
+    });
+};
+collect('a[href]', 'href');
+collect('img[src]', 'src');
+collect('script[src]', 'src');
+collect('link[rel=stylesheet][href]', 'href');
+return links;
+"""
+
+# 一次异步调用读取页面性能指标：Navigation Timing、Resource Timing 汇总、paint、LCP、CLS
+# LCP、CLS 只能通过 PerformanceObserver（buffered）获取，观察到 LCP 或等待 timeout 毫秒后返回
+# arguments: timeout(毫秒), callback
+PAGE_METRICS_JS = """
+var timeout = arguments[0];
+var done = arguments[arguments.length - 1];
+var lcp = null, cls = 0, finished = false, observers = [];
+var round = function (value) {
+    return value === null || value === undefined ? null : Math.round(value * 10) / 10;
+};
+var observe = function (type, handler) {
+    try {
+        var observer = new PerformanceObserver(function (list) {
+            list.getEntries().forEach(handler);
+        });
+        observer.observe({type: type, buffered: true});
+        observers.push(observer);
+    } catch (e) {
+        // 浏览器不支持该类型的指标
+    }
+};
+var finish = function () {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observers.forEach(function (observer) { observer.disconnect(); });
+    var nav = performance.getEntriesByType('navigation')[0] || null;
+    var paint = {};
+    performance.getEntriesByType('paint').forEach(function (entry) {
+        paint[entry.name] = round(entry.startTime);
+    });
+    var resources = {count: 0, transfer_bytes: 0, by_type: {}};
+    performance.getEntriesByType('resource').forEach(function (entry) {
+        var type = entry.initiatorType || 'other';
+        var group = resources.by_type[type] = resources.by_type[type] || {count: 0, transfer_bytes: 0};
+        resources.count += 1;
+        resources.transfer_bytes += entry.transferSize || 0;
+        group.count += 1;
+        group.transfer_bytes += entry.transferSize || 0;
+    });
+    done({
+        url: location.href,
+        navigation: nav && {
+            type: nav.type,
+            ttfb_ms: round(nav.responseStart - nav.startTime),
+            dom_content_loaded_ms: round(nav.domContentLoadedEventEnd - nav.startTime),
+            load_ms: nav.loadEventEnd > 0 ? round(nav.loadEventEnd - nav.startTime) : null,
+            transfer_bytes: nav.transferSize || 0
+        },
+        fp_ms: paint['first-paint'] === undefined ? null : paint['first-paint'],
+        fcp_ms: paint['first-contentful-paint'] === undefined ? null : paint['first-contentful-paint'],
+        lcp_ms: round(lcp),
+        cls: Math.round(cls * 10000) / 10000,
+        resources: resources
+    });
+};
+observe('largest-contentful-paint', function (entry) {
+    lcp = entry.renderTime || entry.startTime;
+    setTimeout(finish, 0);
+});
+observe('layout-shift', function (entry) {
+    if (!entry.hadRecentInput) {
+        cls += entry.value;
+    }
+});
+setTimeout(finish, timeout);
+"""
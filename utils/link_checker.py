@@ -0,0 +1,151 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from utils.logger import Logger
+from utils.js_scripts import HARVEST_LINKS_JS
+from utils.network_replay import NetworkReplay
+
+
+class LinkChecker:
+    """
+    并发链接检查：复用保持连接的 Session（省去每次请求的 DNS、TCP、TLS 开销），
+    优先使用 HEAD 请求，服务器不支持时改用只读取响应头的 GET 请求，
+    限制对同一域名的并发请求数，检查结果按 TTL 缓存并在所有测试间共享（请求异常的结果只短时间缓存）
+    """
+    # 检查结果缓存 {url: (过期时间, 结果)}，所有 LinkChecker 共享
+    _cache = {}
+    _cache_lock = threading.Lock()
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    # HEAD 请求返回这些状态码时改用 GET 请求重试（部分服务器不支持或错误处理 HEAD 请求）
+    _head_fallback_status = {403, 404, 405, 501}
+
+    def __init__(self, max_workers=16, per_host=4, timeout=5, ttl=600, error_ttl=10):
+        """
+        :param max_workers: 最大并发请求数
+        :param per_host: 同一域名的最大并发请求数
+        :param timeout: 单个请求的超时时间（秒）
+        :param ttl: 检查结果的缓存时间（秒）
+        :param error_ttl: 请求异常（超时、连接失败等）的结果的缓存时间（秒），避免同一页面中重复请求不可用的地址，
+            又不会让偶发的网络错误影响之后的测试；为 0 时不缓存
+        """
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.timeout = timeout
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        # requests 在创建 LinkChecker 时才导入，不检查链接的测试不需要加载
+        import requests
+        from requests.adapters import HTTPAdapter
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=per_host)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._host_limits = {}
+        self._host_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='link-checker')
+
+    @classmethod
+    def shared(cls):
+        """
+        进程内共享的 LinkChecker，测试之间复用连接池和线程池
+        :return: LinkChecker
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    cls._shared = cls()
+        return cls._shared
+
+    @classmethod
+    def clear_cache(cls):
+        """
+        清空检查结果缓存
+        :return: None
+        """
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    def _host_limit(self, url):
+        host = urlsplit(url).netloc
+        with self._host_lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.Semaphore(self.per_host)
+            return self._host_limits[host]
+
+    def _request(self, method, url):
+        response = self._session.request(method, url, timeout=self.timeout, allow_redirects=True, stream=True,
+                                         **NetworkReplay.requests_kwargs())
+        # 只读取响应头，不下载响应体
+        response.close()
+        return response.status_code
+
+    def check(self, url, fresh=False):
+        """
+        检查单个地址
+        :param url: 地址
+        :param fresh: 为 True 时忽略缓存的结果重新请求，请求结果仍写入缓存
+        :return: {'url': 地址, 'ok': 是否可以正常访问, 'status': 状态码, 'method': 请求方法,
+                  'elapsed': 耗时, 'error': 错误信息}
+        """
+        now = time.monotonic()
+        with self._cache_lock:
+            cached = self._cache.get(url)
+        if cached and cached[0] > now and not fresh:
+            return cached[1]
+
+        result = {'url': url, 'ok': False, 'status': None, 'method': 'HEAD', 'elapsed': 0.0, 'error': None}
+        start = time.monotonic()
+        try:
+            with self._host_limit(url):
+                status = self._request('HEAD', url)
+                if status in self._head_fallback_status:
+                    result['method'] = 'GET'
+                    status = self._request('GET', url)
+            result.update(status=status, ok=200 <= status < 400)
+        except Exception as e:
+            result['error'] = str(e)
+        result['elapsed'] = time.monotonic() - start
+
+        ttl = self.ttl if result['error'] is None else self.error_ttl
+        if ttl > 0:
+            with self._cache_lock:
+                self._cache[url] = (time.monotonic() + ttl, result)
+        return result
+
+    def check_all(self, urls):
+        """
+        并发检查多个地址，重复的地址只请求一次
+        :param urls: 地址列表
+        :return: 检查结果列表，顺序与 urls 一致，参见 check
+        """
+        unique_urls = list(dict.fromkeys(urls))
+        results = dict(zip(unique_urls, self._executor.map(self.check, unique_urls)))
+        return [results[url] for url in urls]
+
+    @staticmethod
+    def harvest(driver):
+        """
+        通过一次 JS 调用收集当前页面中所有链接、图片、脚本、样式表的地址
+        :param driver: WebDriver 实例
+        :return: [(地址, 标签名), ...]
+        """
+        return [tuple(link) for link in driver.execute_script(HARVEST_LINKS_JS)]
+
+    def audit(self, driver):
+        """
+        检查当前页面中的所有地址
+        :param driver: WebDriver 实例
+        :return: 检查结果列表，每项额外包含 'tag' 标签名
+        """
+        links = self.harvest(driver)
+        start = time.monotonic()
+        results = self.check_all([url for url, _ in links])
+        results = [dict(result, tag=tag) for result, (_, tag) in zip(results, links)]
+        broken = [result for result in results if not result['ok']]
+        Logger.debug('检查页面地址 {} 个，失败 {} 个，耗时 {:.2f} 秒',
+                     len(results), len(broken), time.monotonic() - start)
+        return results
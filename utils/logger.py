@@ -1,9 +1,25 @@
+import os
+import sys
 import time
-import inspect
+from collections import deque
 from loguru import logger
 from pathlib import Path
 
-from config.pathconf import BASE_DIR
+from config.pathconf import BASE_DIR, LOG_LEVEL, LOG_FILE_LEVEL, LOG_BUFFER_SIZE
+
+
+class _RingBuffer:
+    """
+    内存中的日志环形缓冲区，只在测试执行期间收集日志，超过容量时丢弃最早的日志
+    """
+
+    def __init__(self, capacity):
+        self.records = deque(maxlen=capacity)
+        self.active = False
+
+    def write(self, message):
+        if self.active:
+            self.records.append(str(message))
 
 
 class Logger:
@@ -12,71 +28,150 @@ class Logger:
 
     # 类属性，保存配置好的logger实例
     instance = logger
+    # 当前测试进程名称，pytest-xdist 下为 gw0、gw1...，写入磁盘的日志按进程分文件
+    worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+    # 每个测试的日志缓冲区，测试失败或重试时才写入磁盘，参见 start_capture / dump_capture
+    _buffer = _RingBuffer(LOG_BUFFER_SIZE)
+    # 已添加的输出 id 及其日志级别（数值），_min_level 为其中最低的级别，参见 _enabled
+    _sink_levels = {}
+    _min_level = float('inf')
 
     if not _logger_initialized:
         logger_path = Path(BASE_DIR, "output/logs")
         if not logger_path.exists():
             logger_path.mkdir(parents=True)
-        instance.add(
-            f"{logger_path}/auto_log_{time.strftime('%Y-%m-%d')}.log",
+        # 替换 loguru 默认的控制台输出，使控制台和文件使用相同的日志级别
+        instance.remove()
+        _sink_levels[instance.add(sys.stderr, level=LOG_LEVEL)] = instance.level(LOG_LEVEL).no
+        # 日志文件只记录 LOG_FILE_LEVEL 及以上的日志，DEBUG 日志只保存在测试的缓冲区中
+        _sink_levels[instance.add(
+            f"{logger_path}/auto_log_{time.strftime('%Y-%m-%d')}_{worker}.log",
             rotation="00:00",
             encoding="utf-8",
             enqueue=True,
             retention="30 days",
-            level="DEBUG",
-        )
+            level=LOG_FILE_LEVEL,
+        )] = instance.level(LOG_FILE_LEVEL).no
+        _sink_levels[instance.add(_buffer.write, level=LOG_LEVEL)] = instance.level(LOG_LEVEL).no
+        _min_level = min(_sink_levels.values())
         _logger_initialized = True
 
+    @staticmethod
+    def add_sink(sink, level, **kwargs):
+        """
+        添加日志输出并记录其日志级别，需要添加输出时使用本方法而不是直接调用 instance.add
+        :param sink: loguru 支持的输出（文件路径、流、函数等）
+        :param level: 日志级别名称或数值
+        :param kwargs: 传给 logger.add 的其他参数
+        :return: 输出 id
+        """
+        handler_id = Logger.instance.add(sink, level=level, **kwargs)
+        Logger._sink_levels[handler_id] = level if isinstance(level, int) else Logger.instance.level(level).no
+        Logger._min_level = min(Logger._sink_levels.values())
+        return handler_id
+
+    @staticmethod
+    def remove_sink(handler_id=None):
+        """
+        移除日志输出，不传 handler_id 时移除全部输出
+        :param handler_id: add_sink 返回的输出 id
+        :return: None
+        """
+        Logger.instance.remove(handler_id)
+        if handler_id is None:
+            Logger._sink_levels.clear()
+        else:
+            Logger._sink_levels.pop(handler_id, None)
+        Logger._min_level = min(Logger._sink_levels.values(), default=float('inf'))
+
+    @staticmethod
+    def start_capture():
+        """
+        开始收集当前测试的日志，清空上一个测试的日志
+        :return: None
+        """
+        Logger._buffer.records.clear()
+        Logger._buffer.active = True
+
+    @staticmethod
+    def stop_capture():
+        """
+        停止收集日志，未写入磁盘的日志会被丢弃
+        :return: None
+        """
+        Logger._buffer.active = False
+        Logger._buffer.records.clear()
+
+    @staticmethod
+    def dump_capture(node_id):
+        """
+        将当前测试收集的日志追加写入本进程的失败日志文件，测试失败或重试时调用
+        :param node_id: 测试的 node id
+        :return: 收集的日志内容
+        """
+        content = ''.join(Logger._buffer.records)
+        failed_path = Path(BASE_DIR, "output/logs/failed")
+        failed_path.mkdir(parents=True, exist_ok=True)
+        log_file = failed_path / f"failed_{time.strftime('%Y-%m-%d')}_{Logger.worker}.log"
+        with open(log_file, 'a', encoding='utf-8') as f:
+            f.write(f"===== {node_id} =====\n{content}\n")
+        return content
+
     @staticmethod
     def _get_caller_depth():
-        # 获取当前的堆栈
-        stack = inspect.stack()
-        # 检查堆栈帧以找到第一个调用点
-        # 这不是 Logger 类的一部分
-        for depth, frame_info in enumerate(stack):
-            if frame_info.frame.f_globals.get('__name__') != __name__:
-                return depth - 1
-        return 0
+        # 沿 f_back 向上查找第一个不属于本模块的帧，不像 inspect.stack() 那样为整个调用栈读取源码
+        frame = sys._getframe()
+        depth = 0
+        while frame is not None and frame.f_globals.get('__name__') == __name__:
+            frame = frame.f_back
+            depth += 1
+        return depth - 1 if frame is not None else 0
+
+    @staticmethod
+    def _enabled(level_no):
+        # 低于所有输出中最低日志级别的日志直接跳过，不查找调用者也不格式化消息
+        return level_no >= Logger._min_level
 
     @staticmethod
     def trace(*args, **kwargs):
-        depth = Logger._get_caller_depth()
-        Logger.instance.opt(depth=depth).trace(*args, **kwargs)
+        if Logger._enabled(5):
+            Logger.instance.opt(depth=Logger._get_caller_depth()).trace(*args, **kwargs)
 
     @staticmethod
     def debug(*args, **kwargs):
-        depth = Logger._get_caller_depth()
-        Logger.instance.opt(depth=depth).debug(*args, **kwargs)
+        if Logger._enabled(10):
+            Logger.instance.opt(depth=Logger._get_caller_depth()).debug(*args, **kwargs)
 
     @staticmethod
     def info(*args, **kwargs):
-        depth = Logger._get_caller_depth()
-        Logger.instance.opt(depth=depth).info(*args, **kwargs)
+        if Logger._enabled(20):
+            Logger.instance.opt(depth=Logger._get_caller_depth()).info(*args, **kwargs)
 
     @staticmethod
     def warning(*args, **kwargs):
-        depth = Logger._get_caller_depth()
-        Logger.instance.opt(depth=depth).warning(*args, **kwargs)
+        if Logger._enabled(30):
+            Logger.instance.opt(depth=Logger._get_caller_depth()).warning(*args, **kwargs)
 
     @staticmethod
     def error(*args, **kwargs):
-        depth = Logger._get_caller_depth()
-        Logger.instance.opt(depth=depth).error(*args, **kwargs)
+        if Logger._enabled(40):
+            Logger.instance.opt(depth=Logger._get_caller_depth()).error(*args, **kwargs)
 
     @staticmethod
     def critical(*args, **kwargs):
-        depth = Logger._get_caller_depth()
-        Logger.instance.opt(depth=depth).critical(*args, **kwargs)
+        if Logger._enabled(50):
+            Logger.instance.opt(depth=Logger._get_caller_depth()).critical(*args, **kwargs)
 
     @staticmethod
     def exception(*args, **kwargs):
-        depth = Logger._get_caller_depth()
-        Logger.instance.opt(depth=depth).exception(*args, **kwargs)
+        if Logger._enabled(40):
+            Logger.instance.opt(depth=Logger._get_caller_depth()).exception(*args, **kwargs)
 
 
 # 使用示例
 if __name__ == '__main__':
     Logger.debug("记录一些调试信息")
+    Logger.debug("延迟格式化的调试信息: {}", 42)
     Logger.info("记录一些一般信息")
     Logger.warning("记录一些警告信息")
     Logger.error("记录一些错误信息")
@@ -0,0 +1,335 @@
+import os
+import ssl
+import json
+import hashlib
+import threading
+import subprocess
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+from utils.logger import Logger
+
+
+@contextmanager
+def _file_lock(path):
+    # 进程间的排他文件锁，多个测试进程（pytest-xdist）同时保存索引时依次执行
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class ResponseStore:
+    """
+    录制的响应存储：响应体按 SHA-256 存放在 bodies 目录下，相同内容只保存一份；
+    index.json 按 "请求方法 URL 请求体哈希" 索引响应，同一请求录制多次时回放按录制顺序依次返回
+    重新录制的请求替换之前录制的响应，其他请求的响应保持不变
+    """
+
+    def __init__(self, directory, ignore_params=()):
+        """
+        :param directory: 存储目录
+        :param ignore_params: 生成索引时忽略的 URL 查询参数（如时间戳、随机数）
+        """
+        self.directory = directory
+        self.ignore_params = set(ignore_params)
+        self._bodies_dir = os.path.join(directory, 'bodies')
+        self._index_path = os.path.join(directory, 'index.json')
+        self._index = {}
+        # 当前进程录制的请求：索引 -> 响应列表，保存时替换索引文件中的对应项
+        self._recorded = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self._index_path):
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                self._index = json.load(f)
+
+    def _key(self, method, url, body):
+        parts = urlsplit(url)
+        if self.ignore_params:
+            query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in self.ignore_params]
+            parts = parts._replace(query=urlencode(query))
+        body_hash = hashlib.sha256(body or b'').hexdigest()[:16]
+        return f'{method.upper()} {urlunsplit(parts._replace(fragment=""))} {body_hash}'
+
+    def _body_path(self, digest):
+        return os.path.join(self._bodies_dir, digest[:2], digest)
+
+    def add(self, method, url, request_body, status, reason, headers, body):
+        """
+        保存一个响应
+        :param method: 请求方法
+        :param url: 请求地址
+        :param request_body: 请求体
+        :param status: 响应状态码
+        :param reason: 响应状态描述
+        :param headers: 响应头 [(名称, 值), ...]
+        :param body: 响应体
+        :return: None
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._body_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(body)
+        entry = {'status': status, 'reason': reason, 'headers': [list(h) for h in headers], 'body': digest}
+        key = self._key(method, url, request_body)
+        with self._lock:
+            if key not in self._recorded:
+                # 首次重新录制时丢弃之前录制的响应
+                self._recorded[key] = self._index[key] = []
+            self._recorded[key].append(entry)
+
+    def lookup(self, method, url, request_body):
+        """
+        查找录制的响应
+        :param method: 请求方法
+        :param url: 请求地址
+        :param request_body: 请求体
+        :return: (状态码, 状态描述, 响应头, 响应体)，没有录制时返回 None
+        """
+        key = self._key(method, url, request_body)
+        with self._lock:
+            entries = self._index.get(key)
+            if not entries:
+                return None
+            cursor = self._cursors.get(key, 0)
+            entry = entries[min(cursor, len(entries) - 1)]
+            self._cursors[key] = cursor + 1
+        with open(self._body_path(entry['body']), 'rb') as f:
+            body = f.read()
+        return entry['status'], entry['reason'], entry['headers'], body
+
+    def save(self):
+        """
+        保存索引文件：加文件锁后重新读取磁盘上的索引，只替换当前进程录制的请求，
+        多个测试进程同时录制时不会互相覆盖
+        :return: None
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock, _file_lock(f'{self._index_path}.lock'):
+            index = {}
+            if os.path.exists(self._index_path):
+                with open(self._index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+            index.update(self._recorded)
+            # 先写临时文件再改名，回放的进程不会读到不完整的索引
+            temp_path = f'{self._index_path}.{os.getpid()}.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, ensure_ascii=False, indent=1)
+            os.replace(temp_path, self._index_path)
+            self._index = index
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # 不转发给上游以及不返回给浏览器的逐跳响应头
+    _hop_headers = {
+        'connection', 'keep-alive', 'proxy-connection', 'proxy-authorization', 'proxy-authenticate',
+        'te', 'trailer', 'transfer-encoding', 'upgrade', 'content-length', 'content-encoding', 'host',
+    }
+    _tunnel_host = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_CONNECT(self):
+        # HTTPS 请求：建立隧道后用代理证书解密，再在同一连接上继续处理请求
+        self.send_response(200, 'Connection Established')
+        self.end_headers()
+        self.wfile.flush()
+        context = self.server.proxy.ssl_context
+        if context is None:
+            self.close_connection = True
+            return
+        try:
+            connection = context.wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError) as e:
+            Logger.warning(f'代理建立 HTTPS 连接失败: {self.path} ({e})')
+            self.close_connection = True
+            return
+        self.connection = connection
+        self.rfile = connection.makefile('rb', self.rbufsize)
+        self.wfile = connection.makefile('wb')
+        self._tunnel_host = self.path[:-4] if self.path.endswith(':443') else self.path
+        self.close_connection = False
+
+    def _handle(self):
+        url = self.path if self._tunnel_host is None else f'https://{self._tunnel_host}{self.path}'
+        length = int(self.headers.get('Content-Length') or 0)
+        request_body = self.rfile.read(length) if length else b''
+        proxy = self.server.proxy
+        if proxy.mode == 'record':
+            headers = [(k, v) for k, v in self.headers.items() if k.lower() not in self._hop_headers]
+            try:
+                response = proxy.forward(self.command, url, headers, request_body)
+            except Exception as e:
+                Logger.warning(f'代理请求上游失败: {self.command} {url} ({e})')
+                return self._respond(502, 'Bad Gateway', [], b'')
+            proxy.store.add(self.command, url, request_body, *response)
+            proxy._count('recorded')
+            return self._respond(*response)
+        response = proxy.store.lookup(self.command, url, request_body)
+        if response is None:
+            proxy._count('misses')
+            Logger.warning(f'回放时没有找到录制的响应: {self.command} {url}')
+            return self._respond(404, 'Not Recorded', [('X-Replay-Miss', '1')], b'')
+        proxy._count('hits')
+        return self._respond(*response)
+
+    def _respond(self, status, reason, headers, body):
+        self.send_response(status, reason)
+        for name, value in headers:
+            if name.lower() not in self._hop_headers:
+                self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+
+class NetworkReplay:
+    """
+    录制/回放网络请求的本地代理：
+    record 模式下代理把请求转发给真实服务器，同时保存响应；
+    replay 模式下只从录制的响应中返回，完全离线，测试结果不受网络延迟影响
+    浏览器通过 WebDriverFactory.get_driver(proxy=...) 使用代理，requests 请求通过 requests_kwargs() 使用代理
+    HTTPS 请求使用自签名证书解密，浏览器需要忽略证书错误（WebDriverFactory 会自动设置）
+    """
+    # 当前正在运行的代理，供 requests 请求使用
+    active = None
+
+    def __init__(self, mode, directory, port=0, ignore_params=()):
+        """
+        :param mode: record / replay
+        :param directory: 录制文件目录
+        :param port: 代理端口，0 表示随机端口
+        :param ignore_params: 生成索引时忽略的 URL 查询参数
+        """
+        if mode not in ('record', 'replay'):
+            message = f"网络模式（{mode}）错误, 支持的网络模式：(record, replay)"
+            Logger.error(message)
+            raise ValueError(message)
+        self.mode = mode
+        self.directory = directory
+        self.port = port
+        self.store = ResponseStore(directory, ignore_params)
+        self.stats = {'recorded': 0, 'hits': 0, 'misses': 0}
+        self._stats_lock = threading.Lock()
+        self.ssl_context = self._create_ssl_context()
+        self._session = None
+        self._server = None
+        self._thread = None
+
+    def _count(self, name):
+        # 代理在多个线程中处理请求
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _create_ssl_context(self):
+        directory = os.path.dirname(self.directory)
+        cert_path = os.path.join(directory, 'proxy_cert.pem')
+        key_path = os.path.join(directory, 'proxy_key.pem')
+        if not (os.path.exists(cert_path) and os.path.exists(key_path)):
+            os.makedirs(directory, exist_ok=True)
+            # 多个测试进程同时启动时只有一个进程生成证书，其他进程等待后直接使用
+            with _file_lock(f'{cert_path}.lock'):
+                if not (os.path.exists(cert_path) and os.path.exists(key_path)):
+                    temp_cert, temp_key = f'{cert_path}.{os.getpid()}.tmp', f'{key_path}.{os.getpid()}.tmp'
+                    try:
+                        subprocess.run(
+                            ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '3650',
+                             '-subj', '/CN=ui-replay-proxy', '-keyout', temp_key, '-out', temp_cert],
+                            check=True, capture_output=True,
+                        )
+                    except (OSError, subprocess.CalledProcessError) as e:
+                        Logger.warning(f'无法生成代理证书，HTTPS 请求将无法录制和回放 ({e})')
+                        return None
+                    os.replace(temp_key, key_path)
+                    os.replace(temp_cert, cert_path)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        try:
+            context.load_cert_chain(cert_path, key_path)
+        except (ssl.SSLError, OSError) as e:
+            Logger.warning(f'无法加载代理证书，HTTPS 请求将无法录制和回放，可删除 {cert_path} 后重新生成 ({e})')
+            return None
+        return context
+
+    @property
+    def address(self):
+        """
+        代理地址，如 127.0.0.1:8080
+        """
+        return f'127.0.0.1:{self._server.server_address[1]}'
+
+    def forward(self, method, url, headers, body):
+        """
+        把请求转发给真实服务器
+        :return: (状态码, 状态描述, 响应头, 解压后的响应体)
+        """
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.trust_env = False
+        # 只接受 requests 能够解压的编码，保存解压后的响应体
+        headers = [(k, v) for k, v in headers if k.lower() != 'accept-encoding']
+        headers.append(('Accept-Encoding', 'gzip, deflate'))
+        response = self._session.request(method, url, headers=dict(headers), data=body or None,
+                                         allow_redirects=False, timeout=30)
+        return response.status_code, response.reason, list(response.headers.items()), response.content
+
+    def start(self):
+        """
+        启动代理
+        :return: 代理地址
+        """
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), _ProxyHandler)
+        self._server.daemon_threads = True
+        self._server.proxy = self
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        NetworkReplay.active = self
+        Logger.info(f'网络{self.mode}代理已启动: {self.address}, 录制目录: {self.directory}')
+        return self.address
+
+    def stop(self):
+        """
+        停止代理，record 模式下保存索引
+        :return: None
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self.mode == 'record':
+            self.store.save()
+        if NetworkReplay.active is self:
+            NetworkReplay.active = None
+        Logger.info(f'网络{self.mode}代理已停止: {self.stats}')
+
+    @classmethod
+    def requests_kwargs(cls):
+        """
+        requests 请求使用当前代理需要的参数，没有代理运行时返回空字典
+        :return: {'proxies': ..., 'verify': False} 或 {}
+        """
+        if cls.active is None:
+            return {}
+        proxy_url = f'http://{cls.active.address}'
+        return {'proxies': {'http': proxy_url, 'https': proxy_url}, 'verify': False}
@@ -0,0 +1,164 @@
+"""
+验证码识别（ddddocr）：模型在首次识别时加载，同一进程内只加载一次；
+多个测试进程并行时可以启动一个共享的识别服务，避免每个进程各自加载模型
+
+启动共享服务：UI_OCR_AUTHKEY=<随机密钥> python -m utils.ocr serve --port 50070
+测试进程设置环境变量 UI_OCR_SERVER=127.0.0.1:50070 和相同的 UI_OCR_AUTHKEY 后使用该服务，服务不可用时回退为进程内识别
+
+服务基于 multiprocessing 的 BaseManager，使用 pickle 传输数据，持有密钥的客户端可以在服务进程中执行任意代码：
+密钥没有默认值，必须通过 UI_OCR_AUTHKEY 设置；默认只允许监听本机回环地址，监听其他地址需要指定 --allow-remote
+"""
+import os
+import sys
+import socket
+import argparse
+import ipaddress
+import threading
+from multiprocessing.managers import BaseManager
+
+from utils.logger import Logger
+
+
+class _OcrManager(BaseManager):
+    pass
+
+
+class OcrService:
+    """
+    共享识别服务中的识别对象，所有客户端共用一个模型
+    """
+
+    def classify(self, image):
+        return Ocr.local_classify(image)
+
+
+class Ocr:
+    """
+    进程内共享的验证码识别引擎，ddddocr 及其模型在首次使用时才导入和加载
+    """
+    _engine = None
+    _lock = threading.Lock()
+    # 共享识别服务的客户端代理，False 表示连接失败，不再重试
+    _remote = None
+
+    @staticmethod
+    def _server_address():
+        address = os.environ.get('UI_OCR_SERVER')
+        if not address:
+            return None
+        host, port = address.rsplit(':', 1)
+        return host, int(port)
+
+    @staticmethod
+    def _authkey():
+        authkey = os.environ.get('UI_OCR_AUTHKEY')
+        return authkey.encode() if authkey else None
+
+    @classmethod
+    def engine(cls):
+        """
+        进程内的识别引擎，首次调用时加载模型
+        :return: ddddocr.DdddOcr
+        """
+        if cls._engine is None:
+            with cls._lock:
+                if cls._engine is None:
+                    import ddddocr
+                    cls._engine = ddddocr.DdddOcr(show_ad=False)
+                    Logger.debug('加载验证码识别模型')
+        return cls._engine
+
+    @classmethod
+    def local_classify(cls, image):
+        """
+        在当前进程中识别
+        :param image: 图片内容（bytes）
+        :return: 识别的文本
+        """
+        return cls.engine().classification(image)
+
+    @classmethod
+    def _remote_service(cls):
+        if cls._remote is None:
+            address = cls._server_address()
+            if address is None:
+                cls._remote = False
+            elif cls._authkey() is None:
+                Logger.warning(f'未设置 UI_OCR_AUTHKEY，不连接共享验证码识别服务，使用进程内识别: {address}')
+                cls._remote = False
+            else:
+                try:
+                    _OcrManager.register('ocr')
+                    manager = _OcrManager(address=address, authkey=cls._authkey())
+                    manager.connect()
+                    cls._remote = manager.ocr()
+                    Logger.debug('连接共享验证码识别服务: {}', address)
+                except Exception as e:
+                    Logger.warning(f'连接共享验证码识别服务失败，使用进程内识别: {address} ({e})')
+                    cls._remote = False
+        return cls._remote or None
+
+    @classmethod
+    def classify(cls, image):
+        """
+        识别验证码，配置了共享服务时优先使用共享服务
+        :param image: 图片内容（bytes）
+        :return: 识别的文本
+        """
+        remote = cls._remote_service()
+        if remote is not None:
+            try:
+                return remote.classify(image)
+            except Exception as e:
+                Logger.warning(f'共享验证码识别服务调用失败，使用进程内识别 ({e})')
+                cls._remote = False
+        return cls.local_classify(image)
+
+
+def _is_loopback(host):
+    try:
+        return all(ipaddress.ip_address(info[4][0]).is_loopback for info in socket.getaddrinfo(host, None))
+    except (socket.gaierror, ValueError):
+        return False
+
+
+def serve(host='127.0.0.1', port=50070, allow_remote=False):
+    """
+    启动共享识别服务，启动时预先加载模型；密钥通过环境变量 UI_OCR_AUTHKEY 设置
+    :param host: 监听地址
+    :param port: 监听端口
+    :param allow_remote: 是否允许监听回环地址以外的地址（持有密钥的客户端可以在服务进程中执行任意代码）
+    :return: None
+    """
+    authkey = Ocr._authkey()
+    if authkey is None:
+        message = '未设置环境变量 UI_OCR_AUTHKEY，拒绝启动共享验证码识别服务'
+        Logger.error(message)
+        raise ValueError(message)
+    if not allow_remote and not _is_loopback(host):
+        message = f'监听地址 {host} 不是本机回环地址，确认网络可信后使用 --allow-remote 启动'
+        Logger.error(message)
+        raise ValueError(message)
+    service = OcrService()
+    Ocr.engine()
+    _OcrManager.register('ocr', callable=lambda: service)
+    manager = _OcrManager(address=(host, port), authkey=authkey)
+    server = manager.get_server()
+    Logger.info(f'共享验证码识别服务已启动: {host}:{port}')
+    server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='共享验证码识别服务')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve_parser = sub.add_parser('serve', help='启动共享识别服务')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=50070)
+    serve_parser.add_argument('--allow-remote', action='store_true', help='允许监听本机回环地址以外的地址')
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, args.allow_remote)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,124 @@
+import os
+import json
+import threading
+from datetime import datetime
+
+from utils.logger import Logger
+from utils.action_events import current_test
+from utils.js_scripts import PAGE_METRICS_JS
+
+
+class PageMetrics:
+    """
+    页面性能指标采集：BasePage 在 open / f5 / back / forward 后通过一次异步脚本读取
+    Navigation Timing、Resource Timing 汇总、paint、LCP 和 CLS，按测试和 URL 保存
+    """
+    # 当前启用的采集器，为 None 时 BasePage 不采集
+    active = None
+
+    def __init__(self, directory=None, timeout=0.1):
+        """
+        :param directory: 结束时写入指标文件的目录，为 None 时不写入
+        :param timeout: 等待 LCP 的最长时间（秒）
+        """
+        self.directory = directory
+        self.timeout = timeout
+        self.records = []
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        启用采集器
+        :return: self
+        """
+        PageMetrics.active = self
+        return self
+
+    def stop(self):
+        """
+        停用采集器，设置了目录时写入本进程采集的所有指标
+        :return: None
+        """
+        if PageMetrics.active is self:
+            PageMetrics.active = None
+        if self.directory is not None and self.records:
+            os.makedirs(self.directory, exist_ok=True)
+            worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+            path = os.path.join(self.directory, f"metrics_{datetime.now().strftime('%Y%m%d-%H%M%S')}_{worker}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.records, f, ensure_ascii=False, indent=1)
+            Logger.info(f'页面性能指标已写入: {path}')
+
+    @staticmethod
+    def read(driver, timeout=0.1):
+        """
+        读取当前页面的性能指标
+        :param driver: WebDriver 实例
+        :param timeout: 等待 LCP 的最长时间（秒）
+        :return: 指标字典，参见 PAGE_METRICS_JS
+        """
+        return driver.execute_async_script(PAGE_METRICS_JS, int(timeout * 1000))
+
+    def collect(self, driver, trigger):
+        """
+        读取并保存当前页面的性能指标，读取失败时只记录日志，不影响页面操作
+        :param driver: WebDriver 实例
+        :param trigger: 触发采集的操作 open / f5 / back / forward
+        :return: 指标字典，读取失败时返回 None
+        """
+        try:
+            metrics = self.read(driver, self.timeout)
+        except Exception as e:
+            Logger.warning(f'读取页面性能指标失败 ({e})')
+            return None
+        record = dict(metrics, test=current_test(), trigger=trigger)
+        with self._lock:
+            self.records.append(record)
+        Logger.debug('页面性能指标：{} LCP={} CLS={}', record['url'], record['lcp_ms'], record['cls'])
+        return record
+
+    def for_test(self, node_id):
+        """
+        指定测试采集的指标
+        :param node_id: 测试 node id
+        :return: 指标列表
+        """
+        with self._lock:
+            return [record for record in self.records if record['test'] == node_id]
+
+    def latest(self, url=None):
+        """
+        当前测试最近一次采集的指标
+        :param url: 只查找该 URL 的指标
+        :return: 指标字典，没有时返回 None
+        """
+        test = current_test()
+        with self._lock:
+            for record in reversed(self.records):
+                if record['test'] == test and (url is None or record['url'] == url):
+                    return record
+        return None
+
+    @staticmethod
+    def check_budget(metrics, lcp_ms=None, fcp_ms=None, cls=None, load_ms=None, transfer_kb=None, requests=None):
+        """
+        检查指标是否超出预算，浏览器不支持的指标（值为 None）不检查
+        :param metrics: 指标字典
+        :return: 超出预算的描述列表
+        """
+        navigation = metrics.get('navigation') or {}
+        resources = metrics.get('resources') or {}
+        transfer = (navigation.get('transfer_bytes', 0) + resources.get('transfer_bytes', 0)) / 1024
+        actual = {
+            'lcp_ms': (metrics.get('lcp_ms'), lcp_ms),
+            'fcp_ms': (metrics.get('fcp_ms'), fcp_ms),
+            'cls': (metrics.get('cls'), cls),
+            'load_ms': (navigation.get('load_ms'), load_ms),
+            'transfer_kb': (round(transfer, 1), transfer_kb),
+            'requests': (resources.get('count', 0) + 1, requests),
+        }
+        return [
+            f'{name}={value} > {budget}'
+            for name, (value, budget) in actual.items()
+            if budget is not None and value is not None and value > budget
+        ]
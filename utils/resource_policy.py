@@ -0,0 +1,149 @@
+import json
+from collections import Counter
+from urllib.parse import urlparse
+
+from utils.logger import Logger
+
+
+class ResourcePolicy:
+    """
+    资源拦截策略：通过 DevTools 协议(Network.setBlockedURLs)拦截指定的 URL 和资源类型，
+    仅支持 Chromium 系浏览器（chrome、edge），其他浏览器上不做任何操作
+    资源类型按 URL 中的扩展名（字体、图片等）或域名（统计脚本）匹配，没有扩展名的图片、字体 URL 不会被拦截
+    同一个浏览器上的多个策略（页面对象、测试标记）合并生效，清除时只移除本策略的规则
+    浏览器开启了 performance 日志时（参见 WebDriverFactory），可以统计被拦截和实际加载的请求
+    """
+    # 资源类型到 URL 匹配规则的映射，* 为通配符
+    RESOURCE_TYPE_PATTERNS = {
+        'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*', '*.bmp*'],
+        'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+        'media': ['*.mp4*', '*.webm*', '*.mp3*', '*.ogg*', '*.m3u8*'],
+        'analytics': [
+            '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+            '*hm.baidu.com*', '*cnzz.com*', '*51.la*',
+        ],
+    }
+
+    def __init__(self, patterns=(), resource_types=()):
+        """
+        :param patterns: 需要拦截的 URL 匹配规则，如 '*.baidu.com/ads/*'
+        :param resource_types: 需要拦截的资源类型，参见 RESOURCE_TYPE_PATTERNS
+        """
+        unknown_types = [t for t in resource_types if t not in self.RESOURCE_TYPE_PATTERNS]
+        if unknown_types:
+            supported_types = ', '.join(self.RESOURCE_TYPE_PATTERNS.keys())
+            message = f"不支持的资源类型: {', '.join(unknown_types)}. 支持的资源类型: {supported_types}"
+            Logger.error(message)
+            raise ValueError(message)
+        self.urls = list(patterns)
+        for resource_type in resource_types:
+            self.urls.extend(self.RESOURCE_TYPE_PATTERNS[resource_type])
+        self.blocked_by_type = Counter()
+        self.blocked_by_host = Counter()
+        self.loaded_requests = 0
+        self.loaded_bytes = 0
+
+    @staticmethod
+    def supported(driver):
+        """
+        浏览器是否支持 DevTools 协议
+        :param driver: WebDriver 实例
+        :return: True or False
+        """
+        return hasattr(driver, 'execute_cdp_cmd')
+
+    @staticmethod
+    def _active(driver):
+        # 浏览器上所有策略启用的规则及引用次数
+        active = getattr(driver, 'blocked_urls', None)
+        if active is None:
+            active = driver.blocked_urls = Counter()
+        return active
+
+    def apply(self, driver):
+        """
+        在浏览器上启用拦截规则，与浏览器上已启用的规则合并
+        :param driver: WebDriver 实例
+        :return: 是否启用成功
+        """
+        if not self.supported(driver):
+            Logger.debug('当前浏览器不支持 DevTools 协议，跳过资源拦截')
+            return False
+        active = self._active(driver)
+        active.update(self.urls)
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(active)})
+            Logger.debug('启用资源拦截规则: {}', list(active))
+            return True
+        except Exception as e:
+            active.subtract(self.urls)
+            message = f'启用资源拦截规则失败 ({e})'
+            Logger.error(message)
+            raise ValueError(message) from e
+
+    def clear(self, driver):
+        """
+        清除本策略在浏览器上启用的拦截规则，其他策略的规则继续生效
+        :param driver: WebDriver 实例
+        :return: None
+        """
+        if self.supported(driver):
+            active = self._active(driver)
+            active.subtract(self.urls)
+            driver.blocked_urls = +active
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(driver.blocked_urls)})
+            Logger.debug('清除资源拦截规则')
+
+    @classmethod
+    def clear_all(cls, driver):
+        """
+        清除浏览器上所有策略的拦截规则，浏览器归还浏览器池时使用
+        :param driver: WebDriver 实例
+        :return: None
+        """
+        if cls.supported(driver):
+            driver.blocked_urls = Counter()
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+
+    def collect(self, driver):
+        """
+        读取 performance 日志，累计被拦截和实际加载的请求；读取后浏览器中的日志会被清空
+        :param driver: WebDriver 实例
+        :return: 当前的统计结果，参见 stats
+        """
+        if not self.supported(driver):
+            return self.stats()
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            Logger.debug('浏览器未开启 performance 日志，无法统计资源拦截 ({})', e)
+            return self.stats()
+        requests = {}
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                requests[params['requestId']] = (params['request']['url'], params.get('type', 'Other'))
+            elif method == 'Network.loadingFailed' and params.get('blockedReason') == 'inspector':
+                url, resource_type = requests.get(params['requestId'], ('', params.get('type', 'Other')))
+                self.blocked_by_type[resource_type] += 1
+                self.blocked_by_host[urlparse(url).hostname or ''] += 1
+            elif method == 'Network.loadingFinished':
+                self.loaded_requests += 1
+                self.loaded_bytes += int(params.get('encodedDataLength', 0))
+        return self.stats()
+
+    def stats(self):
+        """
+        拦截统计：被拦截的请求数（按资源类型、域名分组）和实际加载的请求数、传输字节数
+        被拦截的请求不会发出，节省的字节数无法直接获得，可与不拦截时的 loaded_bytes 对比
+        :return: 统计结果
+        """
+        return {
+            'blocked_requests': sum(self.blocked_by_type.values()),
+            'blocked_by_type': dict(self.blocked_by_type),
+            'blocked_by_host': dict(self.blocked_by_host),
+            'loaded_requests': self.loaded_requests,
+            'loaded_bytes': self.loaded_bytes,
+        }
@@ -0,0 +1,146 @@
+import io
+import os
+import queue
+import atexit
+import hashlib
+import threading
+
+from utils.logger import Logger
+
+
+class ScreenshotStore:
+    """
+    截图存储：截图以 bytes 交给后台线程写入磁盘，不占用测试的执行时间；
+    文件按内容的 SHA-256 命名，相同的截图（重试、不同测试）只保存一份；
+    可选缩小图片宽度并重新压缩（需要 Pillow，未安装时保存原图）
+    需要添加到 Allure 报告的截图先登记，测试结束时只等待这些截图写入后再添加，参见 take_pending
+    """
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directory, max_width=None):
+        """
+        :param directory: 截图目录
+        :param max_width: 截图的最大宽度（像素），超过时等比缩小，为 None 时保存原图
+        """
+        self.directory = directory
+        self.max_width = max_width
+        self._known = set()
+        self._pending = []
+        # 尚未写入的截图：文件路径 -> 写入完成的事件
+        self._writing = {}
+        # 写入失败的截图路径
+        self._failed = set()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = None
+
+    @classmethod
+    def shared(cls):
+        """
+        进程内共享的截图存储，使用 PROPER_SCREEN_DIR 和 SCREENSHOT_MAX_WIDTH 配置
+        :return: ScreenshotStore
+        """
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    from config.pathconf import PROPER_SCREEN_DIR, SCREENSHOT_MAX_WIDTH
+                    cls._shared = cls(PROPER_SCREEN_DIR, SCREENSHOT_MAX_WIDTH)
+        return cls._shared
+
+    def path(self, digest):
+        """
+        截图的文件路径
+        :param digest: 截图内容的 SHA-256
+        :return: 文件路径
+        """
+        return os.path.join(self.directory, digest[:2], f'{digest}.png')
+
+    def submit(self, png, name=None, attach=False):
+        """
+        保存截图，立即返回文件路径，文件由后台线程写入（调用 flush 后保证已写入）
+        :param png: PNG 图片内容
+        :param name: 截图名称，用于 Allure 报告
+        :param attach: 是否在测试结束时添加到 Allure 报告
+        :return: 文件路径
+        """
+        digest = hashlib.sha256(png).hexdigest()
+        path = self.path(digest)
+        with self._lock:
+            if attach:
+                self._pending.append((path, name or digest))
+            if digest in self._known:
+                return path
+            self._known.add(digest)
+            self._writing[path] = threading.Event()
+            if self._writer is None:
+                # 首次保存截图时才启动后台线程，进程退出前等待所有截图写入
+                self._writer = threading.Thread(target=self._write_loop, name='screenshot-writer', daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+        self._queue.put((path, png))
+        return path
+
+    def _write_loop(self):
+        while True:
+            path, png = self._queue.get()
+            try:
+                if not os.path.exists(path):
+                    self._write(path, self._resize(png))
+            except Exception as e:
+                Logger.warning(f'保存截图失败: {path} ({e})')
+                with self._lock:
+                    self._failed.add(path)
+            finally:
+                with self._lock:
+                    done = self._writing.pop(path)
+                done.set()
+                self._queue.task_done()
+
+    def _resize(self, png):
+        if not self.max_width:
+            return png
+        try:
+            from PIL import Image
+        except ImportError:
+            return png
+        image = Image.open(io.BytesIO(png))
+        if image.width <= self.max_width:
+            return png
+        image.thumbnail((self.max_width, image.height * self.max_width // image.width))
+        output = io.BytesIO()
+        image.save(output, format='PNG', optimize=True)
+        return output.getvalue()
+
+    @staticmethod
+    def _write(path, data):
+        # 先写临时文件再改名，多个测试进程同时保存同一截图时不会读到不完整的文件
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def flush(self):
+        """
+        等待所有截图写入磁盘
+        :return: None
+        """
+        self._queue.join()
+
+    def take_pending(self):
+        """
+        取出并清空需要添加到 Allure 报告的截图，只等待这些截图写入，不等待其他截图；写入失败的截图不返回
+        :return: [(文件路径, 名称), ...]
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+            waiting = [self._writing.get(path) for path, _ in pending]
+        for done in waiting:
+            if done is not None:
+                done.wait()
+        with self._lock:
+            failed = [(path, name) for path, name in pending if path in self._failed]
+        for path, name in failed:
+            Logger.warning(f'截图写入失败，不添加到报告: {name} ({path})')
+        return [item for item in pending if item not in failed]
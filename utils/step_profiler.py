@@ -0,0 +1,206 @@
+import os
+import json
+import time
+import inspect
+import threading
+import functools
+from datetime import datetime
+
+from utils.logger import Logger
+
+# 计入等待时间的方法（方法名以 wait 开头的也计入）
+WAIT_METHODS = {'element_wait', 'cached_element', 'sleep'}
+
+
+class _Stat:
+    __slots__ = ('durations', 'wait')
+
+    def __init__(self):
+        self.durations = []
+        self.wait = 0.0
+
+    def add(self, duration, wait):
+        self.durations.append(duration)
+        self.wait += wait
+
+    def row(self):
+        durations = sorted(self.durations)
+        total = sum(durations)
+
+        def percentile(p):
+            return durations[min(len(durations) - 1, int(len(durations) * p))]
+
+        return {
+            'count': len(durations),
+            'total_ms': round(total * 1000, 3),
+            'p50_ms': round(percentile(0.5) * 1000, 3),
+            'p95_ms': round(percentile(0.95) * 1000, 3),
+            'max_ms': round(durations[-1] * 1000, 3),
+            'wait_ms': round(self.wait * 1000, 3),
+            'action_ms': round((total - self.wait) * 1000, 3),
+        }
+
+
+class _Frame:
+    __slots__ = ('name', 'start', 'children', 'wait')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = time.perf_counter()
+        self.children = 0.0
+        self.wait = 0.0
+
+
+class StepProfiler:
+    """
+    页面对象耗时统计：包装页面类的公共方法，按方法和定位语句汇总调用次数、p50/p95/max 耗时，
+    并区分等待时间（element_wait、wait_* 等）和操作时间；结束时写入 JSON 报告和火焰图使用的折叠栈文件
+    （可用 flamegraph.pl / speedscope 打开）
+    """
+
+    def __init__(self, directory):
+        """
+        :param directory: 报告目录
+        """
+        self.directory = directory
+        self.methods = {}
+        self.locators = {}
+        self.stacks = {}
+        self.test_methods = {}
+        self._originals = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def instrument(self, *classes):
+        """
+        包装页面类中定义的公共方法（不包括继承的方法，父类需要单独传入）
+        :param classes: 页面类，如 BasePage, LoginPage
+        :return: self
+        """
+        for cls in classes:
+            for name, member in list(vars(cls).items()):
+                if name.startswith('_'):
+                    continue
+                if isinstance(member, staticmethod):
+                    wrapped = staticmethod(self._wrap(cls, name, member.__func__, offset=0))
+                elif inspect.isfunction(member):
+                    wrapped = self._wrap(cls, name, member, offset=1)
+                else:
+                    continue
+                self._originals.append((cls, name, member))
+                setattr(cls, name, wrapped)
+        return self
+
+    def uninstrument(self):
+        """
+        恢复被包装的方法
+        :return: None
+        """
+        for cls, name, member in reversed(self._originals):
+            setattr(cls, name, member)
+        self._originals.clear()
+
+    def _wrap(self, cls, name, func, offset):
+        qualname = f'{cls.__name__}.{name}'
+        is_wait = name.startswith('wait') or name in WAIT_METHODS
+        parameters = list(inspect.signature(inspect.unwrap(func)).parameters)[offset:]
+        has_locator = bool(parameters) and parameters[0] == '_type'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack = self._stack()
+            frame = _Frame(qualname)
+            stack.append(frame)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stack.pop()
+                duration = time.perf_counter() - frame.start
+                wait = duration if is_wait else frame.wait
+                if stack:
+                    stack[-1].children += duration
+                    stack[-1].wait += wait
+                locator = None
+                if has_locator and len(args) >= offset + 2:
+                    locator = f'{args[offset]}={args[offset + 1]}'
+                path = ';'.join(f.name for f in stack) + (';' if stack else '') + qualname
+                self._record(qualname, locator, path, duration, wait, duration - frame.children)
+
+        return wrapper
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, qualname, locator, path, duration, wait, self_time):
+        with self._lock:
+            self.methods.setdefault(qualname, _Stat()).add(duration, wait)
+            self.test_methods.setdefault(qualname, _Stat()).add(duration, wait)
+            if locator is not None:
+                self.locators.setdefault(locator, _Stat()).add(duration, wait)
+            self.stacks[path] = self.stacks.get(path, 0.0) + self_time
+
+    def start_test(self):
+        """
+        开始统计一个测试的方法耗时
+        :return: None
+        """
+        with self._lock:
+            self.test_methods = {}
+
+    def test_rows(self):
+        """
+        当前测试中各方法的耗时
+        :return: {方法名: {'count', 'total_ms', 'p50_ms', 'p95_ms', 'max_ms', 'wait_ms', 'action_ms'}}
+        """
+        with self._lock:
+            return {name: stat.row() for name, stat in self.test_methods.items()}
+
+    def test_summary(self):
+        """
+        当前测试中各方法的耗时，按总耗时降序排列
+        :return: 文本表格
+        """
+        return self._format(list(self.test_rows().items()))
+
+    @staticmethod
+    def _format(rows):
+        rows.sort(key=lambda item: item[1]['total_ms'], reverse=True)
+        columns = ('count', 'total_ms', 'p50_ms', 'p95_ms', 'max_ms', 'wait_ms', 'action_ms')
+        width = max([len(name) for name, _ in rows] + [6])
+        lines = ['method'.ljust(width) + ''.join(c.rjust(12) for c in columns)]
+        for name, row in rows:
+            lines.append(name.ljust(width) + ''.join(str(row[c]).rjust(12) for c in columns))
+        return '\n'.join(lines)
+
+    def report(self):
+        """
+        整个运行期间按方法、定位语句汇总的耗时
+        :return: {'methods': {...}, 'locators': {...}}
+        """
+        with self._lock:
+            return {
+                'methods': {name: stat.row() for name, stat in self.methods.items()},
+                'locators': {name: stat.row() for name, stat in self.locators.items()},
+            }
+
+    def write(self):
+        """
+        写入 JSON 报告和折叠栈文件，每个测试进程写入自己的文件
+        :return: (报告路径, 折叠栈路径)
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+        prefix = os.path.join(self.directory, f"profile_{datetime.now().strftime('%Y%m%d-%H%M%S')}_{worker}")
+        with open(prefix + '.json', 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        with self._lock:
+            stacks = sorted(self.stacks.items())
+        with open(prefix + '.collapsed', 'w', encoding='utf-8') as f:
+            for path, self_time in stacks:
+                # 折叠栈格式：调用栈;以分号分隔 样本数（自身耗时，微秒）
+                f.write(f'{path} {max(1, round(self_time * 1e6))}\n')
+        Logger.info(f'页面对象耗时报告: {prefix}.json, 折叠栈: {prefix}.collapsed')
+        return prefix + '.json', prefix + '.collapsed'
@@ -0,0 +1,146 @@
+import io
+import os
+import json
+import zipfile
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+
+from utils.logger import Logger
+from utils import action_events
+
+# 读取元素 outerHTML 的前 n 个字符，避免传输大段 HTML
+_SNIPPET_JS = "return arguments[0].outerHTML.slice(0, arguments[1]);"
+
+
+class TraceRecorder:
+    """
+    失败追踪：监听页面操作事件，在内存中保留最近 size 步（操作、定位语句、耗时、目标元素的引用、可选截图），
+    只有测试失败（包括会被重试的失败）时才读取目标元素的 HTML 片段并打包为 zip 写入磁盘，
+    通过的测试没有额外的浏览器驱动命令和磁盘读写（开启每步截图时除外）
+    读取 HTML 片段、截图的命令不计入测试的浏览器驱动命令数，参见 CommandTracer.suspend
+    """
+
+    def __init__(self, directory, size=50, snippets=True, screenshots=False, snippet_length=500, screenshot_width=480):
+        """
+        :param directory: 追踪文件目录
+        :param size: 保留的步数
+        :param snippets: 失败时是否记录目标元素的 HTML 片段（使用元素缓存中的元素，不重新查找，元素已失效时为空）
+        :param screenshots: 是否每步截图，操作失败的步骤总是截图
+        :param snippet_length: HTML 片段的最大长度
+        :param screenshot_width: 打包时截图缩小到的宽度（需要 Pillow，未安装时保存原图）
+        """
+        self.directory = directory
+        self.snippets = snippets
+        self.screenshots = screenshots
+        self.snippet_length = snippet_length
+        self.screenshot_width = screenshot_width
+        self.steps = deque(maxlen=size)
+
+    def start(self):
+        """
+        开始监听页面操作事件
+        :return: self
+        """
+        action_events.add_listener(self.record)
+        return self
+
+    def stop(self):
+        """
+        停止监听页面操作事件
+        :return: None
+        """
+        action_events.remove_listener(self.record)
+
+    def start_test(self):
+        """
+        清空上一个测试的步骤
+        :return: None
+        """
+        self.steps.clear()
+
+    def record(self, event, page):
+        """
+        页面操作事件监听器，只记录最外层的操作（不记录 click 内部的 element_wait 等）
+        :param event: 页面操作事件，参见 action_events.action
+        :param page: 页面对象
+        :return: None
+        """
+        if event['depth'] != 0:
+            return
+        step = dict(event, snippet=None, screenshot=None, driver=page.driver, element=None)
+        if self.snippets and event['locator']:
+            # 只保存元素引用，失败时才读取 HTML 片段
+            _type, locate = event['locator'].split('=', 1)
+            step['element'] = page._element_cache.get((page._get_by(_type), locate))
+        if self.screenshots or event['outcome'] == 'error':
+            tracer = getattr(page.driver, 'command_tracer', None)
+            with tracer.suspend() if tracer is not None else nullcontext():
+                try:
+                    step['screenshot'] = page.driver.get_screenshot_as_png()
+                except Exception as e:
+                    Logger.debug('失败追踪截图失败 ({})', e)
+        self.steps.append(step)
+
+    def _snippet(self, driver, element):
+        if element is None:
+            return None
+        tracer = getattr(driver, 'command_tracer', None)
+        try:
+            with tracer.suspend() if tracer is not None else nullcontext():
+                return driver.execute_script(_SNIPPET_JS, element, self.snippet_length)
+        except Exception:
+            # 元素已失效（页面跳转、元素被移除）
+            return None
+
+    def resolve_snippets(self):
+        """
+        读取各步骤目标元素的 HTML 片段，需要在测试失败后、浏览器重置前调用（参见 tests/conftest.py），dump 时也会调用
+        :return: None
+        """
+        for step in self.steps:
+            if step['element'] is not None:
+                step['snippet'] = self._snippet(step['driver'], step['element'])
+                step['element'] = None
+
+    def _shrink(self, png):
+        try:
+            from PIL import Image
+        except ImportError:
+            return png
+        image = Image.open(io.BytesIO(png))
+        if image.width > self.screenshot_width:
+            image.thumbnail((self.screenshot_width, image.height * self.screenshot_width // image.width))
+        output = io.BytesIO()
+        image.save(output, format='PNG', optimize=True)
+        return output.getvalue()
+
+    def dump(self, node_id, rerun=1):
+        """
+        把内存中的步骤打包为 zip：trace.json（步骤列表）和 screenshots/ 下的截图
+        :param node_id: 测试 node id
+        :param rerun: 第几次执行
+        :return: zip 文件路径，没有步骤时返回 None
+        """
+        if not self.steps:
+            return None
+        self.resolve_snippets()
+        os.makedirs(self.directory, exist_ok=True)
+        worker = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+        safe_name = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in node_id)[-150:]
+        path = os.path.join(self.directory,
+                            f"trace_{datetime.now().strftime('%Y%m%d-%H%M%S')}_{worker}_{safe_name}_{rerun}.zip")
+        steps = []
+        with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for index, step in enumerate(self.steps):
+                step = {k: v for k, v in step.items() if k not in ('driver', 'element')}
+                png = step.pop('screenshot')
+                if png is not None:
+                    step['screenshot'] = f'screenshots/{index:03d}_{step["action"]}.png'
+                    # PNG 已经压缩过，不再重复压缩
+                    archive.writestr(step['screenshot'], self._shrink(png), compress_type=zipfile.ZIP_STORED)
+                steps.append(step)
+            trace = {'test': node_id, 'rerun': rerun, 'steps': steps}
+            archive.writestr('trace.json', json.dumps(trace, ensure_ascii=False, indent=1))
+        Logger.info(f'失败追踪已写入: {path}')
+        return path
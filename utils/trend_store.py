@@ -0,0 +1,246 @@
+"""
+性能趋势存储（SQLite）：run_test.py 每次运行时记录每个测试的耗时、页面对象方法耗时和页面性能指标，
+并与最近 N 次运行对比，基于中位数和 MAD（中位数绝对偏差）判断是否存在显著的性能回归
+
+用法：
+    python -m utils.trend_store compare --last 10 --threshold 3.5 --fail
+    python -m utils.trend_store runs
+"""
+import os
+import sys
+import sqlite3
+import argparse
+from datetime import datetime
+from statistics import median
+from urllib.parse import urlsplit
+
+from config.pathconf import TREND_DB
+
+# 趋势中记录的页面性能指标
+PAGE_METRIC_NAMES = ('lcp_ms', 'fcp_ms', 'cls', 'load_ms', 'transfer_kb')
+# MAD 换算为标准差的系数（正态分布下）
+_MAD_SCALE = 1.4826
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    started TEXT NOT NULL,
+    commit_id TEXT
+);
+CREATE TABLE IF NOT EXISTS samples (
+    run_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    test TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    outcome TEXT
+);
+CREATE INDEX IF NOT EXISTS samples_series ON samples (kind, test, name, run_id);
+"""
+
+
+class TrendRun:
+    """
+    一次运行中当前测试进程采集的数据，测试结束时一次性写入 TrendStore
+    """
+
+    def __init__(self, run_id):
+        self.run_id = run_id
+        self.samples = []
+
+    def add_test(self, test, outcome, duration, steps=None, page_metrics=()):
+        """
+        记录一个测试的数据
+        :param test: 测试 node id
+        :param outcome: 测试结果 passed / failed / skipped
+        :param duration: 测试执行耗时（秒）
+        :param steps: 页面对象方法耗时 {方法名: {'total_ms', ...}}，参见 StepProfiler.test_rows
+        :param page_metrics: 页面性能指标列表，参见 PageMetrics.for_test
+        :return: None
+        """
+        self.samples.append(('test', test, 'duration_ms', round(duration * 1000, 3), outcome))
+        for name, row in (steps or {}).items():
+            self.samples.append(('step', test, name, row['total_ms'], outcome))
+        for metrics in page_metrics:
+            page = self.page_key(metrics['url'])
+            navigation = metrics.get('navigation') or {}
+            resources = metrics.get('resources') or {}
+            values = dict(
+                metrics,
+                load_ms=navigation.get('load_ms'),
+                transfer_kb=(navigation.get('transfer_bytes', 0) + resources.get('transfer_bytes', 0)) / 1024,
+            )
+            for metric in PAGE_METRIC_NAMES:
+                if values.get(metric) is not None:
+                    self.samples.append(('page', test, f"{page} {metric}", values[metric], outcome))
+
+    @staticmethod
+    def page_key(url):
+        """
+        页面性能指标序列使用的页面地址：只保留协议、域名和路径，查询参数、锚点不同的地址归为同一页面
+        :param url: 页面地址
+        :return: 页面地址
+        """
+        parts = urlsplit(url)
+        return f'{parts.scheme}://{parts.netloc}{parts.path}'
+
+
+class TrendStore:
+    """
+    性能趋势数据库，多个测试进程可以同时写入（SQLite 文件锁）
+    """
+
+    def __init__(self, path=TREND_DB):
+        """
+        :param path: 数据库文件路径，:memory: 为内存数据库
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def add_run(self, run_id, commit_id=None):
+        """
+        登记一次运行，已存在时保留原来的开始时间，只补充代码版本
+        :param run_id: 运行 id
+        :param commit_id: 代码版本
+        :return: None
+        """
+        with self.connection:
+            self.connection.execute(
+                'INSERT INTO runs (run_id, started, commit_id) VALUES (?, ?, ?) '
+                'ON CONFLICT (run_id) DO UPDATE SET commit_id = COALESCE(excluded.commit_id, runs.commit_id)',
+                (run_id, datetime.now().isoformat(timespec='seconds'), commit_id),
+            )
+
+    def save(self, run):
+        """
+        在一个事务中写入 TrendRun 采集的所有数据
+        :param run: TrendRun
+        :return: None
+        """
+        self.add_run(run.run_id)
+        with self.connection:
+            self.connection.executemany(
+                'INSERT INTO samples (run_id, kind, test, name, value, outcome) VALUES (?, ?, ?, ?, ?, ?)',
+                [(run.run_id, *sample) for sample in run.samples],
+            )
+
+    def runs(self, limit=None):
+        """
+        按开始时间倒序列出运行
+        :param limit: 最多返回的数量
+        :return: [(run_id, started, commit_id), ...]
+        """
+        sql = 'SELECT run_id, started, commit_id FROM runs ORDER BY started DESC, run_id DESC'
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        return self.connection.execute(sql).fetchall()
+
+    def _values(self, run_ids):
+        # 只统计通过的测试，失败的测试耗时没有可比性；
+        # 同一次运行中同一序列有多个样本（如测试中多次打开同一页面）时取中位数
+        placeholders = ','.join('?' * len(run_ids))
+        rows = self.connection.execute(
+            f"SELECT run_id, kind, test, name, value FROM samples "
+            f"WHERE outcome = 'passed' AND run_id IN ({placeholders})",
+            run_ids,
+        )
+        samples = {}
+        for run_id, kind, test, name, value in rows:
+            samples.setdefault((kind, test, name), {}).setdefault(run_id, []).append(value)
+        return {series: {run_id: median(run_values) for run_id, run_values in by_run.items()}
+                for series, by_run in samples.items()}
+
+    def compare(self, run_id=None, last=10, threshold=3.5, min_history=3, min_delta=50.0, min_ratio=0.1,
+                min_delta_kb=20.0, min_delta_cls=0.05):
+        """
+        将一次运行与之前的 last 次运行对比：每个序列（测试耗时、方法耗时、页面指标）计算历史的中位数和 MAD，
+        稳健 z 分数 (当前值 - 中位数) / (1.4826 * MAD) 超过 threshold，且变化超过绝对值和比例下限时判定为回归
+        :param run_id: 需要对比的运行，不填为最近一次运行
+        :param last: 对比的历史运行次数
+        :param threshold: 稳健 z 分数阈值
+        :param min_history: 历史样本少于该数量时不判断
+        :param min_delta: 毫秒类指标（测试耗时、方法耗时、页面时间指标）变化的绝对值下限
+        :param min_ratio: 变化相对中位数的比例下限
+        :param min_delta_kb: 传输大小（transfer_kb）变化的绝对值下限（KB）
+        :param min_delta_cls: 累计布局偏移（cls）变化的绝对值下限
+        :return: [{'kind', 'test', 'name', 'value', 'median', 'mad', 'z', 'history'}, ...]，按 z 分数降序排列
+        """
+        runs = [row[0] for row in self.runs()]
+        if run_id is None:
+            if not runs:
+                return []
+            run_id = runs[0]
+        history = runs[runs.index(run_id) + 1:runs.index(run_id) + 1 + last] if run_id in runs else runs[:last]
+        regressions = []
+        for (kind, test, name), by_run in self._values([run_id] + history).items():
+            if run_id not in by_run:
+                continue
+            past = [by_run[r] for r in history if r in by_run]
+            if len(past) < min_history:
+                continue
+            value = by_run[run_id]
+            center = median(past)
+            mad = median(abs(v - center) for v in past)
+            if name.endswith(' cls'):
+                floor = min_delta_cls
+            elif name.endswith('_kb'):
+                floor = min_delta_kb
+            else:
+                floor = min_delta
+            delta = value - center
+            if delta <= floor or delta <= abs(center) * min_ratio:
+                continue
+            # MAD 为 0（历史值完全相同）时以绝对值下限作为离散程度
+            spread = _MAD_SCALE * mad or floor
+            z = delta / spread
+            if z > threshold:
+                regressions.append({
+                    'kind': kind, 'test': test, 'name': name, 'value': round(value, 3),
+                    'median': round(center, 3), 'mad': round(mad, 3), 'z': round(z, 2), 'history': len(past),
+                })
+        regressions.sort(key=lambda r: r['z'], reverse=True)
+        return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='性能趋势查询与回归检查')
+    parser.add_argument('--db', default=TREND_DB, help='数据库文件路径')
+    sub = parser.add_subparsers(dest='command', required=True)
+    compare_parser = sub.add_parser('compare', help='与最近 N 次运行对比')
+    compare_parser.add_argument('--run', help='需要对比的运行 id，默认最近一次')
+    compare_parser.add_argument('--last', type=int, default=10, help='对比的历史运行次数')
+    compare_parser.add_argument('--threshold', type=float, default=3.5, help='稳健 z 分数阈值')
+    compare_parser.add_argument('--min-history', type=int, default=3, help='最少历史样本数')
+    compare_parser.add_argument('--min-delta', type=float, default=50.0, help='变化的绝对值下限（毫秒）')
+    compare_parser.add_argument('--min-delta-kb', type=float, default=20.0, help='传输大小变化的绝对值下限（KB）')
+    compare_parser.add_argument('--min-delta-cls', type=float, default=0.05, help='累计布局偏移变化的绝对值下限')
+    compare_parser.add_argument('--fail', action='store_true', help='存在回归时返回非 0')
+    runs_parser = sub.add_parser('runs', help='列出最近的运行')
+    runs_parser.add_argument('--limit', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    store = TrendStore(args.db)
+    try:
+        if args.command == 'runs':
+            for run_id, started, commit_id in store.runs(args.limit):
+                print(f'{run_id:<24}{started:<22}{commit_id or ""}')
+            return 0
+        regressions = store.compare(args.run, args.last, args.threshold, args.min_history, args.min_delta,
+                                    min_delta_kb=args.min_delta_kb, min_delta_cls=args.min_delta_cls)
+        for r in regressions:
+            print(f"{r['kind']:<6}{r['test']}  {r['name']}: {r['value']} (中位数 {r['median']}, "
+                  f"MAD {r['mad']}, z={r['z']}, 历史 {r['history']} 次)")
+        print(f'性能回归 {len(regressions)} 项')
+        return 1 if regressions and args.fail else 0
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
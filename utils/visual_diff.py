@@ -0,0 +1,153 @@
+import io
+import os
+import hashlib
+import threading
+
+import numpy as np
+
+from utils.logger import Logger
+
+
+class VisualDiff:
+    """
+    图片对比：NumPy 向量化逐像素对比，支持颜色容差、忽略区域和抗锯齿容差；
+    与基准图片内容完全相同（SHA-256 一致）时不做解码和对比
+    基准图片按路径和修改时间缓存解码结果与哈希，大量对比时不重复解码
+    """
+    _cache = {}
+    _cache_lock = threading.Lock()
+    _cache_limit = 256
+
+    @staticmethod
+    def decode(png):
+        """
+        PNG 转换为 RGB 数组，Pillow 在首次使用时才导入
+        :param png: PNG 图片内容
+        :return: (高, 宽, 3) uint8 数组
+        """
+        from PIL import Image
+        return np.asarray(Image.open(io.BytesIO(png)).convert('RGB'))
+
+    @staticmethod
+    def encode(array):
+        """
+        RGB 数组转换为 PNG
+        :param array: (高, 宽, 3) uint8 数组
+        :return: PNG 图片内容
+        """
+        from PIL import Image
+        output = io.BytesIO()
+        Image.fromarray(array).save(output, format='PNG')
+        return output.getvalue()
+
+    @classmethod
+    def load_baseline(cls, path):
+        """
+        读取基准图片，按路径和修改时间缓存文件哈希和解码结果
+        :param path: 基准图片路径
+        :return: (文件内容的 SHA-256, RGB 数组)
+        """
+        key = (path, os.path.getmtime(path))
+        with cls._cache_lock:
+            cached = cls._cache.get(key)
+        if cached is None:
+            with open(path, 'rb') as f:
+                content = f.read()
+            array = cls.decode(content)
+            cached = (hashlib.sha256(content).digest(), array)
+            with cls._cache_lock:
+                if len(cls._cache) >= cls._cache_limit:
+                    cls._cache.pop(next(iter(cls._cache)))
+                cls._cache[key] = cached
+        return cached
+
+    @staticmethod
+    def _neighbour_match(source, target, tolerance):
+        # source 中的每个像素在 target 对应位置的 3x3 邻域内是否存在颜色相近的像素
+        height, width = source.shape[:2]
+        padded = np.pad(target, ((1, 1), (1, 1), (0, 0)), mode='edge')
+        matched = np.zeros((height, width), dtype=bool)
+        for dy in (0, 1, 2):
+            for dx in (0, 1, 2):
+                if dy == 1 and dx == 1:
+                    continue
+                shifted = padded[dy:dy + height, dx:dx + width]
+                matched |= np.abs(source - shifted).max(axis=2) <= tolerance
+        return matched
+
+    @classmethod
+    def compare(cls, actual, expected, tolerance=8, ignore_regions=(), anti_aliasing=True):
+        """
+        对比两张图片
+        :param actual: 实际图片 RGB 数组
+        :param expected: 基准图片 RGB 数组
+        :param tolerance: 每个颜色通道允许的差异（0-255）
+        :param ignore_regions: 忽略的区域 [(x, y, 宽, 高), ...]，坐标为截图中的像素
+        :param anti_aliasing: 忽略抗锯齿造成的差异（像素在对方 1 像素邻域内有相近颜色）
+        :return: {'same_size', 'diff_pixels', 'aa_pixels', 'diff_ratio', 'mask'}
+        """
+        result = {'same_size': actual.shape == expected.shape,
+                  'diff_pixels': 0, 'aa_pixels': 0, 'diff_ratio': 0.0, 'mask': None}
+        if not result['same_size']:
+            result['diff_pixels'] = actual.shape[0] * actual.shape[1]
+            result['diff_ratio'] = 1.0
+            return result
+        mask = np.abs(actual.astype(np.int16) - expected.astype(np.int16)).max(axis=2) > tolerance
+        for x, y, width, height in ignore_regions:
+            mask[max(y, 0):y + height, max(x, 0):x + width] = False
+        if anti_aliasing and mask.any():
+            # 只在存在差异的包围盒内（外扩 1 像素）计算邻域匹配
+            rows, cols = np.nonzero(mask)
+            top, bottom = max(rows.min() - 1, 0), rows.max() + 2
+            left, right = max(cols.min() - 1, 0), cols.max() + 2
+            a = actual[top:bottom, left:right].astype(np.int16)
+            b = expected[top:bottom, left:right].astype(np.int16)
+            aa = cls._neighbour_match(a, b, tolerance) & cls._neighbour_match(b, a, tolerance)
+            aa &= mask[top:bottom, left:right]
+            result['aa_pixels'] = int(aa.sum())
+            mask[top:bottom, left:right] &= ~aa
+        result['mask'] = mask
+        result['diff_pixels'] = int(mask.sum())
+        result['diff_ratio'] = result['diff_pixels'] / mask.size
+        return result
+
+    @staticmethod
+    def diff_image(actual, expected, mask):
+        """
+        生成差异图：基准图片变暗为灰度，差异像素标红；尺寸不同时返回实际图片
+        :param actual: 实际图片 RGB 数组
+        :param expected: 基准图片 RGB 数组
+        :param mask: 差异像素掩码
+        :return: RGB 数组
+        """
+        if mask is None or actual.shape != expected.shape:
+            return actual
+        gray = (expected.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)) * 0.4 + 100
+        image = np.repeat(gray.astype(np.uint8)[:, :, None], 3, axis=2)
+        image[mask] = (255, 0, 0)
+        return image
+
+    @classmethod
+    def assert_matches(cls, png, baseline_path, update=False, max_diff_ratio=0.0, **options):
+        """
+        与基准图片对比，基准图片不存在或 update 为 True 时保存为新的基准图片
+        :param png: 实际图片 PNG 内容
+        :param baseline_path: 基准图片路径
+        :param update: 是否更新基准图片
+        :param max_diff_ratio: 允许的差异像素比例
+        :param options: 传给 compare 的参数
+        :return: (是否一致, 对比结果, 实际图片数组, 基准图片数组)
+        """
+        if update or not os.path.exists(baseline_path):
+            os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+            with open(baseline_path, 'wb') as f:
+                f.write(png)
+            Logger.warning(f'保存基准图片: {baseline_path}')
+            return True, None, None, None
+        digest, expected = cls.load_baseline(baseline_path)
+        if digest == hashlib.sha256(png).digest():
+            return True, None, None, None
+        actual = cls.decode(png)
+        result = cls.compare(actual, expected, **options)
+        passed = result['same_size'] and result['diff_ratio'] <= max_diff_ratio
+        return passed, result, actual, expected
@@ -0,0 +1,135 @@
+import time
+import threading
+from collections import deque
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+
+
+class Waiter:
+    """
+    自适应轮询等待，替代固定间隔的 WebDriverWait
+    轮询间隔从 initial_interval 开始，每次乘以 backoff，直到 max_interval 为止，
+    元素很快出现时几十毫秒即可返回，长时间等待也不会过于频繁地请求浏览器驱动
+    每次等待的实际耗时按条件名称记录，可通过 Waiter.stats() 查看，用于调整默认参数
+    """
+    # 全局默认配置，可通过 Waiter.configure 修改
+    timeout = 5
+    initial_interval = 0.02
+    backoff = 1.5
+    max_interval = 0.5
+    ignored_exceptions = (NoSuchElementException, StaleElementReferenceException)
+
+    # 每个条件最多保留的耗时样本数
+    max_samples = 1000
+    _stats = {}
+    _lock = threading.Lock()
+
+    def __init__(self, driver, timeout=None, initial_interval=None, backoff=None, max_interval=None):
+        """
+        :param driver: WebDriver 实例
+        :param timeout: 超时时间（秒），默认使用全局配置
+        :param initial_interval: 首次轮询间隔（秒），默认使用全局配置
+        :param backoff: 轮询间隔递增倍数，默认使用全局配置
+        :param max_interval: 最大轮询间隔（秒），默认使用全局配置
+        """
+        self.driver = driver
+        self.timeout = self.timeout if timeout is None else timeout
+        self.initial_interval = self.initial_interval if initial_interval is None else initial_interval
+        self.backoff = self.backoff if backoff is None else backoff
+        self.max_interval = self.max_interval if max_interval is None else max_interval
+
+    @classmethod
+    def configure(cls, **kwargs):
+        """
+        修改全局默认配置
+        :param kwargs: timeout / initial_interval / backoff / max_interval
+        :return: None
+        """
+        for key, value in kwargs.items():
+            if key not in ('timeout', 'initial_interval', 'backoff', 'max_interval'):
+                raise ValueError(f"不支持的等待配置项: {key}")
+            setattr(cls, key, value)
+
+    def until(self, condition, name='condition'):
+        """
+        轮询执行 condition(driver)，直到返回真值或超时
+        :param condition: 接收 driver 的条件函数
+        :param name: 条件名称，用于统计耗时
+        :return: 条件函数的返回值
+        """
+        start = time.monotonic()
+        end = start + self.timeout
+        interval = self.initial_interval
+        polls = 0
+        last_error = None
+        while True:
+            polls += 1
+            try:
+                value = condition(self.driver)
+                if value:
+                    self.record(name, time.monotonic() - start, polls, True)
+                    return value
+            except self.ignored_exceptions as e:
+                last_error = e
+            now = time.monotonic()
+            if now >= end:
+                break
+            time.sleep(min(interval, end - now))
+            interval = min(interval * self.backoff, self.max_interval)
+        self.record(name, time.monotonic() - start, polls, False)
+        raise TimeoutException(f"等待条件({name})超时: {self.timeout}秒") from last_error
+
+    @classmethod
+    def record(cls, name, elapsed, polls, success):
+        """
+        记录一次等待的耗时
+        :param name: 条件名称
+        :param elapsed: 实际耗时（秒）
+        :param polls: 请求浏览器驱动的次数
+        :param success: 是否在超时前满足条件
+        :return: None
+        """
+        with cls._lock:
+            stat = cls._stats.get(name)
+            if stat is None:
+                stat = cls._stats[name] = {
+                    'count': 0, 'timeouts': 0, 'polls': 0, 'total': 0.0, 'max': 0.0,
+                    'samples': deque(maxlen=cls.max_samples),
+                }
+            stat['count'] += 1
+            stat['polls'] += polls
+            stat['total'] += elapsed
+            stat['max'] = max(stat['max'], elapsed)
+            stat['samples'].append(elapsed)
+            if not success:
+                stat['timeouts'] += 1
+
+    @classmethod
+    def stats(cls):
+        """
+        按条件名称汇总等待耗时（秒）
+        :return: {条件名称: {count, timeouts, polls, mean, p50, p95, max}}
+        """
+        result = {}
+        with cls._lock:
+            for name, stat in cls._stats.items():
+                samples = sorted(stat['samples'])
+                result[name] = {
+                    'count': stat['count'],
+                    'timeouts': stat['timeouts'],
+                    'polls': stat['polls'],
+                    'mean': stat['total'] / stat['count'],
+                    'p50': samples[int(len(samples) * 0.5)],
+                    'p95': samples[min(int(len(samples) * 0.95), len(samples) - 1)],
+                    'max': stat['max'],
+                }
+        return result
+
+    @classmethod
+    def reset_stats(cls):
+        """
+        清空等待耗时统计
+        :return: None
+        """
+        with cls._lock:
+            cls._stats.clear()
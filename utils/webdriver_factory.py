@@ -1,60 +1,185 @@
 import sys
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.webdriver.safari.service import Service as SafariService
+import importlib
+from functools import lru_cache
+
 from config.pathconf import (
     LINUX_CHROME_PATH, LINUX_FIREFOX_PATH,
     WIN_CHROME_PATH, WIN_FIREFOX_PATH, WIN_EDGE_PATH,
     MAC_CHROME_PATH, MAC_FIREFOX_PATH, MAC_SAFARI_PATH,
+    BROWSER_PROFILE, RESOURCE_STATS_ENABLED, COMMAND_TRACE_ENABLED,
 )
 from utils.logger import Logger
+from utils.command_tracer import CommandTracer
 
 
 class WebDriverFactory:
-    # 创建浏览器名称到 WebDriver 服务的映射
-    _service_map = {
-        'win32': {
-            'edge': (webdriver.Edge, EdgeService(WIN_EDGE_PATH)),
-            'chrome': (webdriver.Chrome, ChromeService(WIN_CHROME_PATH)),
-            'firefox': (webdriver.Firefox, FirefoxService(WIN_FIREFOX_PATH)),
+    # 浏览器注册表：模块中的 WebDriver、Service、Options 在首次创建该浏览器时才导入，
+    # family 决定启动参数的设置方式，paths 为各操作系统的驱动路径
+    _browser_registry = {
+        'chrome': {
+            'module': 'selenium.webdriver.chrome',
+            'family': 'chromium',
+            'paths': {'win32': WIN_CHROME_PATH, 'linux': LINUX_CHROME_PATH, 'darwin': MAC_CHROME_PATH},
+        },
+        'edge': {
+            'module': 'selenium.webdriver.edge',
+            'family': 'chromium',
+            'paths': {'win32': WIN_EDGE_PATH},
+        },
+        'firefox': {
+            'module': 'selenium.webdriver.firefox',
+            'family': 'firefox',
+            'paths': {'win32': WIN_FIREFOX_PATH, 'linux': LINUX_FIREFOX_PATH, 'darwin': MAC_FIREFOX_PATH},
+        },
+        'safari': {
+            'module': 'selenium.webdriver.safari',
+            'family': 'safari',
+            'paths': {'darwin': MAC_SAFARI_PATH},
         },
-        'linux': {
-            'chrome': (webdriver.Chrome, ChromeService(LINUX_CHROME_PATH)),
-            'firefox': (webdriver.Firefox, FirefoxService(LINUX_FIREFOX_PATH)),
+    }
+
+    # 启动参数配置：
+    # headless 无头模式；page_load_strategy 页面加载策略 normal / eager / none；
+    # disable_images 不加载图片；disable_extensions 禁用扩展；window_size 固定窗口大小，代替最大化窗口
+    _profiles = {
+        'default': {},
+        'headless': {
+            'headless': True,
+            'window_size': (1920, 1080),
         },
-        'darwin': {
-            'chrome': (webdriver.Chrome, ChromeService(MAC_CHROME_PATH)),
-            'firefox': (webdriver.Firefox, FirefoxService(MAC_FIREFOX_PATH)),
-            'safari': (webdriver.Safari, SafariService(MAC_SAFARI_PATH)),
+        'performance': {
+            'page_load_strategy': 'eager',
+            'disable_images': True,
+            'disable_extensions': True,
+            'window_size': (1920, 1080),
+        },
+        'headless_performance': {
+            'headless': True,
+            'page_load_strategy': 'eager',
+            'disable_images': True,
+            'disable_extensions': True,
+            'window_size': (1920, 1080),
         },
     }
 
     @staticmethod
-    def get_driver(browser_name):
+    @lru_cache(maxsize=None)
+    def _load(module_name):
+        """
+        导入浏览器模块，返回 (WebDriver, Service, Options) 类
+        :param module_name: selenium 浏览器模块名
+        :return: (WebDriver, Service, Options)
+        """
+        driver_module = importlib.import_module(f'{module_name}.webdriver')
+        service_module = importlib.import_module(f'{module_name}.service')
+        options_module = importlib.import_module(f'{module_name}.options')
+        return driver_module.WebDriver, service_module.Service, options_module.Options
+
+    @staticmethod
+    def _build_options(options_class, family, profile):
+        """
+        根据启动参数配置创建浏览器选项
+        :param options_class: Options 类
+        :param family: 浏览器类型 chromium / firefox / safari
+        :param profile: 启动参数配置
+        :return: Options 实例
+        """
+        options = options_class()
+        if profile.get('page_load_strategy'):
+            options.page_load_strategy = profile['page_load_strategy']
+        window_size = profile.get('window_size')
+        if family == 'chromium':
+            if profile.get('headless'):
+                options.add_argument('--headless=new')
+            if profile.get('disable_extensions'):
+                options.add_argument('--disable-extensions')
+            if profile.get('disable_images'):
+                options.add_argument('--blink-settings=imagesEnabled=false')
+                options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+            if window_size:
+                options.add_argument(f'--window-size={window_size[0]},{window_size[1]}')
+            if profile.get('proxy'):
+                # 使用录制/回放代理，代理使用自签名证书解密 HTTPS
+                options.add_argument(f"--proxy-server=http://{profile['proxy']}")
+                options.add_argument('--proxy-bypass-list=<-loopback>')
+                options.accept_insecure_certs = True
+            if profile.get('performance_log'):
+                # 开启 performance 日志，用于统计资源拦截，参见 ResourcePolicy.collect
+                options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        elif family == 'firefox':
+            if profile.get('headless'):
+                options.add_argument('-headless')
+            if profile.get('disable_images'):
+                options.set_preference('permissions.default.image', 2)
+            if window_size:
+                options.add_argument(f'--width={window_size[0]}')
+                options.add_argument(f'--height={window_size[1]}')
+            if profile.get('proxy'):
+                host, port = profile['proxy'].rsplit(':', 1)
+                options.set_preference('network.proxy.type', 1)
+                for scheme in ('http', 'ssl'):
+                    options.set_preference(f'network.proxy.{scheme}', host)
+                    options.set_preference(f'network.proxy.{scheme}_port', int(port))
+                options.set_preference('network.proxy.allow_hijacking_localhost', True)
+                options.accept_insecure_certs = True
+        return options
+
+    @staticmethod
+    def get_driver(browser_name, profile=None, resource_policy=None, proxy=None):
+        """
+        创建 WebDriver 实例，每次调用都会创建新的 Service 和 Options
+        :param browser_name: 浏览器名称
+        :param profile: 启动参数配置名称，不填使用 BROWSER_PROFILE
+        :param resource_policy: 资源拦截策略 ResourcePolicy，仅 Chromium 系浏览器生效
+        :param proxy: 代理地址，如 127.0.0.1:8080，用于网络录制/回放，参见 NetworkReplay
+        :return: WebDriver 实例
+        """
         current_sys = sys.platform.lower()
         browser_name = browser_name.lower()
+        profile_name = profile or BROWSER_PROFILE
 
         try:
-            # 获取当前系统的浏览器服务映射
-            browser_services = WebDriverFactory._service_map.get(current_sys)
-            if browser_services is None:
-                message = f"不支持的操作系统: {current_sys}"
+            # 获取浏览器注册信息
+            browser = WebDriverFactory._browser_registry.get(browser_name)
+            if browser is None:
+                supported_browsers = ", ".join(WebDriverFactory._browser_registry.keys())
+                message = f"不支持的浏览器: {browser_name}. 支持的浏览器: {supported_browsers}"
+                Logger.error(message)
+                raise ValueError(message)
+
+            # 获取当前系统的驱动路径
+            driver_path = browser['paths'].get(current_sys)
+            if driver_path is None:
+                message = f"浏览器 {browser_name} 不支持当前操作系统: {current_sys}"
                 Logger.error(message)
                 raise EnvironmentError(message)
 
-            # 获取浏览器服务
-            browser_service = browser_services.get(browser_name)
-            if browser_service is None:
-                supported_browsers = ", ".join(browser_services.keys())
-                message = f"不支持的浏览器: {browser_name}. 支持的浏览器: {supported_browsers}"
+            # 获取启动参数配置
+            profile_options = WebDriverFactory._profiles.get(profile_name)
+            if profile_options is None:
+                supported_profiles = ", ".join(WebDriverFactory._profiles.keys())
+                message = f"不支持的启动参数配置: {profile_name}. 支持的配置: {supported_profiles}"
                 Logger.error(message)
                 raise ValueError(message)
 
             # 创建 WebDriver 实例
-            driver_class, service = browser_service
-            return driver_class(service=service)
+            if resource_policy is not None or RESOURCE_STATS_ENABLED:
+                profile_options = dict(profile_options, performance_log=True)
+            if proxy:
+                profile_options = dict(profile_options, proxy=proxy)
+            driver_class, service_class, options_class = WebDriverFactory._load(browser['module'])
+            options = WebDriverFactory._build_options(options_class, browser['family'], profile_options)
+            driver = driver_class(service=service_class(driver_path), options=options)
+            if browser['family'] == 'safari' and profile_options.get('window_size'):
+                # safari 不支持通过启动参数设置窗口大小
+                driver.set_window_size(*profile_options['window_size'])
+            if COMMAND_TRACE_ENABLED:
+                # 记录浏览器驱动的每个命令，参见 driver.command_tracer
+                CommandTracer.install(driver)
+            if resource_policy is not None:
+                resource_policy.apply(driver)
+            Logger.debug("创建 WebDriver: {}, 启动参数配置: {}", browser_name, profile_name)
+            return driver
 
         except Exception as e:
             Logger.error(f"创建 WebDriver 时发生错误: {e}")